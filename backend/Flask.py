@@ -1,20 +1,61 @@
-from flask import Flask, jsonify, request, send_file, abort
+import time
+# cold start is measured from here, before the heavier imports
+STARTUP_BEGAN = time.monotonic()
+from flask import Flask, Response, jsonify, request, send_file, abort, g
 from flask_cors import CORS
-import subprocess, os, time, signal
+import subprocess, os, signal
 from pathlib import Path
-import pexpect
 from logic.setupLogManger import LogManager
+from logic.AttributeScheduler import AttributeScheduler
+from logic.ReachabilityProber import ReachabilityProber
+from logic.ConfigStore import ConfigStore, ConfigValidationError
+from logic.LifecycleJobs import JobManager, JobConflictError, JobManagerClosedError
+from logic.Commissioning import CommissioningTask, run_gnb_commission
+from logic.FileWatcher import FileWatcher
+from logic.ExpectedProcesses import ExpectedProcessSet
+from logic.UpdateBroadcaster import UpdateBroadcaster
+from logic.LogReader import LogReader
+from logic.LogIndex import LogIndex
+from logic.MetricsStore import MetricsStore
+from logic.DiagnosticsBundle import DiagnosticsBundle, BundleEntry
+from logic.Metrics import REGISTRY
+from werkzeug.http import http_date
 import threading
 import os
 import datetime
 import re
 import json # ADDED: Import json module
+import hashlib
 
 # Import fcntl for non-blocking I/O
 import fcntl
 
-# Configuration constants
-CONFIG_FILE_PATH = "/opt/ste/active/commissioning/configs/gnb_webdashboard.json"
+# Configuration constants. The board paths can be overridden from the
+# environment, which is how benchmarks/ runs the backend against fixture
+# trees and fake vendor tools on any Linux machine.
+VENDOR_ROOT = os.environ.get("WEBDASHBOARD_VENDOR_ROOT", "/opt/ste")
+CONFIG_FILE_PATH = os.environ.get(
+    "WEBDASHBOARD_CONFIG", os.path.join(VENDOR_ROOT, "active/commissioning/configs/gnb_webdashboard.json"))
+GNB_LOG_DIR = os.environ.get("WEBDASHBOARD_GNB_LOG_DIR", "/logdump")
+PROC_ROOT = os.environ.get("WEBDASHBOARD_PROC_ROOT", "/proc")
+SYS_CLASS = os.environ.get("WEBDASHBOARD_SYS_CLASS", "/sys/class")
+# Executable names of the gNB processes, e.g. "cu_app,du_app", so the ones
+# that are down can be named before the set is learned from gnb_ctl status
+GNB_PROCESSES = [name.strip() for name in os.environ.get("WEBDASHBOARD_GNB_PROCESSES", "").split(",")
+                 if name.strip()]
+# Longest a request waits for a value to be refreshed before the cached one
+# is served flagged as stale, so a hung probe never ties up request workers.
+REQUEST_BUDGET = float(os.environ.get("WEBDASHBOARD_REQUEST_BUDGET_S", "2.0"))
+# Config and log changes are picked up from file watch events; jobs that
+# follow those files only run on a timer this often, in case one is missed.
+# WEBDASHBOARD_FILE_WATCH=poll uses stat polling instead of inotify.
+WATCH_RESYNC_INTERVAL = 60.0
+FILE_WATCH_MODE = os.environ.get("WEBDASHBOARD_FILE_WATCH", "inotify")
+# Interfaces reported by /api/attributes "throughput", e.g. ("gtp0", "eth0", "eth1", "wlan0")
+# for the user plane, N2/N3 and MANET ports. None reports every interface except lo.
+THROUGHPUT_INTERFACES = None
+# Timed transcript of each gnb_commission run (see logic/PromptDialog.py)
+COMMISSION_TRANSCRIPT = "/tmp/gnb_commission_output_{}.jsonl"
 
 from logic.attributes.CpuUsage           import CpuUsage
 from logic.attributes.SocTemp            import SocTemp
@@ -25,23 +66,31 @@ from logic.attributes.RaptorStatus       import RaptorStatus
 from logic.attributes.Network            import Network
 from logic.attributes.CoreAttr           import CoreAttr
 from logic.attributes.RadioAttr          import RadioAttr
+from logic.attributes.ThroughPut         import ThroughPut
+from logic.attributes.ProcessMonitor     import ProcessMonitor
 
-def ensure_config_file_exists():
+def ensure_config_file_exists(progress=None):
     """
     Ensure the gNB config file exists. If it doesn't, automatically create it
     by running the gnb_commission script with automated responses.
+
+    Args:
+        progress: optional callable taking a message, called as the
+            commissioning advances (see CommissioningTask)
     """
     logger = LogManager.get_logger('config_creation') # Moved logger init up
+    progress = progress or (lambda message: None)
 
     if os.path.exists(CONFIG_FILE_PATH):
         logger.info(f"Config file {CONFIG_FILE_PATH} found.") # MODIFIED
         return True
     
     logger.info(f"Config file {CONFIG_FILE_PATH} not found. Generating...") # MODIFIED
+    progress("Config file not found, running gnb_commission")
     
     try:
         # Check if gnb_commission script exists in /opt/ste/bin/
-        gnb_commission_path = "/opt/ste/bin/gnb_commission"
+        gnb_commission_path = os.path.join(VENDOR_ROOT, "bin", "gnb_commission")
         if not os.path.exists(gnb_commission_path):
             logger.error(f"gnb_commission script not found at {gnb_commission_path}")
             return False
@@ -54,174 +103,24 @@ def ensure_config_file_exists():
         else:
             logger.debug(f"Config directory {config_dir} found") # MODIFIED from info to debug
         
-        # Run gnb_commission with -g flag and automated responses
-        logger.debug("Starting gnb_commission process with -g flag...") # MODIFIED from info to debug
-        proc = pexpect.spawn("gnb_commission -g", timeout=120)
-        
-        # Log gnb_commission output to a file
-        try:
-            log_file_path = f"/tmp/gnb_commission_output_{int(time.time())}.log"
-            proc.logfile_read = open(log_file_path, "wb")
-            logger.debug(f"gnb_commission output will be logged to {log_file_path}")
-        except Exception as log_e:
-            logger.warning(f"Could not open log file for gnb_commission: {log_e}. Output will not be saved to file.")
-            proc.logfile_read = None # Ensure it's None if opening failed
-
-        step_count = 0
-        max_steps = 50  # Safety limit to prevent infinite loops
-        automation_started = False  # Flag to track when to start automation
-        
-        while step_count < max_steps:
-            try:
-                step_count += 1
-                logger.debug(f"Step {step_count}: Waiting for prompt...")
-                
-                if not automation_started:
-                    # Look for "Downlink Bandwidth MHz" to start automation
-                    index = proc.expect([
-                        r"(?i).*downlink bandwidth mhz.*",  # Look for Downlink Bandwidth MHz
-                        r".*:.*",  # Any other prompt with colon
-                        pexpect.TIMEOUT,
-                        pexpect.EOF
-                    ], timeout=10)
-                else:
-                    # After automation started, look for Service Differentiator to stop
-                    index = proc.expect([
-                        r"(?i).*service differentiator.*",  # Look for Service Differentiator (last prompt)
-                        r".*:.*",  # Any other prompt with colon
-                        pexpect.TIMEOUT,
-                        pexpect.EOF
-                    ], timeout=10)
-                
-                # Log what we received (at debug level)
-                if hasattr(proc, 'before') and proc.before:
-                    output_text = proc.before.decode('utf-8', errors='ignore')
-                    logger.debug(f"Script output: {repr(output_text)}") # MODIFIED from info to debug
-                if hasattr(proc, 'after') and proc.after:
-                    match_text = proc.after.decode('utf-8', errors='ignore')
-                    logger.debug(f"Matched pattern: {repr(match_text)}") # MODIFIED from info to debug
-                
-                if not automation_started:
-                    if index == 0:  # Found "Downlink Bandwidth MHz"
-                        logger.debug(f"Found 'Downlink Bandwidth MHz' at step {step_count}, starting automation...") # MODIFIED from info to debug
-                        automation_started = True
-                        proc.sendline('')  # Press Enter for this prompt
-                        time.sleep(0.1)
-                        continue
-                    elif index == 1:  # Other colon prompt before automation starts - IGNORE
-                        logger.debug("Found colon prompt before automation start, IGNORING (not responding)...")
-                        continue
-                    elif index == 2:  # Timeout
-                        logger.debug("Timeout before automation start, continuing...")
-                        continue
-                    else:  # EOF
-                        logger.debug("Process ended with EOF before automation started") # MODIFIED from info to debug
-                        break
-                else:
-                    # Automation has started
-                    if index == 0:  # Found "Service Differentiator" (last prompt)
-                        logger.debug(f"Found 'Service Differentiator' at step {step_count}, this is the last prompt...") # MODIFIED from info to debug
-                        proc.sendline('')  # Press Enter for this final prompt
-                        time.sleep(0.1)
-                        
-                        logger.debug("Service Differentiator complete. Looking for filename prompt to customize...") # MODIFIED from info to debug
-                        
-                        try:
-                            filename_index = proc.expect([
-                                r".*filename.*",  # Look for filename prompt
-                                pexpect.TIMEOUT,
-                                pexpect.EOF
-                            ], timeout=15)
-                            
-                            if filename_index == 0:  # Found filename prompt
-                                logger.debug("Found filename prompt, customizing filename...") # MODIFIED from info to debug
-                                time.sleep(0.1)
-                                logger.debug("Sending Ctrl+U to clear preset filename...") # MODIFIED from info to debug
-                                proc.send('\x15')  # Ctrl+U
-                                time.sleep(0.2)
-                                logger.debug("Typing custom filename: gnb_webdashboard.json") # MODIFIED from info to debug
-                                proc.send('gnb_webdashboard.json')
-                                time.sleep(0.1)
-                                logger.debug("Pressing Enter to confirm filename...") # MODIFIED from info to debug
-                                proc.sendline('')
-                                time.sleep(0.1)
-                                logger.debug("Filename customization complete!") # MODIFIED from info to debug
-                            else: # Timeout or EOF
-                                logger.warning("No filename prompt found or timeout/EOF occurred during filename customization")
-                                
-                        except (pexpect.TIMEOUT, pexpect.EOF) as e:
-                            logger.warning(f"Exception while looking for filename prompt: {e}")
-                        
-                        logger.debug("Ignoring any further prompts and waiting for process to end...") # MODIFIED from info to debug
-                        
-                        try:
-                            while True: # Loop to consume any remaining output until EOF
-                                final_index = proc.expect([
-                                    r".*:.*",  # Any colon prompt - but we'll ignore it
-                                    pexpect.TIMEOUT,
-                                    pexpect.EOF
-                                ], timeout=10)
-                                
-                                if final_index == 0:  # Colon prompt after Service Differentiator - IGNORE
-                                    logger.debug("Found colon prompt after filename handling, IGNORING...")
-                                    if hasattr(proc, 'before') and proc.before: # Log ignored output at debug
-                                        logger.debug(f"Ignored output: {proc.before.decode('utf-8', errors='ignore')}")
-                                    continue
-                                elif final_index == 1:  # Timeout
-                                    logger.debug("Timeout after filename handling, continuing to wait for EOF...")
-                                    continue
-                                else:  # EOF
-                                    logger.debug("gnb_commission process completed (EOF) after filename handling") # MODIFIED from info to debug
-                                    if hasattr(proc, 'before') and proc.before:
-                                        final_output = proc.before.decode('utf-8', errors='ignore')
-                                        logger.debug(f"Final script output before EOF: {repr(final_output)}") # MODIFIED from info to debug
-                                    break 
-                        except pexpect.EOF:
-                            logger.debug("Process ended with EOF after filename handling (expected)") # MODIFIED from info to debug
-                        except pexpect.TIMEOUT:
-                            logger.warning("Final timeout after filename handling, process might not have exited cleanly.")
-                        break # Exit the main while loop
-                        
-                    elif index == 1:  # Other colon prompt during automation
-                        logger.debug(f"Found colon prompt during automation at step {step_count}, pressing Enter...") # MODIFIED from info to debug
-                        proc.sendline('')
-                        time.sleep(0.1)
-                        continue
-                        
-                    elif index == 2:  # Timeout during automation
-                        logger.debug("Timeout during automation, continuing...")
-                        continue
-                    else:  # EOF during automation
-                        logger.debug("Process ended with EOF during automation") # MODIFIED from info to debug
-                        if hasattr(proc, 'before') and proc.before:
-                            final_output = proc.before.decode('utf-8', errors='ignore')
-                            logger.debug(f"Final script output before EOF: {repr(final_output)}") # MODIFIED from info to debug
-                        break
-                    
-            except pexpect.TIMEOUT:
-                logger.debug("Timeout exception in main automation loop, continuing...")
-                continue
-            except pexpect.EOF:
-                logger.debug("Process ended with EOF exception in main automation loop") # MODIFIED from info to debug
-                if hasattr(proc, 'before') and proc.before:
-                    final_output = proc.before.decode('utf-8', errors='ignore')
-                    logger.debug(f"Final script output before EOF: {repr(final_output)}") # MODIFIED from info to debug
-                break
-        
-        if step_count >= max_steps:
-            logger.warning(f"Reached maximum steps ({max_steps}) without completing automation.")
-        
-        try:
-            proc.close()
-            # Close the log file if it was opened
-            if proc.logfile_read and not proc.logfile_read.closed:
-                proc.logfile_read.close()
-        except Exception as close_e:
-            logger.warning(f"Error closing pexpect process or log file: {close_e}")
+        # Run gnb_commission with -g flag, answering its prompts as they appear
+        transcript_path = COMMISSION_TRANSCRIPT.format(int(time.time()))
+        logger.debug(f"Starting gnb_commission -g, transcript in {transcript_path}")
+        result, _, exit_status = run_gnb_commission(os.path.basename(CONFIG_FILE_PATH),
+                                                    transcript_path=transcript_path,
+                                                    progress=progress)
+        for step in result.steps:
+            logger.debug(f"Answered '{step['prompt']}' after {step['wait_ms']:.1f}ms: {step['matched']!r}")
+        if result.completed:
+            logger.info(f"gnb_commission finished in {result.elapsed:.2f}s "
+                        f"({len(result.steps)} prompts, exit status {exit_status})")
+        else:
+            logger.warning(f"gnb_commission dialog stopped after {result.elapsed:.2f}s: {result.error}")
         
         # Check if the config file was created
         if os.path.exists(CONFIG_FILE_PATH):
             logger.info(f"Successfully generated config file: {CONFIG_FILE_PATH}") # MODIFIED
+            progress("Config file generated")
             
             # Add the profile field to the newly created config file
             try:
@@ -245,32 +144,96 @@ def ensure_config_file_exists():
             
     except Exception as e:
         logger.error(f"Error during config file generation: {str(e)}") # MODIFIED
-        # Ensure logfile is closed if open on exception
-        if 'proc' in locals() and hasattr(proc, 'logfile_read') and proc.logfile_read and not proc.logfile_read.closed:
-            try:
-                proc.logfile_read.close()
-            except Exception as log_close_e:
-                logger.warning(f"Could not close gnb_commission log file on error: {log_close_e}")
         return False
 
+# Define a log directory for command outputs
+CMD_LOG_DIR = os.environ.get("WEBDASHBOARD_LOG_DIR", "/webdashboard/logdump")
+if not os.path.exists(CMD_LOG_DIR):
+    try:
+        os.makedirs(CMD_LOG_DIR)
+    except:
+        # Fallback to local logs directory if not writable
+        CMD_LOG_DIR = "logs"
+        if not os.path.exists(CMD_LOG_DIR):
+            os.makedirs(CMD_LOG_DIR)
+
 # Initialize attributes
-cpu_usage           = CpuUsage()
-cpu_temp            = SocTemp()
-ram_usage           = RamUsage()
+cpu_usage           = CpuUsage(os.path.join(PROC_ROOT, "stat"))
+cpu_temp            = SocTemp(SYS_CLASS)
+ram_usage           = RamUsage(os.path.join(PROC_ROOT, "meminfo"))
 drive_space         = DriveSpace()
 board_date_time     = BoardDateTime()
-raptor_status       = RaptorStatus("/logdump/du_log.txt")
-
-# Initialize config file check and radio/core attributes at startup
-print("Checking for gNB config file at startup...")
-if not ensure_config_file_exists():
-    raise Exception("Failed to create or access config file during startup")
+raptor_status       = RaptorStatus(os.path.join(GNB_LOG_DIR, "du_log.txt"), ExpectedProcessSet(
+    VENDOR_ROOT, seed=GNB_PROCESSES, state_path=os.path.join(CMD_LOG_DIR, "expected_processes.json")))
+throughput          = ThroughPut(THROUGHPUT_INTERFACES, os.path.join(PROC_ROOT, "net/dev"),
+                                 os.path.join(SYS_CLASS, "net"))
+process_monitor     = ProcessMonitor(VENDOR_ROOT)
 
-# Initialize radio and core attributes now that config file exists
-print("Initializing radio and core attributes...")
+# Radio and core attributes read the config file, which may not exist yet;
+# they are only scheduled once commissioning has produced it.
 radio = RadioAttr(CONFIG_FILE_PATH)
 core = CoreAttr(CONFIG_FILE_PATH)
-print("Flask application initialization complete.")
+config_store = ConfigStore.for_path(CONFIG_FILE_PATH)
+CONFIG_KEYS = set(RadioAttr.config_keys) | set(CoreAttr.config_keys)
+# Core reachability is probed in-process; the Network attribute only reads
+# the prober's cached state, so no ping process is spawned per request.
+prober = ReachabilityProber()
+prober.start()
+core_connection = Network(core.ngc_Ip, prober=prober)
+# One thread turns config and log file changes into events for the caches,
+# log indexes and push stream below.
+file_watcher = FileWatcher(use_inotify=FILE_WATCH_MODE != "poll")
+file_watcher.start()
+
+def refresh_core_connection():
+    # the NGC IP comes from config, so follow it if the config changes
+    core_connection.test_network(core.ngc_Ip)
+
+# Refresh every attribute in the background at its own cadence so that
+# the request handlers below only ever read the latest values.
+LogManager.get_logger('startup').info("Starting attribute scheduler...")
+scheduler = AttributeScheduler()
+
+def refresh_raptor_status():
+    # the gNB was started or stopped: look for its processes straight away
+    # rather than at the monitor's next periodic /proc scan
+    before = (raptor_status.raptorStatus, raptor_status.processesDown)
+    raptor_status.refresh()
+    if (raptor_status.raptorStatus, raptor_status.processesDown) != before:
+        process_monitor.request_discovery()
+        scheduler.trigger("ProcessMonitor")
+
+ATTRIBUTE_JOBS = [scheduler.add(attr).name for attr in (
+    cpu_usage, cpu_temp, ram_usage, drive_space, board_date_time, throughput, process_monitor)]
+ATTRIBUTE_JOBS.append(scheduler.add_job("RaptorStatus", refresh_raptor_status,
+                                        raptor_status.refresh_interval).name)
+NODE_STATUS_JOBS = ["RaptorStatus"]
+scheduler.run_all()
+scheduler.start()
+
+def on_config_ready():
+    """
+    Runs once commissioning has produced the config: load it and start
+    refreshing the attributes that depend on it whenever it changes.
+    """
+    config_store.watch(file_watcher)
+    radio.refresh()
+    core.refresh()
+    refresh_core_connection()
+    for attr in (core, radio):
+        ATTRIBUTE_JOBS.append(scheduler.add(attr, interval=WATCH_RESYNC_INTERVAL).name)
+    ATTRIBUTE_JOBS.append(scheduler.add_job("core_connection", refresh_core_connection,
+                                            prober.interval).name)
+    file_watcher.watch(CONFIG_FILE_PATH, on_config_changed)
+
+def on_config_changed(event):
+    # edited through /api/config, regenerated by gnb_commission or by hand
+    scheduler.trigger("CoreAttr", "RadioAttr", "core_connection", "stream_publisher")
+
+# Commissioning (generating the config with gnb_commission when it is
+# missing) can take minutes, so it runs in the background; routes that need
+# the config answer 503 "not_ready" until it is done, see /api/ready.
+commissioning = CommissioningTask(ensure_config_file_exists, on_ready=on_config_ready)
 
 raptor_status_timeout = 3
 
@@ -278,87 +241,354 @@ raptor_status_timeout = 3
 app = Flask(__name__)
 CORS(app, resources={r"/api/*": {"origins": "*"}})
 
+# Request latency per route, method and status. Streaming responses
+# (SSE, downloads) are timed until their headers are ready.
+REQUEST_DURATION = REGISTRY.histogram(
+    "webdashboard_http_request_duration_seconds",
+    "Time to handle an API request, by route, method and status",
+    ("route", "method", "status"))
+
+@app.before_request
+def start_request_timer():
+    g.request_start = time.perf_counter()
+
+def observe_request_duration(status):
+    # popped, so a request is only recorded once
+    start = g.pop("request_start", None)
+    if start is not None:
+        route = request.url_rule.rule if request.url_rule is not None else "unmatched"
+        REQUEST_DURATION.labels(route, request.method, status).observe(time.perf_counter() - start)
+
+@app.after_request
+def record_request_duration(response):
+    observe_request_duration(response.status_code)
+    return response
+
+@app.teardown_request
+def record_failed_request(exc):
+    # after_request is skipped when an exception propagates (debug mode, or
+    # a failing after_request hook); still count the request as a 500
+    if exc is not None:
+        observe_request_duration(500)
+
+def build_static_attributes():
+    """
+    Attributes that come from the gNB config file and only change when the
+    config does.
+    """
+    return {
+        "gnb_id":              radio.gnb_Id,
+        "gnb_id_length":       radio.gnb_Id_Length,
+        "nr_band":             radio.nr_Band,
+        "scs":                 radio.scs,
+        "tx_power":            radio.tx_Power,
+        "frequency_down_link": radio.dl_centre_frequency,
+
+        "ip_address_gnb":      core.gnb_Ngu_Ip,
+        "ip_address_ngc":      core.ngc_Ip,        
+        "ip_address_ngu":      core.ngu_Ip,
+        "MCC":                 core.MCC,
+        "MNC":                 core.MNC,
+        "cell_id":             core.cell_Id,
+        "nr_tac":              core.nr_Tac,
+        "sst":                 core.sst,
+        "sd":                  core.sd,
+        "profile":             core.profile,
+    }
+
+def build_dynamic_attributes():
+    """
+    Live board metrics, kept fresh by the background scheduler.
+    """
+    return {
+        "cpu_usage":           cpu_usage.cpuUsage,
+        "cpu_usage_history":   list(cpu_usage.usage_history),
+        "cpu_cores":           cpu_usage.core_usage,
+        "cpu_core_history":    {entry["core"]: list(history) for entry, history
+                                in zip(cpu_usage.core_usage, cpu_usage.core_history)},
+        "cpu_temp":            cpu_temp.core_temp,
+        "cpu_temp_hottest":    cpu_temp.hottest.name if cpu_temp.hottest else None,
+        "temp_sensors":        cpu_temp.sensor_stats(),
+        "temp_sensor_history": {s.name: list(s.history) for s in cpu_temp.sensors},
+        "ram_usage":           ram_usage.ramUsage,
+        "ram_usage_history":   list(ram_usage.usage_history),
+        "ram_total":           ram_usage.totalRam,
+
+        "drive_total":         drive_space.drive_data[0],
+        "drive_used":          drive_space.drive_data[1],
+        "drive_free":          drive_space.drive_data[2],
+
+        "board_date":          board_date_time.boardDate,
+        "board_time":          board_date_time.boardTime,
+        "core_connection":     core_connection.networkStatus.name,
+        "core_connection_stats": core_connection.stats(),
+
+        "core_dl_mbps":        throughput.coreDl,
+        "core_ul_mbps":        throughput.coreUl,
+        "core_dl_history":     list(throughput.coreDl_hist),
+        "core_ul_history":     list(throughput.coreUl_hist),
+        "throughput":          throughput.iface_stats,
+
+        "processes":           process_monitor.processes,
+        "process_history":     {name: [{"cpu": cpu, "rss": rss} for cpu, rss in history]
+                                for name, history in process_monitor.history.items()},
+        "stale":               scheduler.stale_jobs(ATTRIBUTE_JOBS, REQUEST_BUDGET),
+    }
+
+def build_attributes():
+    """
+    Latest attribute values as served by /api/attributes. The values are
+    kept fresh by the background scheduler, so this only reads them.
+    """
+    attributes = build_static_attributes()
+    attributes.update(build_dynamic_attributes())
+    return attributes
+
+_static_attributes_cache = None   # (config versions, etag, encoded body)
+
+def static_attributes_response():
+    """
+    The encoded static attributes and their strong ETag, rebuilt only when
+    the radio or core config version changes. The ETag is a hash of the
+    body, so it stays valid across backend restarts.
+
+    Returns:
+        tuple: (etag, body bytes)
+    """
+    global _static_attributes_cache
+    versions = (radio.config_version, core.config_version)
+    cached = _static_attributes_cache
+    if cached is None or cached[0] != versions:
+        body = json.dumps(build_static_attributes(), separators=(",", ":")).encode()
+        etag = hashlib.sha1(body).hexdigest()[:20]
+        cached = _static_attributes_cache = (versions, etag, body)
+    return cached[1], cached[2]
+
+def refresh_within_budget(names):
+    """
+    Give the scheduler up to REQUEST_BUDGET seconds to catch up on the named
+    jobs if it fell behind. Whatever is still out of date is served from the
+    cache and listed under "stale" in the response.
+    """
+    if scheduler.stale_jobs(names, REQUEST_BUDGET):
+        scheduler.refresh_within(names, REQUEST_BUDGET)
+
+def not_ready_response():
+    """
+    Answer for routes that need the gNB config while it is still being
+    commissioned.
+    """
+    return jsonify({
+        "error": "not_ready",
+        "details": "The gNB config is still being commissioned",
+        "commissioning": commissioning.to_dict(),
+    }), 503, {"Retry-After": "2"}
+
+@app.route("/api/ready", methods=["GET"])
+def get_readiness():
+    """
+    200 once the gNB config is in place, 503 while commissioning is still
+    running (or failed and will be retried). Reports commissioning progress
+    and how long the backend took to start.
+    """
+    ready = commissioning.ready
+    return jsonify({
+        "ready":         ready,
+        "startup_s":     round(STARTUP_SECONDS, 3),
+        "commissioning": commissioning.to_dict(),
+    }), 200 if ready else 503
+
 @app.route("/api/attributes", methods=["GET"])
 def get_attributes():
+    if not commissioning.ready:
+        return not_ready_response()
     
     try:
-        # refresh all attributes first
-        for attr in (core, radio, cpu_usage, cpu_temp, ram_usage,
-                     drive_space, board_date_time):
-            attr.refresh()
-        
-        # then check core connection once
-        core_connection = Network(core.ngc_Ip)
-        core_connection.refresh()
-
-        data = {
-            "gnb_id":              radio.gnb_Id,
-            "gnb_id_length":       radio.gnb_Id_Length,
-            "nr_band":             radio.nr_Band,
-            "scs":                 radio.scs,
-            "tx_power":            radio.tx_Power,
-            "frequency_down_link": radio.dl_centre_frequency,
-
-            "ip_address_gnb":      core.gnb_Ngu_Ip,
-            "ip_address_ngc":      core.ngc_Ip,        
-            "ip_address_ngu":      core.ngu_Ip,
-            "MCC":                 core.MCC,
-            "MNC":                 core.MNC,
-            "cell_id":             core.cell_Id,
-            "nr_tac":              core.nr_Tac,
-            "sst":                 core.sst,
-            "sd":                  core.sd,
-            "profile":             core.profile,
-
-            "cpu_usage":           cpu_usage.cpuUsage,
-            "cpu_usage_history":   list(cpu_usage.usage_history),
-            "cpu_temp":            cpu_temp.core_temp,
-            "ram_usage":           ram_usage.ramUsage,
-            "ram_usage_history":   list(ram_usage.usage_history),
-            "ram_total":           ram_usage.totalRam,
-
-            "drive_total":         drive_space.drive_data[0],
-            "drive_used":          drive_space.drive_data[1],
-            "drive_free":          drive_space.drive_data[2],
-
-            "board_date":          board_date_time.boardDate,
-            "board_time":          board_date_time.boardTime,
-            "core_connection":     core_connection.networkStatus.name,
-        }
-        return jsonify(data)
+        refresh_within_budget(ATTRIBUTE_JOBS)
+        return jsonify(build_attributes())
         
     except Exception as e:
         return jsonify({"error": f"Failed to get attributes: {str(e)}"}), 500
 
+def build_node_status():
+    return {
+        "node_status":    raptor_status.raptorStatus.name,
+        "processes_down": raptor_status.processesDown,
+        "stale":          bool(scheduler.stale_jobs(NODE_STATUS_JOBS, REQUEST_BUDGET)),
+    }
+
+@app.route("/api/attributes/static", methods=["GET"])
+def get_static_attributes():
+    """
+    Config-derived attributes with a strong ETag; a matching If-None-Match
+    gets 304 with no body. The current ETag is also in every
+    /api/attributes/dynamic response as "config_etag", so clients only
+    need to come here when it changes.
+    """
+    if not commissioning.ready:
+        return not_ready_response()
+    try:
+        etag, body = static_attributes_response()
+    except Exception as e:
+        return jsonify({"error": f"Failed to get attributes: {str(e)}"}), 500
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+    else:
+        response = Response(body, mimetype="application/json")
+    response.set_etag(etag)
+    response.headers["Cache-Control"] = "no-cache"
+    return response
+
+@app.route("/api/attributes/dynamic", methods=["GET"])
+def get_dynamic_attributes():
+    if not commissioning.ready:
+        return not_ready_response()
+    try:
+        refresh_within_budget(ATTRIBUTE_JOBS)
+        attributes = build_dynamic_attributes()
+        attributes["config_etag"] = static_attributes_response()[0]
+        return jsonify(attributes)
+    except Exception as e:
+        return jsonify({"error": f"Failed to get attributes: {str(e)}"}), 500
+
 @app.route("/api/node_status", methods=["GET"])
 def get_raptor_status():
-    raptor_status.refresh()
-    return jsonify({
-        "node_status": raptor_status.raptorStatus.name
-    }), 200
+    refresh_within_budget(NODE_STATUS_JOBS)
+    return jsonify(build_node_status()), 200
+
+# Push channel: a scheduler job publishes changed fields and new history
+# points once per tick; every /api/stream client gets the same encoded bytes.
+HISTORY_KEYS = {
+    "cpu_usage_history": cpu_usage,
+    "ram_usage_history": ram_usage,
+    "core_dl_history":   throughput,
+    "core_ul_history":   throughput,
+}
+broadcaster = UpdateBroadcaster()
+REGISTRY.gauge("webdashboard_stream_clients", "Connected /api/stream clients",
+               lambda: broadcaster.clients)
+REGISTRY.gauge("webdashboard_log_queue_depth", "Records waiting for the shared log writer",
+               lambda: (LogManager.stats() or {}).get("queue_depth"))
+REGISTRY.gauge("webdashboard_log_dropped_records", "Log records dropped because the writer queue was full",
+               lambda: (LogManager.stats() or {}).get("dropped"))
+REGISTRY.gauge("webdashboard_startup_seconds", "Time from process start until the API could be served",
+               lambda: STARTUP_SECONDS)
+REGISTRY.gauge("webdashboard_config_ready", "1 once the gNB config has been commissioned",
+               lambda: int(commissioning.ready))
+_published_samples = {key: 0 for key in HISTORY_KEYS}
+
+def publish_updates():
+    state = build_attributes() if commissioning.ready else build_dynamic_attributes()
+    # per-core, per-process and per-sensor values already go out in
+    # "cpu_cores", "processes" and "temp_sensors"; resending their full
+    # histories each tick would dwarf the rest of the event
+    state.pop("cpu_core_history", None)
+    state.pop("process_history", None)
+    state.pop("temp_sensor_history", None)
+    appended = {}
+    for key, attr in HISTORY_KEYS.items():
+        history = state[key]
+        new_points = min(attr.sample_count - _published_samples[key], len(history))
+        _published_samples[key] = attr.sample_count
+        appended[key] = history[len(history) - new_points:] if new_points > 0 else []
+    broadcaster.publish("attributes", state, appended)
+    broadcaster.publish("node_status", build_node_status())
+
+scheduler.add_job("stream_publisher", publish_updates, 1.0)
+
+@app.route("/api/stream", methods=["GET"])
+def stream_updates():
+    """
+    Server-Sent Events stream of attribute, node status and log file changes.
+
+    The first event is a 'snapshot' with the full state (history series are
+    sent in full only here); after that 'attributes', 'node_status' and
+    'logs' events carry only changed fields, with new history points under
+    "append". 'logs' has the size and mtime of each downloadable log.
+    Reconnecting clients resume from Last-Event-ID (or ?last_event_id=N).
+    """
+    last_event_id = request.headers.get("Last-Event-ID", request.args.get("last_event_id"))
+    try:
+        last_event_id = int(last_event_id) if last_event_id is not None else None
+    except ValueError:
+        last_event_id = None
+    return Response(broadcaster.stream(last_event_id), mimetype="text/event-stream",
+                    headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
 
 # Map of allowed "actions" to the real commands
 ACTIONS = {
     "setupv2": ["gnb_ctl", "start"],
-    "start": ["/opt/ste/bin/gnb_ctl", "-c", CONFIG_FILE_PATH, "start"],
+    "start": [os.path.join(VENDOR_ROOT, "bin", "gnb_ctl"), "-c", CONFIG_FILE_PATH, "start"],
     "stop": ["gnb_ctl", "stop"],
     "status": ["gnb_ctl", "status"]
 }
 
-# Define a log directory for command outputs
-CMD_LOG_DIR = "/webdashboard/logdump"
-if not os.path.exists(CMD_LOG_DIR):
+# Persistent, multi-resolution history of the board metrics. The file is
+# memory-mapped, so history survives restarts without a load step.
+metrics_store = MetricsStore(os.path.join(CMD_LOG_DIR, "metrics_history.bin"))
+
+def record_metrics():
+    stats = core_connection.stats() or {}
+    drive_total, drive_used = (drive_space.drive_data[:2] if drive_space.drive_data else (0, 0))
+    metrics_store.record_many({
+        "cpu_usage":      cpu_usage.cpuUsage,
+        "cpu_max_core":   cpu_usage.max_core_usage(),
+        "ram_usage":      ram_usage.ramUsage,
+        "cpu_temp":       cpu_temp.core_temp,
+        "drive_used_pct": round(drive_used / drive_total * 100.0, 2) if drive_total else None,
+        "core_rtt_ms":    stats.get("rtt_ms"),
+        "core_loss_rate": stats.get("loss_rate"),
+        "core_dl_mbps":   throughput.coreDl,
+        "core_ul_mbps":   throughput.coreUl,
+    })
+
+# refill the in-memory charts with what was recorded before a restart
+for attr, series in ((cpu_usage, "cpu_usage"), (ram_usage, "ram_usage")):
+    attr.usage_history.extendleft(reversed(metrics_store.latest(series, attr.usage_history.maxlen)))
+scheduler.add_job("metrics_recorder", record_metrics, 1.0)
+scheduler.add_job("metrics_flush", metrics_store.flush, 60.0)
+
+@app.route("/api/history", methods=["GET"])
+def list_history():
+    return jsonify({
+        "series": metrics_store.series(),
+        "resolutions": [res for res, _ in metrics_store.tiers],
+    }), 200
+
+@app.route("/api/history/<series>", methods=["GET"])
+def get_history(series):
+    """
+    Recorded history of one series.
+    e.g. /api/history/cpu_usage?resolution=60&since=1700000000
+    """
+    if series not in metrics_store.series():
+        return jsonify({"error": f"Unknown series '{series}'"}), 404
     try:
-        os.makedirs(CMD_LOG_DIR)
-    except:
-        # Fallback to local logs directory if not writable
-        CMD_LOG_DIR = "logs"
-        if not os.path.exists(CMD_LOG_DIR):
-            os.makedirs(CMD_LOG_DIR)
+        points = metrics_store.query(
+            series,
+            resolution=request.args.get("resolution", 1, type=int),
+            since=request.args.get("since", type=float),
+        )
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    return jsonify({"series": series, "points": points}), 200
+
+# Start/stop run as background jobs so request workers stay free during
+# gNB bring-up; only one lifecycle job may run on the board at a time, and
+# stop cancels a running start rather than waiting for it.
+MAX_WAIT = 120  # seconds
+LIFECYCLE_ACTIONS = ("setupv2", "start", "stop")
+jobs = JobManager(
+    log_path=os.path.join(CMD_LOG_DIR, "setup_log.txt"),
+    lock_path=os.path.join(CMD_LOG_DIR, "lifecycle.lock"),
+)
 
 @app.route("/api/setup_script", methods=["POST"])
 def setup_script():
-    MAX_WAIT = 120  # seconds
+    """
+    Start an action as a background job and return its id immediately.
+    Expects JSON { "action": "start" | "stop" | "status" | "setupv2" }
+    """
     data = request.get_json(force=True, silent=True) or {}
     action = data.get("action")
     logger = LogManager.get_logger('setup_script')
@@ -366,174 +596,37 @@ def setup_script():
     if action not in ACTIONS:
         return jsonify({"error": f"Unknown action '{action}'"}), 400
 
-    cmd = ACTIONS[action]
-    logger.info(f"Executing action '{action}' with command: {' '.join(cmd)}")
-    
-    # Use a consistent log file name
-    log_filename = "setup_log.txt"
-    log_filepath = os.path.join(CMD_LOG_DIR, log_filename)
-    
-    # Clear the log file if this is a start command (setupv2 or start)
-    if action in ["setupv2", "start"]:
-        try:
-            # Make sure the directory exists
-            os.makedirs(os.path.dirname(log_filepath), exist_ok=True)
-            # Clear the file by opening it with 'w' mode and immediately closing
-            open(log_filepath, 'w').close()
-            logger.info(f"Cleared log file {log_filepath} for {action} command")
-        except Exception as e:
-            logger.error(f"Failed to clear log file: {str(e)}")
-    
+    starting = action in ["setupv2", "start"]
+    if starting and not commissioning.ready:
+        return not_ready_response()
     try:
-        # Open the log file (in append mode since we may have cleared it already)
-        with open(log_filepath, 'a') as log_file:
-            # Write a header to the log file
-            timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            log_file.write(f"=== {action} command started at {timestamp} ===\n")
-            log_file.flush()
-            
-            # Start the process with output redirected to the log file
-            proc = subprocess.Popen(
-                cmd,
-                stdout=log_file,
-                stderr=log_file,
-                text=True,
-                bufsize=1,  # Line buffered
-                universal_newlines=True  # Ensures text mode works consistently
-            )
-            
-            logger.info(f"Process started. Output being logged to {log_filepath}")
-            
-            # For stop and status commands, just wait for completion
-            if action in ["stop", "status"]:
-                try:
-                    proc.wait(timeout=MAX_WAIT)
-                    # Read the log file to get output
-                    with open(log_filepath, 'r') as f:
-                        output = f.read()
-                    
-                    logger.info(f"Action '{action}' completed with no issue, exit code 0")
-                    return jsonify({
-                        "action": action,
-                        "status": "completed",
-                        "output": output.strip(),
-                        "log_file": log_filepath,
-                        "exit_code": 0  # Always return 0 for stop and status commands
-                    }), 200
-                except subprocess.TimeoutExpired:
-                    logger.warning(f"Action '{action}' timed out. Killing process.")
-                    proc.kill()
-                    proc.wait()  # Make sure it's dead
-                    
-                    # Read partial output
-                    with open(log_filepath, 'r') as f:
-                        output = f.read()
-                    
-                    return jsonify({
-                        "action": action,
-                        "error": "timeout",
-                        "output": output.strip(),
-                        "log_file": log_filepath,
-                        "exit_code": -1
-                    }), 504
-            
-            # For start/setup actions, monitor the log file for "CELL_IS_UP"
-            start_time = time.time()
-            
-            # Monitor the log file for the "CELL_IS_UP" marker
-            while True:
-                # Check for timeout first
-                if time.time() - start_time > MAX_WAIT:
-                    logger.warning(f"Timeout: No CELL_IS_UP in {MAX_WAIT}s.")
-                    proc.terminate()
-                    try:
-                        proc.wait(timeout=5)
-                    except subprocess.TimeoutExpired:
-                        proc.kill()
-                        proc.wait()
-                    
-                    # Get the content from the log file
-                    with open(log_filepath, 'r') as f:
-                        output = f.read()
-                    
-                    return jsonify({
-                        "action": action,
-                        "error": "timeout",
-                        "details": f"No CELL_IS_UP in {MAX_WAIT}s",
-                        "output": output.strip(),
-                        "log_file": log_filepath,
-                        "exit_code": -1
-                    }), 504
-                
-                # Check if the process has terminated
-                if proc.poll() is not None:
-                    # Process has exited, read the log file
-                    with open(log_filepath, 'r') as f:
-                        output = f.read()
-                    
-                    # Check if "CELL_IS_UP" is in the output
-                    if "CELL_IS_UP" in output:
-                        logger.info("Setup is successful, gNB is now active")
-                        return jsonify({
-                            "action": action,
-                            "status": "ok",
-                            "output": output.strip(),
-                            "log_file": log_filepath,
-                            "exit_code": 0
-                        }), 200
-                    else:
-                        logger.warning(f"Process terminated prematurely with code {proc.returncode}.")
-                        return jsonify({
-                            "action": action,
-                            "error": "process_terminated_unexpectedly",
-                            "details": f"Process terminated (code {proc.returncode}) before CELL_IS_UP was detected.",
-                            "output": output.strip(),
-                            "log_file": log_filepath,
-                            "exit_code": proc.returncode
-                        }), 500
-                
-                # Check the log file for "CELL_IS_UP" without loading the whole thing
-                try:
-                    with open(log_filepath, 'r') as f:
-                        # Read the last 4KB of the file to check for the marker
-                        f.seek(0, os.SEEK_END)
-                        file_size = f.tell()
-                        offset = max(0, file_size - 4096)  # Last 4KB
-                        f.seek(offset, os.SEEK_SET)
-                        recent_content = f.read()
-                        
-                        if "CELL_IS_UP" in recent_content:
-                            logger.info("Setup is successful, gNB is now active")
-                            proc.terminate()
-                            try:
-                                proc.wait(timeout=5)
-                            except subprocess.TimeoutExpired:
-                                proc.kill()
-                        
-                            # Get the full content
-                            with open(log_filepath, 'r') as full_f:
-                                output = full_f.read()
-                        
-                            return jsonify({
-                                "action": action,
-                                "status": "ok", 
-                                "output": output.strip(),
-                                "log_file": log_filepath,
-                                "exit_code": proc.returncode
-                            }), 200
-                except Exception as e:
-                    logger.error(f"Error reading log file: {str(e)}")
-                
-                # Sleep briefly before checking again
-                time.sleep(0.5)
-
+        job = jobs.start(
+            action,
+            ACTIONS[action],
+            lifecycle=action in LIFECYCLE_ACTIONS,
+            # stop aborts a start that is still waiting for the cell
+            preempt=action == "stop",
+            wait_for_marker="CELL_IS_UP" if starting else None,
+            clear_log=starting,
+            max_wait=MAX_WAIT,
+        )
+    except JobConflictError as e:
+        running = e.running_job
+        logger.warning(f"Rejected action '{action}': {str(e)}")
+        return jsonify({
+            "action": action,
+            "error": "job_in_progress",
+            "details": str(e),
+            "job_id": running.id if running else None,
+        }), 409
+    except JobManagerClosedError as e:
+        return jsonify({
+            "action": action,
+            "error": "shutting_down",
+            "details": str(e),
+        }), 503
     except Exception as e:
         logger.error(f"Error in setup_script: {str(e)}")
-        if 'proc' in locals():
-            try:
-                proc.kill()
-            except:
-                pass
         return jsonify({
             "action": action,
             "error": "execution_error",
@@ -541,63 +634,399 @@ def setup_script():
             "exit_code": -2
         }), 500
 
+    return jsonify({
+        "action": action,
+        "job_id": job.id,
+        "status": job.status,
+        "status_url": f"/api/jobs/{job.id}",
+        "stream_url": f"/api/jobs/{job.id}/stream",
+        "log_file": jobs.log_path,
+    }), 202
+
+@app.route("/api/jobs", methods=["GET"])
+def list_jobs():
+    active = jobs.active()
+    return jsonify({
+        "active_job": active.id if active else None,
+        "jobs": [job.to_dict(tail=0) for job in jobs.list()],
+    }), 200
+
+@app.route("/api/jobs/<job_id>", methods=["GET"])
+def get_job(job_id):
+    job = jobs.get(job_id)
+    if job is None:
+        return jsonify({"error": f"Unknown job '{job_id}'"}), 404
+    tail = request.args.get("tail", default=20, type=int)
+    return jsonify(job.to_dict(tail=max(0, tail))), 200
+
+@app.route("/api/jobs/<job_id>/stream", methods=["GET"])
+def stream_job(job_id):
+    """
+    Server-Sent Events stream of a job's output lines followed by a final
+    'done' event with the job status. Resumes after Last-Event-ID (or ?after=N).
+    """
+    job = jobs.get(job_id)
+    if job is None:
+        return jsonify({"error": f"Unknown job '{job_id}'"}), 404
+    after = request.headers.get("Last-Event-ID", request.args.get("after", "0"))
+    try:
+        after = int(after)
+    except ValueError:
+        after = 0
+
+    def generate(last_seq):
+        while True:
+            finished = job.finished
+            lines = job.lines_since(last_seq, timeout=None if finished else 15)
+            for seq, text in lines:
+                last_seq = seq
+                yield f"id: {seq}\ndata: {text}\n\n"
+            if finished:
+                yield f"event: done\ndata: {json.dumps(job.to_dict(tail=0))}\n\n"
+                return
+            if not lines:
+                yield ": keep-alive\n\n"
+
+    return Response(generate(after), mimetype="text/event-stream",
+                    headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
 # map a URL‐friendly key to the real filesystem path
 FILE_PATHS = {
-    "cu_log":     "/logdump/cu_log.txt",
-    "du_log":     "/logdump/du_log.txt",
-    "setup_log": "/webdashboard/logdump/setup_log.txt",
+    "cu_log":     os.path.join(GNB_LOG_DIR, "cu_log.txt"),
+    "du_log":     os.path.join(GNB_LOG_DIR, "du_log.txt"),
+    "setup_log":  os.path.join(CMD_LOG_DIR, "setup_log.txt"),
 }
 
-@app.route("/api/download/<file_key>", methods=["GET"])
-def download_file(file_key):
+def resolve_file_key(file_key):
     """
-    Download one of the pre-registered files.
-    e.g. /api/download/cu_log  or  /api/download/du_log
+    Map a file key to its path, or return an error response tuple.
     """
     file_path = FILE_PATHS.get(file_key)
     # 1) key must exist
     if file_path is None:
-        return jsonify({"error": f"Unknown file key '{file_key}'"}), 404
+        return None, (jsonify({"error": f"Unknown file key '{file_key}'"}), 404)
 
     # 2) file must exist on disk
     if not os.path.isfile(file_path):
-        return jsonify({"error": f"File not found on server: {file_path}"}), 404
+        return None, (jsonify({"error": f"File not found on server: {file_path}"}), 404)
+    return file_path, None
+
+def not_modified(etag, last_modified):
+    """
+    True if the request's validators still match the file.
+    """
+    if request.if_none_match:
+        return request.if_none_match.contains_weak(etag)
+    if request.if_modified_since:
+        return int(last_modified) <= request.if_modified_since.timestamp()
+    return False
+
+@app.route("/api/download/<file_key>", methods=["GET"])
+def download_file(file_key):
+    """
+    Download one of the pre-registered files.
+    e.g. /api/download/cu_log  or  /api/download/du_log
+
+    Supports If-None-Match / If-Modified-Since and Range requests. Clients
+    that accept gzip get the file compressed on the fly (without Range);
+    otherwise the file object is handed to the WSGI server as is, which
+    lets servers that support wsgi.file_wrapper send it with sendfile.
+    """
+    file_path, error = resolve_file_key(file_key)
+    if error:
+        return error
+
+    reader = LogReader(file_path)
+    st = reader.stat()
+    etag = LogReader.etag(st)
+
+    if "gzip" in request.headers.get("Accept-Encoding", "") and not request.range:
+        gzip_etag = etag + "-gz"
+        headers = {
+            "ETag": f'W/"{gzip_etag}"',
+            "Last-Modified": http_date(st.st_mtime),
+            "Vary": "Accept-Encoding",
+        }
+        if not_modified(gzip_etag, st.st_mtime):
+            return Response(status=304, headers=headers)
+        headers["Content-Encoding"] = "gzip"
+        headers["Content-Disposition"] = f'attachment; filename="{os.path.basename(file_path)}"'
+        # only the bytes that existed when the request started are sent
+        return Response(reader.gzip_chunks(0, st.st_size), mimetype="text/plain", headers=headers)
 
     # 3) send it as an attachment (will trigger Save‐As in the browser)
-    return send_file(
+    response = send_file(
         file_path,
         as_attachment=True,
         download_name=os.path.basename(file_path),
         mimetype="text/plain",
+        conditional=True,
+        etag=etag,
+        last_modified=st.st_mtime,
     )
+    response.headers["Vary"] = "Accept-Encoding"
+    return response
+
+@app.route("/api/logs/<file_key>", methods=["GET"])
+def read_log(file_key):
+    """
+    Page through a log without downloading it.
+
+      ?tail=N[&before_offset=X]   last N lines (ending before byte X)
+      ?from_offset=X[&lines=N]    N lines starting at byte X
+
+    Pages start and end on line boundaries; pass start_offset back as
+    before_offset (older) or end_offset as from_offset (newer) to continue.
+    """
+    file_path, error = resolve_file_key(file_key)
+    if error:
+        return error
+
+    reader = LogReader(file_path)
+    st = reader.stat()
+    etag = LogReader.etag(st)
+    # always revalidate: without no-cache browsers may heuristically cache
+    # the tail a LogCard polls
+    headers = {"ETag": f'"{etag}"', "Last-Modified": http_date(st.st_mtime),
+               "Cache-Control": "no-cache"}
+    if not_modified(etag, st.st_mtime):
+        return Response(status=304, headers=headers)
+
+    try:
+        if "from_offset" in request.args:
+            page = reader.read_from(int(request.args["from_offset"]),
+                                    int(request.args.get("lines", 500)))
+        else:
+            before = request.args.get("before_offset")
+            page = reader.tail(int(request.args.get("tail", 500)),
+                               int(before) if before is not None else None)
+    except ValueError:
+        return jsonify({"error": "tail, lines and offsets must be integers"}), 400
+
+    page["file"] = file_key
+    response = jsonify(page)
+    response.headers.update(headers)
+    return response
+
+# Background line indexes so searches don't need a full download. The token
+# index (whole-word lookups) costs memory per distinct token, so it is only
+# kept for the logs listed here.
+TOKEN_INDEXED_LOGS = ("setup_log",)
+SEARCH_TIME_BUDGET = 5.0   # seconds a single search may spend scanning
+log_indexes = {
+    key: LogIndex(path, index_tokens=key in TOKEN_INDEXED_LOGS)
+    for key, path in FILE_PATHS.items()
+}
+log_indexer = AttributeScheduler(name="log_indexer")
+log_files = {}   # file key -> {"size", "mtime"} as last published on /api/stream
+
+def on_log_changed(file_key, event):
+    log_indexer.trigger(file_key)
+    try:
+        st = os.stat(event.path)
+        log_files[file_key] = {"size": st.st_size, "mtime": st.st_mtime}
+    except OSError:
+        log_files[file_key] = None
+    broadcaster.publish("logs", dict(log_files))
+
+for key, index in log_indexes.items():
+    log_indexer.add_job(key, index.poll, WATCH_RESYNC_INTERVAL)
+    file_watcher.watch(index.path, lambda event, key=key: on_log_changed(key, event))
+log_indexer.start()
+
+@app.route("/api/logs/<file_key>/search", methods=["GET"])
+def search_log(file_key):
+    """
+    Search a log with a regular expression and stream the matches as
+    newline-delimited JSON, one object per matching line, followed by a
+    summary object.
+
+      ?q=REGEX           pattern to search for (required)
+      &word=1            whole-word match (uses the token index if kept)
+      &ignore_case=1     case-insensitive
+      &context=N         N lines of context before and after (max 20)
+      &limit=N           stop after N matches (default 100, max 1000)
+      &from_line=N       start at 1-based line N
+    """
+    index = log_indexes.get(file_key)
+    if index is None:
+        return jsonify({"error": f"Unknown file key '{file_key}'"}), 404
+    pattern = request.args.get("q")
+    if not pattern:
+        return jsonify({"error": "Missing search pattern 'q'"}), 400
+    try:
+        context = max(0, min(request.args.get("context", 0, type=int), 20))
+        limit = max(1, min(request.args.get("limit", 100, type=int), 1000))
+        from_line = max(0, request.args.get("from_line", 1, type=int) - 1)
+        word = request.args.get("word") in ("1", "true")
+        ignore_case = request.args.get("ignore_case") in ("1", "true")
+        results = index.search(pattern, ignore_case=ignore_case, word=word, context=context,
+                               limit=limit, from_line=from_line,
+                               deadline=time.monotonic() + SEARCH_TIME_BUDGET)
+        # compile errors surface on the first step, before we commit to a 200
+        first = next(results, None)
+    except re.error as e:
+        return jsonify({"error": f"Invalid pattern: {str(e)}"}), 400
+    except OSError as e:
+        return jsonify({"error": f"Log file unavailable: {str(e)}"}), 404
+
+    def generate():
+        started = time.monotonic()
+        count = 0
+        if first is not None:
+            count += 1
+            yield json.dumps(first) + "\n"
+            for result in results:
+                count += 1
+                yield json.dumps(result) + "\n"
+        yield json.dumps({
+            "done": True,
+            "matches": count,
+            "limit_reached": count >= limit,
+            "indexed_lines": index.line_count,
+            "indexed_bytes": index.indexed_until,
+            "elapsed_ms": round((time.monotonic() - started) * 1000.0, 3),
+        }) + "\n"
+
+    return Response(generate(), mimetype="application/x-ndjson")
+
+# Diagnostics bundle: everything the field team needs from a misbehaving
+# node in one download, streamed as it is compressed.
+COMMISSION_TRANSCRIPTS = "/tmp/gnb_commission_output_*.jsonl"
+BUNDLE_MAX_MB = 256
+
+def bundle_entries():
+    snapshot = {
+        "attributes":  build_attributes(),
+        "node_status": build_node_status(),
+        "readiness":   commissioning.to_dict(),
+        "jobs":        [job.to_dict(tail=0) for job in jobs.list()],
+        "scheduler":   scheduler.status(),
+        "logging":     LogManager.stats(),
+        "file_watcher": file_watcher.status(),
+        # last day at one-minute resolution
+        "history":     {name: metrics_store.query(name, resolution=60)
+                        for name in metrics_store.series()},
+    }
+    entries = [
+        BundleEntry("config/" + os.path.basename(CONFIG_FILE_PATH), path=CONFIG_FILE_PATH, always=True),
+        BundleEntry("state/metrics_snapshot.json",
+                    data=json.dumps(snapshot, indent=2, default=str).encode()),
+    ]
+    for file_key in ("setup_log", "cu_log", "du_log"):
+        entries.extend(DiagnosticsBundle.rotated_chain(FILE_PATHS[file_key]))
+    entries.extend(DiagnosticsBundle.commission_transcripts(COMMISSION_TRANSCRIPTS))
+    return entries
+
+@app.route("/api/diagnostics", methods=["GET"])
+def download_diagnostics():
+    """
+    Stream a tar.gz with the config, a metrics/state snapshot, the CU, DU
+    and setup logs with their rotated backups and the gnb_commission
+    transcripts, plus a MANIFEST.json with sha256 checksums.
+    e.g. /api/diagnostics?since=1700000000&until=1700003600&max_mb=50
+
+    since/until (epoch seconds) drop files with no content in the window;
+    max_mb caps the uncompressed size, oversized logs keep their newest part.
+    """
+    since = request.args.get("since", type=float)
+    until = request.args.get("until", type=float)
+    max_mb = request.args.get("max_mb", BUNDLE_MAX_MB, type=int)
+    if max_mb <= 0 or max_mb > BUNDLE_MAX_MB:
+        return jsonify({"error": f"max_mb must be between 1 and {BUNDLE_MAX_MB}"}), 400
+    if since is not None and until is not None and since > until:
+        return jsonify({"error": "since must not be after until"}), 400
+
+    stamp = datetime.datetime.now().strftime("%Y%m%d-%H%M%S")
+    name = f"diagnostics-{stamp}"
+    bundle = DiagnosticsBundle(bundle_entries(), since=since, until=until,
+                               max_total_bytes=max_mb * 1024 * 1024,
+                               max_file_bytes=min(64, max_mb) * 1024 * 1024, prefix=name)
+    return Response(bundle.stream(), mimetype="application/gzip", headers={
+        "Content-Disposition": f'attachment; filename="{name}.tar.gz"',
+        "Cache-Control": "no-store",
+    })
+
+@app.route("/api/metrics", methods=["GET"])
+def get_metrics():
+    """
+    Internal metrics in the Prometheus text exposition format: request,
+    refresh job and probe latency histograms, subprocess spawns and bytes
+    read from log files.
+    """
+    return Response(REGISTRY.render(), mimetype="text/plain; version=0.0.4")
 
 @app.route("/api/config", methods=["POST"])
 def set_config():
     """
-    Expects JSON { "field":"gnbIP", "value":"1.2.3.4" }
+    Apply one or more config changes as a single atomic transaction.
+
+    Expects JSON { "changes": { "txMaxPower": "20", "scs": "30" } }
+    or the single-field form { "field":"gnbIP", "value":"1.2.3.4" }
     """
+    if not commissioning.ready:
+        return not_ready_response()
     try:
         data = request.get_json(force=True)
-        field = data.get("field")
-        val = data.get("value")
-
-        if radio.edit_config(field, val):
-            # create success response
-            return jsonify({
-                "status": "success",
-                "message": f"Updated {field} to {val}"
-            }), 200
-        else:
-            # create error response
+        changes = data.get("changes")
+        if changes is None:
+            changes = {data.get("field"): data.get("value")}
+        if not isinstance(changes, dict):
             return jsonify({
                 "status": "error",
-                "message": f"Failed to update {field} to {val}"
+                "message": "'changes' must be an object of field -> value"
             }), 400
-            
+
+        snapshot = config_store.apply(changes, allowed_keys=CONFIG_KEYS)
+    except ConfigValidationError as e:
+        return jsonify({
+            "status": "error",
+            "message": f"Failed to update config: {str(e)}",
+            "fields": e.keys
+        }), 400
     except Exception as e:
         return jsonify({
             "status": "error",
             "message": f"Failed to set config: {str(e)}"
         }), 500
 
+    # pick up the new values before the client's follow-up read
+    radio.refresh()
+    core.refresh()
+    scheduler.trigger("core_connection")
+
+    summary = ", ".join(f"{k} to {v}" for k, v in changes.items())
+    return jsonify({
+        "status": "success",
+        "message": f"Updated {summary}",
+        "version": snapshot.version
+    }), 200
+
+def drain(timeout: float):
+    """
+    First step of a graceful shutdown, called by the production server while
+    it still serves requests: refuse new setup_script jobs and wait up to
+    `timeout` seconds for the running ones (e.g. a gNB start) to finish.
+    """
+    logger = LogManager.get_logger('setup_script')
+    jobs.close()
+    if not jobs.wait_idle(timeout):
+        logger.warning(f"Jobs still running after {timeout}s, shutting down anyway")
+
+def shutdown():
+    """
+    Last step of a graceful shutdown: stop the background threads and
+    persist the metrics history.
+    """
+    commissioning.stop()
+    file_watcher.stop()
+    scheduler.stop()
+    prober.stop()
+    metrics_store.flush()
+
+# every job and watch is registered by now, so commissioning may complete
+commissioning.start()
 
+# everything above runs at import; the server binds as soon as it is done
+STARTUP_SECONDS = time.monotonic() - STARTUP_BEGAN
+LogManager.get_logger('startup').info(f"Backend initialised in {STARTUP_SECONDS:.2f}s")
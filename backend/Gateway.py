@@ -0,0 +1,93 @@
+"""
+Fleet gateway mode of the backend.
+
+Runs on an operator-side machine (or one board) and polls every board's
+API once per interval, so browsers read the aggregated /api/fleet snapshot
+from here instead of each polling every board over the MANET link.
+It does not touch any local gNB hardware or config.
+
+Boards come from the FLEET_BOARDS environment variable (comma separated
+IPs) and can be replaced at runtime with PUT /api/fleet/boards.
+"""
+from flask import Flask, Response, jsonify, request
+from flask_cors import CORS
+import os
+
+from logic.FleetGateway import FleetGateway
+from logic.UpdateBroadcaster import UpdateBroadcaster
+
+BOARD_PORT = int(os.environ.get("FLEET_BOARD_PORT", "5000"))
+POLL_INTERVAL = float(os.environ.get("FLEET_POLL_INTERVAL", "5"))
+POLL_TIMEOUT = float(os.environ.get("FLEET_POLL_TIMEOUT", "3"))
+POLL_WORKERS = int(os.environ.get("FLEET_POLL_WORKERS", "8"))
+
+broadcaster = UpdateBroadcaster()
+
+def publish_fleet(snapshot):
+    # one key per board, so a stream event only carries the boards that changed
+    broadcaster.publish("fleet", snapshot["boards"])
+
+gateway = FleetGateway(
+    boards=[ip for ip in os.environ.get("FLEET_BOARDS", "").split(",") if ip.strip()],
+    port=BOARD_PORT,
+    interval=POLL_INTERVAL,
+    timeout=POLL_TIMEOUT,
+    workers=POLL_WORKERS,
+    on_update=publish_fleet,
+)
+gateway.start()
+
+app = Flask(__name__)
+CORS(app, resources={r"/api/*": {"origins": "*"}})
+
+@app.route("/api/fleet", methods=["GET"])
+def get_fleet():
+    return jsonify(gateway.snapshot()), 200
+
+@app.route("/api/fleet/stream", methods=["GET"])
+def stream_fleet():
+    """
+    Server-Sent Events: a snapshot of every board, then 'fleet' events with
+    only the boards whose cached state changed.
+    """
+    last_event_id = request.headers.get("Last-Event-ID", request.args.get("last_event_id"))
+    try:
+        last_event_id = int(last_event_id) if last_event_id is not None else None
+    except ValueError:
+        last_event_id = None
+    return Response(broadcaster.stream(last_event_id), mimetype="text/event-stream",
+                    headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+@app.route("/api/fleet/boards", methods=["GET"])
+def get_fleet_boards():
+    return jsonify({"boards": gateway.boards()}), 200
+
+@app.route("/api/fleet/boards", methods=["PUT"])
+def set_fleet_boards():
+    """
+    Replace the polled boards.
+    Body: {"boards": ["10.0.0.1", {"ip": "10.0.0.2", "manet_ip": "10.1.0.2"}]}
+    """
+    data = request.get_json(silent=True) or {}
+    boards = data.get("boards")
+    if not isinstance(boards, list) or not all(
+            isinstance(b, str) or (isinstance(b, dict) and isinstance(b.get("ip"), str)) for b in boards):
+        return jsonify({
+            "status": "error",
+            "message": "'boards' must be a list of IPs or {\"ip\": ...} objects"
+        }), 400
+    gateway.set_boards(boards)
+    return jsonify({"status": "success", "boards": gateway.boards()}), 200
+
+@app.route("/api/fleet/<ip>", methods=["GET"])
+def get_fleet_board(ip):
+    board = gateway.board(ip)
+    if board is None:
+        return jsonify({"error": f"Unknown board: {ip}"}), 404
+    return jsonify(board), 200
+
+def shutdown():
+    """
+    Stop polling the boards; called by the production server on exit.
+    """
+    gateway.stop(5.0)
@@ -1,5 +1,29 @@
-from Flask import app
+import os
 
-if __name__ == "__main__":
-    app.run(host='0.0.0.0', port=5000, debug=True)
+# WEBDASHBOARD_MODE=gateway serves the aggregated /api/fleet API instead of
+# this board's own API
+if os.environ.get("WEBDASHBOARD_MODE") == "gateway":
+    import Gateway as backend
+else:
+    import Flask as backend
+app = backend.app
+
+# Production server settings
+HOST = os.environ.get("WEBDASHBOARD_HOST", "0.0.0.0")
+PORT = int(os.environ.get("WEBDASHBOARD_PORT", "5000"))
+WORKERS = int(os.environ.get("WEBDASHBOARD_WORKERS", "16"))              # request threads
+MAX_PENDING = int(os.environ.get("WEBDASHBOARD_MAX_PENDING", "64"))      # queued connections before 503
+MAX_STREAMS = int(os.environ.get("WEBDASHBOARD_MAX_STREAMS", "8"))       # concurrent event streams
+KEEPALIVE_S = float(os.environ.get("WEBDASHBOARD_KEEPALIVE_S", "5"))     # idle keep-alive timeout
+DRAIN_TIMEOUT_S = float(os.environ.get("WEBDASHBOARD_DRAIN_TIMEOUT_S", "150"))  # wait for jobs on shutdown
 
+if __name__ == "__main__":
+    if os.environ.get("WEBDASHBOARD_DEBUG") == "1":
+        # Werkzeug development server with reloader and debugger; never on a board
+        app.run(host=HOST, port=PORT, debug=True)
+    else:
+        from logic.PooledServer import PooledWSGIServer, serve
+        server = PooledWSGIServer(HOST, PORT, app, workers=WORKERS, max_pending=MAX_PENDING,
+                                  max_streams=MAX_STREAMS, keepalive_timeout=KEEPALIVE_S)
+        serve(server, drain=getattr(backend, "drain", None), stop=getattr(backend, "shutdown", None),
+              drain_timeout=DRAIN_TIMEOUT_S)
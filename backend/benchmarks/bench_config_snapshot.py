@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Benchmark RadioAttr/CoreAttr refreshes against the shared ConfigStore.
+
+Shows that in steady state a refresh costs one stat and no re-parse, and
+that a changed file is parsed exactly once no matter how many readers.
+
+Usage: python3 benchmarks/bench_config_snapshot.py [iterations]
+"""
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from logic.ConfigStore import ConfigStore
+from logic.attributes.RadioAttr import RadioAttr
+from logic.attributes.CoreAttr import CoreAttr
+
+SAMPLE_CONFIG = {
+    "gNBId": "1", "gNBIdLength": "22", "band": "78", "scs": "30",
+    "txMaxPower": "23", "dl_centre_freq": "3549.12",
+    "MCC": "001", "MNC": "01", "cellLocalId": "1", "nrTAC": "1",
+    "n2_local_ip": "192.168.2.2", "n3_local_ip": "192.168.2.2",
+    "n2_remote_ip": "192.168.2.10", "n3_remote_ip": "192.168.2.10",
+    "sst": "1", "sd": "000001", "profile": "40MHz_MET_2x2",
+}
+
+
+def main(iterations: int = 100000):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "gnb_webdashboard.json")
+        with open(path, "w") as f:
+            json.dump(SAMPLE_CONFIG, f, indent=2)
+
+        radio = RadioAttr(path)
+        core = CoreAttr(path)
+        store = ConfigStore.for_path(path)
+
+        start = time.perf_counter()
+        for _ in range(iterations):
+            radio.refresh()
+            core.refresh()
+        elapsed = time.perf_counter() - start
+
+        print(f"{iterations} x (RadioAttr + CoreAttr) refresh: "
+              f"{elapsed / iterations * 1e6:.2f} us per pair")
+        print(f"  parses: {store.parses}  cache hits: {store.hits}")
+
+        store.apply({"txMaxPower": "20"})
+        radio.refresh()
+        core.refresh()
+        print(f"after one edit -> parses: {store.parses}  tx_power: {radio.tx_Power}")
+
+        if store.parses != 2:
+            print("FAIL: expected exactly one parse per file version")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000))
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Benchmark the gnb_commission dialog against the fake gnb_commission, no
+board needed.
+
+Runs the commissioning dialog --runs times, checks the config was written
+under the requested filename and reports the total time and the median
+wait per prompt. One more run has every prompt line prefixed ("Enter
+Service Differentiator [000001]: "), which must be answered the same way.
+The first run's transcript is then played back through
+the fake (gnb_commission -g --replay) and the replayed dialog must answer
+the same prompts in the same order. --replay plays back a given transcript
+instead, e.g. one copied from /tmp/gnb_commission_output_*.jsonl on a board.
+
+Usage:
+  python3 benchmarks/commission_bench.py [--runs 5] [--delay 0] [--record out.jsonl]
+                                         [--replay transcript.jsonl [--realtime]]
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FAKES_DIR = os.path.join(BACKEND_DIR, "benchmarks", "fakes")
+sys.path.insert(0, BACKEND_DIR)
+
+FILENAME = "gnb_webdashboard.json"
+
+
+def report(name: str, runs):
+    totals = [result.elapsed * 1000.0 for result in runs]
+    print(f"{name}: {len(runs)} runs, total ms median {statistics.median(totals):.1f} "
+          f"min {min(totals):.1f} max {max(totals):.1f}")
+    waits = {}
+    for result in runs:
+        for step in result.steps:
+            waits.setdefault(step["prompt"], []).append(step["wait_ms"])
+    for prompt, values in waits.items():
+        print(f"  {prompt:<24} x{len(values) // len(runs):<3} median wait {statistics.median(values):7.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--delay", type=float, default=0.0,
+                        help="seconds the fake pauses before each prompt")
+    parser.add_argument("--record", help="keep the first run's transcript here")
+    parser.add_argument("--replay", help="play back this transcript instead of a live run")
+    parser.add_argument("--realtime", action="store_true", help="keep the recorded gaps on replay")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["WEBDASHBOARD_LOG_DIR"] = os.path.join(tmp, "logdump")
+        os.environ["FAKE_GNB_CONFIG_DIR"] = tmp
+        os.environ["FAKE_GNB_COMMISSION_DELAY"] = str(args.delay)
+        from logic.Commissioning import run_gnb_commission
+        from logic.PromptDialog import Transcript
+        fake = os.path.join(FAKES_DIR, "gnb_commission")
+        failed = False
+
+        transcript = args.replay
+        if transcript is None:
+            transcript = args.record or os.path.join(tmp, "transcript.jsonl")
+            runs = []
+            for n in range(args.runs):
+                config = os.path.join(tmp, FILENAME)
+                if os.path.exists(config):
+                    os.remove(config)
+                result, _, status = run_gnb_commission(
+                    FILENAME, command=f"{sys.executable} {fake} -g",
+                    transcript_path=transcript if n == 0 else None)
+                if not result.completed or status != 0 or not os.path.exists(config):
+                    print(f"FAIL: run {n + 1}: {result.error or f'exit status {status}'}, "
+                          f"config written: {os.path.exists(config)}")
+                    failed = True
+                runs.append(result)
+            report("live", runs)
+            with open(os.path.join(tmp, FILENAME)) as f:
+                print(f"  config: {len(json.load(f))} keys in {FILENAME}")
+
+            os.remove(os.path.join(tmp, FILENAME))
+            os.environ["FAKE_GNB_COMMISSION_PREFIX"] = "Enter "
+            result, _, status = run_gnb_commission(FILENAME, command=f"{sys.executable} {fake} -g")
+            del os.environ["FAKE_GNB_COMMISSION_PREFIX"]
+            report("prefixed", [result])
+            if not result.completed or status != 0 or not os.path.exists(os.path.join(tmp, FILENAME)):
+                print(f"FAIL: prefixed prompts: {result.error or f'exit status {status}'}, "
+                      f"config written: {os.path.exists(os.path.join(tmp, FILENAME))}")
+                failed = True
+
+        expected = [event["prompt"] for event in Transcript.load(transcript) if "in" in event]
+        extra = " --realtime" if args.realtime else ""
+        result, _, status = run_gnb_commission(
+            FILENAME, command=f"{sys.executable} {fake} -g --replay {transcript}{extra}")
+        report("replay", [result])
+        answered = [step["prompt"] for step in result.steps]
+        if not result.completed or answered != expected:
+            print(f"FAIL: replay answered {answered}, recorded {expected} ({result.error})")
+            failed = True
+        if args.record:
+            print(f"Transcript written to {args.record}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,272 @@
+"""
+A fake board on the local filesystem, for running the backend on any
+Linux machine.
+
+FixtureBoard builds a directory with the files the attributes read
+(/proc/stat, /proc/meminfo, /proc/net/dev, /sys/class/hwmon,
+/sys/class/thermal and /sys/class/net), a vendor tree with the fake
+gnb_ctl and gnb_commission from benchmarks/fakes, a commissioning config
+and synthetic CU/DU logs. environ() gives the WEBDASHBOARD_* overrides
+that point Flask.py at it; tick() advances the counters the way a busy
+board would, and start_ticker() does so once a second in the background.
+"""
+import json
+import os
+import random
+import shutil
+import tempfile
+import threading
+import time
+
+FAKES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fakes")
+
+SAMPLE_CONFIG = {
+    "gNBId": "1", "gNBIdLength": "22", "band": "78", "scs": "30",
+    "txMaxPower": "23", "dl_centre_freq": "3549.12",
+    "MCC": "001", "MNC": "01", "cellLocalId": "1", "nrTAC": "1",
+    "n2_local_ip": "127.0.0.1", "n3_local_ip": "127.0.0.1",
+    "n2_remote_ip": "127.0.0.1", "n3_remote_ip": "127.0.0.1",
+    "sst": "1", "sd": "000001", "profile": "40MHz_MET_2x2",
+}
+
+# name -> (rx bytes/s, tx bytes/s) while ticking
+INTERFACES = {
+    "lo":    (2000, 2000),
+    "eth0":  (1500000, 400000),
+    "eth1":  (20000, 20000),
+    "gtp0":  (12000000, 3000000),
+    "wlan0": (50000, 80000),
+}
+
+# (hwmon chip, [(label, max °C, crit °C)])
+HWMON_CHIPS = (
+    ("coretemp", [("Package id 0", 85, 100), ("Core 0", 85, 100), ("Core 1", 85, 100)]),
+    ("soc_thermal", [("soc", 90, 105)]),
+)
+
+CU_LINES = (
+    "[CU] [NGAP] NG Setup Response received from AMF",
+    "[CU] [RRC] UE context setup complete ue_id={n}",
+    "[CU] [PDCP] DL SDU tx count={n}",
+    "[CU] [F1AP] UE context modification response ue_id={n}",
+    "[CU] [GTPU] tunnel created teid=0x{n:08x}",
+)
+DU_LINES = (
+    "[DU] [MAC] slot={n} dl_bytes=1350 ul_bytes=220 harq_ack=1",
+    "[DU] [PHY] PUSCH snr=23.4 rsrp=-84 ue_id={n}",
+    "[DU] [SCHED] dl_mcs=27 ul_mcs=20 prbs=106",
+    "[DU] [RLC] retx count={n}",
+)
+
+
+class FixtureBoard:
+
+    def __init__(self, root: str = None, cores: int = 4, log_mb: float = 8.0,
+                 gnb_processes: int = 4, with_config: bool = True, seed: int = 1):
+        self._owns_root = root is None
+        self.root = root or tempfile.mkdtemp(prefix="webdashboard-fixture-")
+        self.cores = cores
+        self.log_mb = log_mb
+        self.gnb_processes = gnb_processes
+        self.with_config = with_config
+        self._random = random.Random(seed)
+        self._cpu = [[0] * 8 for _ in range(cores)]
+        self._net = {name: [0] * 8 for name in INTERFACES}
+        self._temp_inputs = []        # (path, base °C)
+        self._ticker = None
+        self._stop = threading.Event()
+
+        self.proc_root = os.path.join(self.root, "proc")
+        self.sys_class = os.path.join(self.root, "sys", "class")
+        self.vendor_root = os.path.join(self.root, "opt", "ste")
+        self.config_path = os.path.join(self.vendor_root, "active", "commissioning", "configs",
+                                        "gnb_webdashboard.json")
+        self.gnb_log_dir = os.path.join(self.root, "logdump")
+        self.log_dir = os.path.join(self.root, "webdashboard", "logdump")
+
+    def build(self):
+        for directory in (self.proc_root, os.path.join(self.proc_root, "net"), self.sys_class,
+                          os.path.join(self.vendor_root, "bin"), os.path.dirname(self.config_path),
+                          self.gnb_log_dir, self.log_dir):
+            os.makedirs(directory, exist_ok=True)
+        for tool in ("gnb_ctl", "gnb_commission"):
+            link = os.path.join(self.vendor_root, "bin", tool)
+            if not os.path.exists(link):
+                os.symlink(os.path.join(FAKES_DIR, tool), link)
+        if self.with_config:
+            with open(self.config_path, "w") as f:
+                json.dump(SAMPLE_CONFIG, f, indent=4)
+        self._write_meminfo()
+        self._build_hwmon()
+        self._build_thermal()
+        self.write_logs()
+        self.tick()
+        return self
+
+    def environ(self):
+        """
+        Environment for a backend process that should run on this board.
+        """
+        env = dict(os.environ)
+        env.update({
+            "WEBDASHBOARD_VENDOR_ROOT": self.vendor_root,
+            "WEBDASHBOARD_CONFIG":      self.config_path,
+            "WEBDASHBOARD_GNB_LOG_DIR": self.gnb_log_dir,
+            "WEBDASHBOARD_LOG_DIR":     self.log_dir,
+            "WEBDASHBOARD_PROC_ROOT":   self.proc_root,
+            "WEBDASHBOARD_SYS_CLASS":   self.sys_class,
+            "FAKE_GNB_PROCESSES":       str(self.gnb_processes),
+            "FAKE_GNB_DU_LOG":          os.path.join(self.gnb_log_dir, "du_log.txt"),
+            "PATH":                     os.path.join(self.vendor_root, "bin") + os.pathsep
+                                        + os.environ.get("PATH", ""),
+        })
+        return env
+
+    # --------------------------------------------------------------- counters
+
+    def tick(self, seconds: float = 1.0):
+        """
+        Advance every counter by `seconds` of activity and rewrite the files.
+        Files are rewritten in place, as sysfs attributes keep their inode.
+        """
+        jiffies = int(100 * seconds)
+        for core in self._cpu:
+            busy = self._random.uniform(0.05, 0.9)
+            user = int(jiffies * busy * 0.7)
+            system = int(jiffies * busy * 0.25)
+            irq = int(jiffies * busy * 0.05)
+            core[0] += user
+            core[2] += system
+            core[5] += irq
+            core[3] += jiffies - user - system - irq
+        self._write_stat()
+
+        for name, (rx_rate, tx_rate) in INTERFACES.items():
+            counters = self._net[name]
+            rx = int(rx_rate * seconds * self._random.uniform(0.5, 1.5))
+            tx = int(tx_rate * seconds * self._random.uniform(0.5, 1.5))
+            counters[0] += rx
+            counters[1] += rx // 1200 + 1
+            counters[4] += tx
+            counters[5] += tx // 1200 + 1
+        self._write_net_dev()
+        self._write_sys_net()
+
+        for path, base in self._temp_inputs:
+            self._rewrite(path, f"{int((base + self._random.uniform(-3, 3)) * 1000)}\n")
+
+    def start_ticker(self, interval: float = 1.0):
+        def run():
+            while not self._stop.wait(interval):
+                self.tick(interval)
+        self._ticker = threading.Thread(target=run, name="fixture_ticker", daemon=True)
+        self._ticker.start()
+
+    def close(self):
+        self._stop.set()
+        if self._ticker is not None:
+            self._ticker.join()
+        if self._owns_root:
+            shutil.rmtree(self.root, ignore_errors=True)
+
+    @staticmethod
+    def _rewrite(path: str, text: str):
+        with open(path, "w") as f:
+            f.write(text)
+
+    def _write_stat(self):
+        total = [sum(column) for column in zip(*self._cpu)]
+        lines = ["cpu  " + " ".join(map(str, total)) + " 0 0"]
+        lines += [f"cpu{i} " + " ".join(map(str, core)) + " 0 0" for i, core in enumerate(self._cpu)]
+        lines += ["intr 0", "ctxt 123456", "btime 1700000000", "processes 4242",
+                  "procs_running 2", "procs_blocked 0"]
+        self._rewrite(os.path.join(self.proc_root, "stat"), "\n".join(lines) + "\n")
+
+    def _write_meminfo(self):
+        self._rewrite(os.path.join(self.proc_root, "meminfo"), (
+            "MemTotal:        8038576 kB\n"
+            "MemFree:         3120044 kB\n"
+            "MemAvailable:    5412880 kB\n"
+            "Buffers:          210332 kB\n"
+            "Cached:          2140224 kB\n"
+            "SwapCached:            0 kB\n"
+            "SwapTotal:             0 kB\n"
+            "SwapFree:              0 kB\n"
+        ))
+
+    def _write_net_dev(self):
+        lines = [
+            "Inter-|   Receive                                                |  Transmit",
+            " face |bytes    packets errs drop fifo frame compressed multicast|"
+            "bytes    packets errs drop fifo colls carrier compressed",
+        ]
+        for name, c in self._net.items():
+            lines.append(f"{name:>6}: {c[0]} {c[1]} {c[2]} {c[3]} 0 0 0 0 "
+                         f"{c[4]} {c[5]} {c[6]} {c[7]} 0 0 0 0")
+        self._rewrite(os.path.join(self.proc_root, "net", "dev"), "\n".join(lines) + "\n")
+
+    def _write_sys_net(self):
+        # the same counters as /proc/net/dev, in the per-attribute sysfs layout
+        names = ("rx_bytes", "rx_packets", "rx_errors", "rx_dropped",
+                 "tx_bytes", "tx_packets", "tx_errors", "tx_dropped")
+        for ifindex, (name, counters) in enumerate(self._net.items(), 1):
+            device = os.path.join(self.sys_class, "net", name)
+            stats = os.path.join(device, "statistics")
+            if not os.path.isdir(stats):
+                os.makedirs(stats)
+                self._rewrite(os.path.join(device, "ifindex"), f"{ifindex}\n")
+                self._rewrite(os.path.join(device, "operstate"),
+                              "unknown\n" if name in ("lo", "gtp0") else "up\n")
+                self._rewrite(os.path.join(device, "mtu"), "65536\n" if name == "lo" else "1500\n")
+            for stat, value in zip(names, counters):
+                self._rewrite(os.path.join(stats, stat), f"{value}\n")
+
+    def _build_hwmon(self):
+        self._temp_inputs = []
+        for i, (chip, sensors) in enumerate(HWMON_CHIPS):
+            device = os.path.join(self.sys_class, "hwmon", f"hwmon{i}")
+            os.makedirs(device, exist_ok=True)
+            self._rewrite(os.path.join(device, "name"), chip + "\n")
+            for n, (label, max_c, crit_c) in enumerate(sensors, start=1):
+                base = os.path.join(device, f"temp{n}")
+                self._rewrite(base + "_label", label + "\n")
+                self._rewrite(base + "_max", f"{max_c * 1000}\n")
+                self._rewrite(base + "_crit", f"{crit_c * 1000}\n")
+                self._rewrite(base + "_input", "45000\n")
+                self._temp_inputs.append((base + "_input", 45.0 + 5 * n))
+
+    def _build_thermal(self):
+        device = os.path.join(self.sys_class, "thermal", "thermal_zone0")
+        os.makedirs(device, exist_ok=True)
+        self._rewrite(os.path.join(device, "type"), "cpu-thermal\n")
+        self._rewrite(os.path.join(device, "trip_point_0_type"), "passive\n")
+        self._rewrite(os.path.join(device, "trip_point_0_temp"), "80000\n")
+        self._rewrite(os.path.join(device, "trip_point_1_type"), "critical\n")
+        self._rewrite(os.path.join(device, "trip_point_1_temp"), "105000\n")
+        self._rewrite(os.path.join(device, "temp"), "48000\n")
+        self._temp_inputs.append((os.path.join(device, "temp"), 48.0))
+
+    # -------------------------------------------------------------------- logs
+
+    def write_logs(self):
+        """
+        CU and DU logs of `log_mb` MiB each; the DU log ends with the cell up.
+        """
+        for name, templates in (("cu_log.txt", CU_LINES), ("du_log.txt", DU_LINES)):
+            path = os.path.join(self.gnb_log_dir, name)
+            target = int(self.log_mb * 1024 * 1024)
+            start = time.time() - 3600
+            written = 0
+            n = 0
+            with open(path, "w") as f:
+                while written < target:
+                    chunk = []
+                    for _ in range(1000):
+                        stamp = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(start + n * 0.01))
+                        chunk.append(f"{stamp}.{n % 1000:03d} {templates[n % len(templates)].format(n=n)}\n")
+                        n += 1
+                    text = "".join(chunk)
+                    f.write(text)
+                    written += len(text)
+                if name == "du_log.txt":
+                    f.write(f"{time.strftime('%Y-%m-%d %H:%M:%S')} [DU] CELL_IS_UP, CELL_ID:1\n")
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Run the fleet gateway against locally launched stand-in boards.
+
+Starts N fake boards on loopback addresses (each serving /api/attributes and
+/api/node_status, one of them slower than the poll timeout) plus one port
+nobody listens on, polls them with FleetGateway for a while and checks
+that every live board was polled about once per interval, the slow and
+dead ones backed off, and the snapshot has the expected statuses.
+
+Usage: python3 benchmarks/fleet_standin.py [boards] [seconds]
+"""
+import json
+import os
+import socket
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from logic.FleetGateway import FleetGateway
+
+INTERVAL = 0.5
+TIMEOUT = 0.3
+
+
+class StandInBoard(BaseHTTPRequestHandler):
+    def do_GET(self):
+        self.server.hits += 1
+        time.sleep(self.server.delay)
+        if self.path == "/api/attributes":
+            body = {"cpu_usage": 12.5, "ram_usage": 40.0, "port": self.server.server_port}
+        elif self.path == "/api/node_status":
+            body = {"node_status": "RUNNING", "processes_down": []}
+        else:
+            self.send_error(404)
+            return
+        data = json.dumps(body).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        try:
+            self.wfile.write(data)
+        except (BrokenPipeError, ConnectionResetError):
+            pass   # the gateway gave up on us (the slow board)
+
+    def log_message(self, *args):
+        pass
+
+
+def start_board(host: str, delay: float = 0.0):
+    server = ThreadingHTTPServer((host, 0), StandInBoard)
+    server.hits = 0
+    server.delay = delay
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def free_port(host: str):
+    with socket.socket() as s:
+        s.bind((host, 0))
+        return s.getsockname()[1]
+
+
+def main(count: int = 10, seconds: float = 5.0):
+    # the gateway keys boards by IP, so every stand-in gets its own loopback address
+    boards = [start_board(f"127.0.0.{i + 2}") for i in range(count)]
+    slow = start_board("127.0.1.1", delay=TIMEOUT * 2)
+    targets = [{"ip": b.server_address[0], "port": b.server_port} for b in boards]
+    slow_target = {"ip": "127.0.1.1", "port": slow.server_port}
+    dead_target = {"ip": "127.0.1.2", "port": free_port("127.0.1.2")}
+
+    gateway = FleetGateway(targets + [slow_target, dead_target],
+                           interval=INTERVAL, timeout=TIMEOUT, workers=4)
+    gateway.start()
+    time.sleep(seconds)
+    gateway.stop(timeout=5)
+
+    snapshot = gateway.snapshot()["boards"]
+    expected_polls = seconds / INTERVAL
+    hits = [b.hits // 2 for b in boards]   # two endpoints per poll
+    print(f"{count} boards, {seconds:.0f} s at {INTERVAL}s interval: "
+          f"polls per board min {min(hits)} max {max(hits)} (ideal {expected_polls:.0f})")
+    print(f"  slow board: {snapshot[slow_target['ip']]['status']} "
+          f"after {slow.hits // 2} polls, failures {snapshot[slow_target['ip']]['failures']}")
+    print(f"  dead board: {snapshot[dead_target['ip']]['status']}, "
+          f"failures {snapshot[dead_target['ip']]['failures']}")
+    latencies = sorted(snapshot[t["ip"]]["latency_ms"] for t in targets)
+    print(f"  latency ms: median {latencies[len(latencies) // 2]} max {latencies[-1]}")
+
+    ok = (all(snapshot[t["ip"]]["status"] == "ok" for t in targets)
+          and min(hits) >= expected_polls * 0.6 and max(hits) <= expected_polls + 2
+          and snapshot[slow_target["ip"]]["status"] == "unreachable"
+          and snapshot[dead_target["ip"]]["status"] == "unreachable"
+          and snapshot[dead_target["ip"]]["failures"] < expected_polls / 2)
+    if not ok:
+        print("FAIL")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(int(sys.argv[1]) if len(sys.argv) > 1 else 10,
+                  float(sys.argv[2]) if len(sys.argv) > 2 else 5.0))
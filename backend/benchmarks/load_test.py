@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+"""
+Load-test the backend API with many concurrent clients, no board needed.
+
+By default the backend runs in a child process against a FixtureBoard
+(fake /proc and /sys trees, fake gnb_ctl and gnb_commission, synthetic
+CU/DU logs of --log-mb MiB each) whose counters tick once a second.
+With --url the clients hit an already running backend instead, e.g. a
+real board.
+
+Each endpoint is loaded for --duration seconds by --clients threads, each
+on its own keep-alive connection. Reported per endpoint: requests per
+second, p50/p90/p99/max latency in ms and the status codes seen. For the
+fixture board the cold start is reported too: seconds until the backend
+served requests and until /api/ready said it was commissioned. Results
+are written as JSON; with --baseline an earlier result file is compared
+and the exit status is 1 if p99 or throughput regressed by more than
+--threshold.
+
+Usage:
+  python3 benchmarks/load_test.py [--clients 16] [--duration 10] [--log-mb 8]
+                                  [--output results.json] [--baseline old.json]
+                                  [--commission] [--url http://board:5000]
+"""
+import argparse
+import http.client
+import json
+import os
+import platform
+import subprocess
+import sys
+import threading
+import time
+from urllib.parse import urlsplit
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+# name -> (method, path, JSON body, extra headers)
+ENDPOINTS = {
+    "attributes":   ("GET", "/api/attributes", None, {}),
+    "node_status":  ("GET", "/api/node_status", None, {}),
+    "download":     ("GET", "/api/download/cu_log", None, {"Accept-Encoding": "identity"}),
+    "setup_script": ("POST", "/api/setup_script", {"action": "status"}, {}),
+}
+
+
+def percentile(sorted_values, pct: float):
+    """
+    Nearest-rank percentile of an already sorted list.
+    """
+    if not sorted_values:
+        return None
+    rank = max(1, int(round(pct / 100.0 * len(sorted_values))))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+class Client(threading.Thread):
+    """
+    One keep-alive connection issuing the same request until the deadline.
+    """
+
+    def __init__(self, host: str, port: int, endpoint, deadline: float):
+        super().__init__(daemon=True)
+        self.host = host
+        self.port = port
+        self.method, self.path, body, headers = endpoint
+        self.body = json.dumps(body).encode() if body is not None else None
+        self.headers = dict(headers)
+        if self.body is not None:
+            self.headers["Content-Type"] = "application/json"
+        self.deadline = deadline
+        self.latencies = []
+        self.statuses = {}
+        self.errors = 0
+        self.bytes = 0
+
+    def run(self):
+        conn = http.client.HTTPConnection(self.host, self.port, timeout=30)
+        while time.perf_counter() < self.deadline:
+            start = time.perf_counter()
+            try:
+                conn.request(self.method, self.path, body=self.body, headers=self.headers)
+                response = conn.getresponse()
+                data = response.read()
+            except (OSError, http.client.HTTPException):
+                self.errors += 1
+                conn.close()
+                conn = http.client.HTTPConnection(self.host, self.port, timeout=30)
+                continue
+            self.latencies.append(time.perf_counter() - start)
+            self.statuses[response.status] = self.statuses.get(response.status, 0) + 1
+            self.bytes += len(data)
+        conn.close()
+
+
+def run_endpoint(host: str, port: int, endpoint, clients: int, duration: float):
+    deadline = time.perf_counter() + duration
+    workers = [Client(host, port, endpoint, deadline) for _ in range(clients)]
+    start = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    elapsed = time.perf_counter() - start
+
+    latencies = sorted(l for w in workers for l in w.latencies)
+    statuses = {}
+    for worker in workers:
+        for status, count in worker.statuses.items():
+            statuses[str(status)] = statuses.get(str(status), 0) + count
+    count = len(latencies)
+    ms = lambda v: round(v * 1000.0, 3) if v is not None else None
+    return {
+        "requests":      count,
+        "errors":        sum(w.errors for w in workers),
+        "statuses":      statuses,
+        "rps":           round(count / elapsed, 1) if elapsed else None,
+        "p50_ms":        ms(percentile(latencies, 50)),
+        "p90_ms":        ms(percentile(latencies, 90)),
+        "p99_ms":        ms(percentile(latencies, 99)),
+        "max_ms":        ms(latencies[-1] if latencies else None),
+        "mean_ms":       ms(sum(latencies) / count if count else None),
+        "bytes_per_req": int(sum(w.bytes for w in workers) / count) if count else 0,
+    }
+
+
+def wait_ready(host: str, port: int, timeout: float, path: str = "/api/node_status") -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            conn = http.client.HTTPConnection(host, port, timeout=2)
+            conn.request("GET", path)
+            if conn.getresponse().status == 200:
+                conn.close()
+                return True
+        except (OSError, http.client.HTTPException):
+            pass
+        time.sleep(0.05)
+    return False
+
+
+def start_backend(board, startup_timeout: float, dev_server: bool = False):
+    """
+    Run the backend in a child process on the fixture board.
+
+    Returns:
+        tuple: (process, port, seconds from spawn until it served requests,
+                seconds from spawn until it reported ready, i.e. commissioned)
+    """
+    started = time.monotonic()
+    cmd = [sys.executable, os.path.abspath(__file__), "--serve"] + (["--dev-server"] if dev_server else [])
+    proc = subprocess.Popen(cmd, env=board.environ(), cwd=BACKEND_DIR,
+                            stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
+    port = None
+    for line in proc.stdout:
+        if line.startswith("LISTENING "):
+            port = int(line.split()[1])
+            break
+    # keep draining the child's output so it never blocks on a full pipe
+    threading.Thread(target=proc.stdout.read, daemon=True).start()
+    if port is None or not wait_ready("127.0.0.1", port, startup_timeout):
+        proc.kill()
+        raise RuntimeError("Backend did not start on the fixture board")
+    serving = time.monotonic() - started
+    if not wait_ready("127.0.0.1", port, startup_timeout, "/api/ready"):
+        proc.kill()
+        raise RuntimeError("Backend did not become ready on the fixture board")
+    return proc, port, serving, time.monotonic() - started
+
+
+def serve(dev_server: bool):
+    """
+    Child process: import the app (running its startup) and serve it with
+    the production server, or Werkzeug's development server.
+    """
+    from Flask import app
+    if dev_server:
+        from werkzeug.serving import make_server
+        server = make_server("127.0.0.1", 0, app, threaded=True)
+    else:
+        from logic.PooledServer import PooledWSGIServer
+        server = PooledWSGIServer("127.0.0.1", 0, app)
+    print(f"LISTENING {server.port}", flush=True)
+    server.serve_forever()
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR,
+                              capture_output=True, text=True, timeout=5).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> bool:
+    """
+    Print the change against a baseline result file. Returns True if any
+    endpoint's p99 grew or its throughput fell by more than `threshold`.
+    """
+    regressed = False
+    print(f"\nAgainst baseline {baseline['meta'].get('git_commit')} "
+          f"({baseline['meta'].get('timestamp')}):")
+    for name, current in results["results"].items():
+        old = baseline["results"].get(name)
+        if not old or not old.get("p99_ms") or not old.get("rps"):
+            continue
+        p99_change = current["p99_ms"] / old["p99_ms"] - 1.0
+        rps_change = current["rps"] / old["rps"] - 1.0
+        bad = p99_change > threshold or rps_change < -threshold
+        regressed = regressed or bad
+        print(f"  {name:<13} p99 {p99_change:+7.1%}   rps {rps_change:+7.1%}"
+              f"{'   REGRESSION' if bad else ''}")
+    return regressed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--clients", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds per endpoint")
+    parser.add_argument("--endpoints", default=",".join(ENDPOINTS))
+    parser.add_argument("--log-mb", type=float, default=8.0, help="size of each synthetic log")
+    parser.add_argument("--commission", action="store_true",
+                        help="start without a config so startup runs the fake gnb_commission")
+    parser.add_argument("--url", help="load an already running backend instead")
+    parser.add_argument("--dev-server", action="store_true",
+                        help="serve with Werkzeug's development server instead of the production one")
+    parser.add_argument("--output", default="load_test_results.json")
+    parser.add_argument("--baseline", help="earlier result file to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2)
+    parser.add_argument("--startup-timeout", type=float, default=180.0)
+    parser.add_argument("--serve", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args.dev_server)
+        return 0
+
+    board = proc = None
+    meta = {
+        "timestamp":  time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "git_commit": git_commit(),
+        "python":     platform.python_version(),
+        "platform":   platform.platform(),
+        "cpus":       os.cpu_count(),
+        "clients":    args.clients,
+        "duration_s": args.duration,
+    }
+    try:
+        if args.url:
+            parts = urlsplit(args.url)
+            host, port = parts.hostname, parts.port or 80
+            meta["target"] = args.url
+        else:
+            from fixtures import FixtureBoard
+            board = FixtureBoard(log_mb=args.log_mb, with_config=not args.commission).build()
+            board.start_ticker()
+            proc, port, startup, ready = start_backend(board, args.startup_timeout, args.dev_server)
+            host = "127.0.0.1"
+            meta.update({"target": "fixture", "log_mb": args.log_mb,
+                         "server": "werkzeug-dev" if args.dev_server else "pooled",
+                         "commission": args.commission, "startup_s": round(startup, 3),
+                         "ready_s": round(ready, 3)})
+            print(f"Backend serving on port {port} after {startup:.2f}s, ready after {ready:.2f}s")
+
+        results = {"meta": meta, "results": {}}
+        print(f"{'endpoint':<13} {'rps':>9} {'p50 ms':>9} {'p99 ms':>9} {'max ms':>9}  statuses")
+        for name in args.endpoints.split(","):
+            summary = run_endpoint(host, port, ENDPOINTS[name], args.clients, args.duration)
+            results["results"][name] = summary
+            print(f"{name:<13} {summary['rps'] or 0:>9.1f} {summary['p50_ms'] or 0:>9.2f} "
+                  f"{summary['p99_ms'] or 0:>9.2f} {summary['max_ms'] or 0:>9.2f}  "
+                  f"{summary['statuses']} errors={summary['errors']}")
+    finally:
+        if proc is not None:
+            proc.terminate()
+            proc.wait(10)
+        if board is not None:
+            board.close()
+
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"Results written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if compare(results, baseline, args.threshold):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
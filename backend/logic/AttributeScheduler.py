@@ -0,0 +1,245 @@
+import heapq
+import threading
+import time
+
+from .setupLogManger import LogManager
+from .Metrics import REGISTRY
+
+JOB_DURATION = REGISTRY.histogram(
+    "webdashboard_job_duration_seconds",
+    "Run time of scheduled jobs (attribute refreshes, probes, publishers)",
+    ("scheduler", "job"))
+
+
+class ScheduledJob:
+    """
+    A single unit of background work: a callable plus the cadence it runs at.
+    """
+
+    def __init__(self, name: str, func, interval, timer=None):
+        self.name = name
+        self.func = func
+        self.interval = interval   # seconds between runs, None = only on trigger
+        self.last_run = None       # time.time() of the last completed run
+        self.last_duration = 0.0   # seconds the last run took
+        self.last_error = None     # str of the last exception, None if it succeeded
+        self.last_success = None   # time.monotonic() when a run last succeeded
+        self.last_finished = None  # time.monotonic() when a run last completed
+        self.running_since = None  # time.monotonic() the current run started, if running
+        self.runs = 0
+        self.timer = timer         # histogram child observing each run's duration
+
+    def run(self):
+        started = self.running_since = time.monotonic()
+        try:
+            self.func()
+            self.last_error = None
+            self.last_success = time.monotonic()
+        except Exception as e:
+            self.last_error = str(e)
+            raise
+        finally:
+            self.running_since = None
+            self.last_finished = time.monotonic()
+            self.last_duration = time.monotonic() - started
+            if self.timer is not None:
+                self.timer.observe(self.last_duration)
+            self.last_run = time.time()
+            self.runs += 1
+
+    def is_stale(self, grace: float, now: float) -> bool:
+        """
+        True if the job's value can no longer be trusted to be current: it
+        has been running for more than `grace` seconds, or has not succeeded
+        within its interval plus `grace`.
+        """
+        if self.running_since is not None and now - self.running_since > grace:
+            return True
+        if self.last_success is None:
+            return True
+        return self.interval is not None and now - self.last_success > self.interval + grace
+
+    def is_behind(self, grace: float, now: float) -> bool:
+        """
+        True if the job is idle but overdue by more than `grace` seconds,
+        i.e. the scheduler fell behind rather than the job failing.
+        """
+        if self.running_since is not None or self.interval is None:
+            return False
+        return self.last_finished is None or now - self.last_finished > self.interval + grace
+
+    def status(self):
+        return {
+            "interval":    self.interval,
+            "last_run":    self.last_run,
+            "duration_ms": round(self.last_duration * 1000.0, 3),
+            "runs":        self.runs,
+            "error":       self.last_error,
+        }
+
+
+class AttributeScheduler:
+    """
+    Owns the Attribute instances and refreshes each one on a background thread
+    at its own cadence, so HTTP handlers only ever read the latest values.
+
+    Each Attribute declares its cadence through `refresh_interval`; it can be
+    overridden per registration. An interval of None means the attribute is
+    only refreshed when `trigger()` is called for it (e.g. after a config edit).
+    """
+
+    def __init__(self, name: str = "attribute_scheduler"):
+        self.name = name
+        self.logger = LogManager.get_logger('scheduler')
+        self._jobs = {}
+        self._queue = []           # heap of (due_monotonic, seq, job_name)
+        self._seq = 0
+        self._cond = threading.Condition()
+        self._thread = None
+        self._stopping = False
+
+    def add(self, attr, interval=-1, name: str = None):
+        """
+        Register an Attribute. Uses `attr.refresh_interval` unless `interval`
+        is given explicitly.
+        """
+        if interval == -1:
+            interval = getattr(attr, "refresh_interval", None)
+        return self.add_job(name or type(attr).__name__, attr.refresh, interval)
+
+    def add_job(self, name: str, func, interval):
+        """
+        Register an arbitrary callable to run every `interval` seconds.
+        """
+        with self._cond:
+            if name in self._jobs:
+                raise ValueError(f"Job '{name}' is already scheduled")
+            job = ScheduledJob(name, func, interval, timer=JOB_DURATION.labels(self.name, name))
+            self._jobs[name] = job
+            if interval is not None:
+                self._push(job.name, time.monotonic())
+            self._cond.notify_all()
+            return job
+
+    def trigger(self, *names):
+        """
+        Ask for the named jobs (or all jobs when called without names) to run
+        as soon as possible, regardless of their cadence.
+        """
+        with self._cond:
+            now = time.monotonic()
+            for name in (names or tuple(self._jobs)):
+                if name not in self._jobs:
+                    raise KeyError(name)
+                self._push(name, now)
+            self._cond.notify_all()
+
+    def stale_jobs(self, names, grace: float):
+        """
+        Names among `names` whose latest value is stale (see ScheduledJob.is_stale).
+        """
+        now = time.monotonic()
+        with self._cond:
+            return [name for name in names if self._jobs[name].is_stale(grace, now)]
+
+    def refresh_within(self, names, budget: float):
+        """
+        Bring the named jobs up to date, waiting at most `budget` seconds.
+
+        Jobs the scheduler merely fell behind on are triggered and waited
+        for; jobs that ran on time but failed are not retried. Nothing is
+        waited for while the scheduler thread is stuck in a run longer than
+        `budget` (e.g. a hung gnb_ctl call), so the caller can serve the
+        cached values flagged as stale straight away.
+
+        Must not be called from a scheduled job.
+
+        Returns:
+            list: names still stale afterwards
+        """
+        start = time.monotonic()
+        deadline = start + budget
+        with self._cond:
+            stuck = any(job.running_since is not None and start - job.running_since > budget
+                        for job in self._jobs.values())
+            behind = [] if stuck else [name for name in names if self._jobs[name].is_behind(budget, start)]
+            runs = {name: self._jobs[name].runs for name in behind}
+            for name in behind:
+                self._push(name, start)
+            self._cond.notify_all()
+            while behind:
+                pending = [name for name in behind if self._jobs[name].runs == runs[name]]
+                remaining = deadline - time.monotonic()
+                if not pending or remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+        return self.stale_jobs(names, budget)
+
+    def run_all(self):
+        """
+        Run every registered job once, synchronously, on the calling thread.
+        Used at startup so the first request already sees populated values.
+        """
+        for job in list(self._jobs.values()):
+            self._run(job)
+
+    def start(self):
+        with self._cond:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stopping = False
+            self._thread = threading.Thread(target=self._loop, name=self.name, daemon=True)
+            self._thread.start()
+        self.logger.info(f"Scheduler started with {len(self._jobs)} jobs")
+
+    def stop(self, timeout: float = 5.0):
+        with self._cond:
+            self._stopping = True
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def status(self):
+        """
+        Return a dict of job name -> run statistics.
+        """
+        with self._cond:
+            return {name: job.status() for name, job in self._jobs.items()}
+
+    def _push(self, name: str, due: float):
+        self._seq += 1
+        heapq.heappush(self._queue, (due, self._seq, name))
+
+    def _run(self, job: ScheduledJob):
+        try:
+            job.run()
+        except Exception as e:
+            self.logger.warning(f"Scheduled refresh of '{job.name}' failed: {e}")
+
+    def _loop(self):
+        while True:
+            with self._cond:
+                while not self._stopping:
+                    if self._queue:
+                        wait = self._queue[0][0] - time.monotonic()
+                        if wait <= 0:
+                            break
+                        self._cond.wait(wait)
+                    else:
+                        self._cond.wait()
+                if self._stopping:
+                    return
+                _, _, name = heapq.heappop(self._queue)
+                # Collapse duplicate entries (e.g. a trigger racing the cadence)
+                self._queue = [entry for entry in self._queue if entry[2] != name]
+                heapq.heapify(self._queue)
+                job = self._jobs[name]
+
+            self._run(job)
+
+            with self._cond:
+                if job.interval is not None:
+                    self._push(job.name, time.monotonic() + job.interval)
+                # wake refresh_within() callers waiting for this run
+                self._cond.notify_all()
@@ -0,0 +1,187 @@
+import threading
+import time
+
+import pexpect
+
+from .setupLogManger import LogManager
+from .Metrics import count_spawn
+from .PromptDialog import PromptDialog, DialogStep, Prompt, Transcript, ENTER, CTRL_U
+
+# any question: a line ending in a colon, with nothing printed after it yet
+QUESTION = r"[^\r\n]*:[ \t]*\Z"
+# pexpect takes the match that starts earliest in its buffer, so a specific
+# prompt has to match from the start of its line like QUESTION does, or the
+# catch-all would win on e.g. "Enter Service Differentiator [1]: "
+LINE = r"[^\r\n]*"
+
+
+def gnb_commission_script(filename: str):
+    """
+    Dialog script for `gnb_commission -g`: keep the default answer of every
+    question from "Downlink Bandwidth MHz" to "Service Differentiator", then
+    replace the preset output filename with `filename`.
+    """
+    return (
+        # the banner has colons too; nothing is answered before this question
+        DialogStep(Prompt("downlink_bandwidth", r"(?i)" + LINE + r"downlink bandwidth mhz" + QUESTION)),
+        DialogStep(Prompt("service_differentiator", r"(?i)" + LINE + r"service differentiator" + QUESTION),
+                   also=(Prompt("question", QUESTION),)),
+        DialogStep(Prompt("filename", r"(?i)" + LINE + r"filename" + QUESTION, CTRL_U + filename + ENTER)),
+        DialogStep(),
+    )
+
+
+def run_gnb_commission(filename: str, command: str = "gnb_commission -g",
+                       transcript_path: str = None, progress=None, timeout: float = 30.0):
+    """
+    Run gnb_commission through its dialog, recording a transcript to
+    `transcript_path` if given.
+
+    Args:
+        filename: config filename to answer the output filename prompt with
+        command: the command line to spawn
+        timeout: seconds to wait for any one prompt
+
+    Returns:
+        tuple: (DialogResult, Transcript, exit status or None)
+    """
+    logger = LogManager.get_logger('config_creation')
+    try:
+        transcript = Transcript(transcript_path, header={"command": command})
+    except OSError as e:
+        logger.warning(f"Could not open {transcript_path} for the gnb_commission transcript: {e}")
+        transcript = Transcript(header={"command": command})
+
+    count_spawn(command)
+    child = pexpect.spawn(command, encoding="utf-8", codec_errors="replace")
+    # pexpect pauses 50 ms before every send by default; answers go out as
+    # soon as their prompt has matched instead
+    child.delaybeforesend = None
+    result = None
+    try:
+        result = PromptDialog(gnb_commission_script(filename), timeout=timeout,
+                              progress=progress).run(child, transcript)
+    finally:
+        if result is not None and result.completed:
+            # it has closed its output and is exiting: reap it rather than
+            # have close() sleep first in case it needs killing
+            child.wait()
+            child.ptyproc.delayafterclose = 0
+        child.close(force=True)
+        transcript.close(child.exitstatus)
+    return result, transcript, child.exitstatus
+
+
+class CommissioningTask:
+    """
+    Makes sure the gNB config exists (generating it with gnb_commission if
+    needed) on a background thread, so the HTTP server can start serving
+    health, metrics and logs straight away. Tracks progress for the
+    readiness endpoint.
+
+    `func(progress)` does the work and returns True on success, calling
+    `progress(message)` as it goes. Once it succeeds `on_ready()` runs on
+    the task's thread and the task is ready. A failed attempt is retried
+    after `retry_interval` seconds.
+    """
+
+    PENDING = "pending"
+    RUNNING = "running"
+    READY = "ready"
+    FAILED = "failed"
+
+    def __init__(self, func, on_ready=None, retry_interval: float = 30.0):
+        self.func = func
+        self.on_ready = on_ready
+        self.retry_interval = retry_interval
+        self.logger = LogManager.get_logger('config_creation')
+        self.state = self.PENDING
+        self.attempts = 0
+        self.steps = 0               # progress reports in the current attempt
+        self.message = None          # latest progress report
+        self.error = None            # why the last attempt failed
+        self.started_at = None       # time.time() the current attempt started
+        self.finished_at = None      # time.time() the task became ready
+        self.ready_after = None      # seconds from start() until ready
+        self._started = None         # time.monotonic() of start()
+        self._attempt_started = None
+        self._ready = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def ready(self) -> bool:
+        return self._ready.is_set()
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._started = time.monotonic()
+        self._thread = threading.Thread(target=self._run, name="commissioning", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """
+        Cancel any pending retry. An attempt in progress runs to completion.
+        """
+        self._stop.set()
+
+    def wait(self, timeout: float = None) -> bool:
+        """
+        Block until the task is ready or `timeout` elapses.
+
+        Returns:
+            bool: True if ready
+        """
+        return self._ready.wait(timeout)
+
+    def progress(self, message: str):
+        self.steps += 1
+        self.message = message
+        self.logger.debug(f"Commissioning: {message}")
+
+    def to_dict(self):
+        elapsed = None
+        if self._attempt_started is not None and self.state == self.RUNNING:
+            elapsed = round(time.monotonic() - self._attempt_started, 3)
+        return {
+            "state":         self.state,
+            "attempts":      self.attempts,
+            "steps":         self.steps,
+            "message":       self.message,
+            "error":         self.error,
+            "started_at":    self.started_at,
+            "finished_at":   self.finished_at,
+            "elapsed_s":     elapsed,
+            "ready_after_s": round(self.ready_after, 3) if self.ready_after is not None else None,
+        }
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.attempts += 1
+            self.steps = 0
+            self.message = None
+            self.state = self.RUNNING
+            self.started_at = time.time()
+            self._attempt_started = time.monotonic()
+            try:
+                if not self.func(self.progress):
+                    raise RuntimeError("Failed to create or access the config file")
+                if self.on_ready is not None:
+                    self.on_ready()
+            except Exception as e:
+                self.error = str(e)
+                self.state = self.FAILED
+                self.logger.error(f"Commissioning attempt {self.attempts} failed: {self.error}; "
+                                  f"retrying in {self.retry_interval:.0f}s")
+                if self._stop.wait(self.retry_interval):
+                    return
+                continue
+
+            self.error = None
+            self.finished_at = time.time()
+            self.ready_after = time.monotonic() - self._started
+            self.state = self.READY
+            self._ready.set()
+            self.logger.info(f"Config ready after {self.ready_after:.2f}s")
+            return
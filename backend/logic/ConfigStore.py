@@ -0,0 +1,255 @@
+import fcntl
+import json
+import os
+import tempfile
+import threading
+import time
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Mapping, Optional, Tuple
+
+from .setupLogManger import LogManager
+
+
+class ConfigValidationError(ValueError):
+    """
+    Raised when a config transaction contains keys or values that are not allowed.
+    """
+
+    def __init__(self, message: str, keys=()):
+        super().__init__(message)
+        self.keys = list(keys)
+
+
+@dataclass(frozen=True)
+class ConfigSnapshot:
+    """
+    Immutable view of one parsed version of the config file.
+    """
+    version: int                          # increments every time the file is re-parsed
+    key: Tuple[int, int, int]             # (inode, mtime_ns, size) the snapshot was parsed from
+    data: Mapping[str, object]            # read-only mapping of the JSON object
+    loaded_at: float                      # time.time() of the parse
+
+    def get(self, key: str, default=None):
+        return self.data.get(key, default)
+
+
+class ConfigStore:
+    """
+    Shared, change-keyed cache of a JSON config file.
+
+    `snapshot()` costs a single `stat` when the file is unchanged; the file is
+    only opened and parsed again when its (inode, mtime_ns, size) changes. If
+    a new version fails to parse, the last good snapshot keeps being served
+    and the broken version is not retried until the file changes again.
+
+    Once `watch()`ed, change notifications replace the `stat`: until one
+    arrives, `snapshot()` returns the cached snapshot without touching the
+    file at all.
+    """
+
+    _stores = {}
+    _stores_lock = threading.Lock()
+
+    @classmethod
+    def for_path(cls, path: str) -> "ConfigStore":
+        """
+        Return the process-wide store for `path`, so every reader shares one cache.
+        """
+        path = os.path.abspath(path)
+        with cls._stores_lock:
+            store = cls._stores.get(path)
+            if store is None:
+                store = cls(path)
+                cls._stores[path] = store
+            return store
+
+    def __init__(self, path: str):
+        self.path = path
+        self.parses = 0
+        self.hits = 0
+        self.errors = 0
+        self._snapshot = None
+        self._failed_key = None
+        self._force_reload = False
+        self._version = 0
+        self._lock = threading.Lock()
+        self.logger = LogManager.get_logger('config_store')
+        self._watched = False
+        self._dirty = True         # a change was notified since the last stat
+
+    def watch(self, watcher):
+        """
+        Take change notifications for the file from a FileWatcher.
+        """
+        watcher.watch(self.path, self._on_change)
+        self._watched = True
+
+    def _on_change(self, event):
+        self._dirty = True
+
+    def snapshot(self) -> Optional[ConfigSnapshot]:
+        """
+        Return the latest snapshot, or None if the file has never been readable.
+        """
+        if self._watched and not self._dirty and self._snapshot is not None:
+            self.hits += 1
+            return self._snapshot
+        # cleared before the stat, so a change notified during it is not lost
+        self._dirty = False
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            self.logger.warning(f"JSON file not found: {self.path}")
+            return self._snapshot
+        except OSError as e:
+            self.logger.error(f"Error reading {self.path}: {e}")
+            return self._snapshot
+
+        key = (st.st_ino, st.st_mtime_ns, st.st_size)
+        current = self._snapshot
+        if current is not None and current.key == key and not self._force_reload:
+            self.hits += 1
+            return current
+        if key == self._failed_key:
+            return current
+
+        with self._lock:
+            # another thread may have parsed this version while we waited
+            current = self._snapshot
+            if current is not None and current.key == key and not self._force_reload:
+                self.hits += 1
+                return current
+            return self._load(key)
+
+    def apply(self, changes: Mapping[str, object], allowed_keys=None) -> ConfigSnapshot:
+        """
+        Atomically apply a batch of field changes to the config file.
+
+        The merged config is serialized once, written to a temp file in the
+        same directory, fsync'd and renamed over the original, so readers see
+        either the old or the new file and never a half-written one. Writers
+        in this process are serialized by a lock and writers in other
+        processes by an flock on a sidecar lock file.
+
+        Args:
+            changes (Mapping): key -> new value
+            allowed_keys (iterable): keys that may be changed in addition to
+                the ones already present in the file; None allows any key
+
+        Returns:
+            ConfigSnapshot: The snapshot of the newly written file
+
+        Raises:
+            ConfigValidationError: If a key or value is not allowed
+            OSError / ValueError: If the file cannot be read or written
+        """
+        if not changes:
+            raise ConfigValidationError("No changes given")
+        bad_values = [k for k, v in changes.items()
+                      if not isinstance(k, str) or not isinstance(v, (str, int, float, bool))]
+        if bad_values:
+            raise ConfigValidationError("Values must be strings, numbers or booleans", bad_values)
+
+        directory = os.path.dirname(self.path)
+        lock_path = os.path.join(directory, "." + os.path.basename(self.path) + ".lock")
+
+        with self._lock:
+            with open(lock_path, "a") as lock_file:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+                try:
+                    with open(self.path, 'r', encoding='utf-8') as f:
+                        data = json.load(f)
+                    if not isinstance(data, dict):
+                        raise ValueError("top-level JSON value is not an object")
+
+                    if allowed_keys is not None:
+                        allowed = set(allowed_keys) | set(data)
+                        unknown = [k for k in changes if k not in allowed]
+                        if unknown:
+                            raise ConfigValidationError("Unknown config keys", unknown)
+
+                    data.update(changes)
+                    payload = json.dumps(data, indent=2).encode('utf-8')
+                    mode = os.stat(self.path).st_mode & 0o7777
+
+                    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".config-", suffix=".tmp")
+                    try:
+                        with os.fdopen(fd, "wb") as tmp:
+                            tmp.write(payload)
+                            tmp.flush()
+                            os.fsync(tmp.fileno())
+                        os.chmod(tmp_path, mode)
+                        os.replace(tmp_path, self.path)
+                    except BaseException:
+                        try:
+                            os.unlink(tmp_path)
+                        except OSError:
+                            pass
+                        raise
+                    # make the rename itself durable
+                    dir_fd = os.open(directory, os.O_RDONLY)
+                    try:
+                        os.fsync(dir_fd)
+                    finally:
+                        os.close(dir_fd)
+
+                    st = os.stat(self.path)
+                finally:
+                    fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+            # we already hold the parsed result, so no need to read it back
+            self.parses += 1
+            self._version += 1
+            self._failed_key = None
+            self._force_reload = False
+            self._snapshot = ConfigSnapshot(
+                version=self._version,
+                key=(st.st_ino, st.st_mtime_ns, st.st_size),
+                data=MappingProxyType(data),
+                loaded_at=time.time(),
+            )
+            return self._snapshot
+
+    def invalidate(self):
+        """
+        Force the next `snapshot()` to re-parse the file.
+        """
+        with self._lock:
+            self._force_reload = True
+            self._failed_key = None
+            self._dirty = True
+
+    def _load(self, key) -> Optional[ConfigSnapshot]:
+        try:
+            with open(self.path, 'r', encoding='utf-8') as file:
+                data = json.load(file)
+            if not isinstance(data, dict):
+                raise ValueError("top-level JSON value is not an object")
+        except json.JSONDecodeError as e:
+            self.logger.error(f"Invalid JSON format in {self.path}: {e}")
+            return self._fail(key)
+        except PermissionError:
+            self.logger.error(f"Permission denied reading {self.path}")
+            return self._fail(key)
+        except Exception as e:
+            self.logger.error(f"Error reading {self.path}: {e}")
+            return self._fail(key)
+
+        self.parses += 1
+        self._version += 1
+        self._failed_key = None
+        self._force_reload = False
+        self._snapshot = ConfigSnapshot(
+            version=self._version,
+            key=key,
+            data=MappingProxyType(data),
+            loaded_at=time.time(),
+        )
+        return self._snapshot
+
+    def _fail(self, key):
+        self.errors += 1
+        self._failed_key = key
+        return self._snapshot
@@ -0,0 +1,196 @@
+import glob
+import hashlib
+import json
+import os
+import re
+import tarfile
+import time
+import zlib
+
+from .Metrics import log_bytes_counter
+
+BLOCK_SIZE = 64 * 1024
+TAR_BLOCK = 512
+
+
+class BundleEntry:
+    """
+    One member of a diagnostics bundle: a file on disk or in-memory bytes.
+
+    `start_time` is the earliest time the content can describe (e.g. the
+    rotation time of the next older backup), used for the time window.
+    """
+
+    def __init__(self, arcname: str, path: str = None, data: bytes = None,
+                 start_time: float = None, always: bool = False):
+        self.arcname = arcname
+        self.path = path
+        self.data = data
+        self.start_time = start_time
+        self.always = always      # included regardless of the time window
+
+
+class DiagnosticsBundle:
+    """
+    A tar.gz of logs, config and state, produced as a stream of chunks.
+
+    Nothing is staged on disk and memory stays bounded by one read block
+    plus the compressor state: every member's tar header is written from
+    its stat size, its bytes are read in BLOCK_SIZE pieces and fed straight
+    into a gzip compressor. A file that grows while being read is cut at
+    its stat size; one that shrinks is padded and flagged in the manifest.
+
+    MANIFEST.json, written last, lists every member with its size, mtime
+    and sha256, plus what was truncated or skipped because of the limits.
+    """
+
+    def __init__(self, entries, since: float = None, until: float = None,
+                 max_total_bytes: int = 256 * 1024 * 1024, max_file_bytes: int = 64 * 1024 * 1024,
+                 prefix: str = "diagnostics", level: int = 6):
+        self.entries = list(entries)
+        self.since = since
+        self.until = until
+        self.max_total_bytes = max_total_bytes
+        self.max_file_bytes = max_file_bytes
+        self.prefix = prefix
+        self.level = level
+
+    @staticmethod
+    def rotated_chain(path: str, arcdir: str = "logs"):
+        """
+        Entries for a log and its numbered backups (path.1, path.2, ...),
+        newest first, each with the start time taken from the next older one.
+        """
+        backups = []
+        for candidate in glob.glob(glob.escape(path) + ".*"):
+            suffix = candidate[len(path) + 1:]
+            if suffix.isdigit():
+                backups.append((int(suffix), candidate))
+        chain = [path] + [p for _, p in sorted(backups)]
+        entries = []
+        for i, member in enumerate(chain):
+            older = chain[i + 1] if i + 1 < len(chain) else None
+            try:
+                start_time = os.stat(older).st_mtime if older else None
+            except OSError:
+                start_time = None
+            entries.append(BundleEntry(f"{arcdir}/{os.path.basename(member)}", path=member,
+                                       start_time=start_time))
+        return entries
+
+    @staticmethod
+    def commission_transcripts(pattern: str = "/tmp/gnb_commission_output_*.jsonl", arcdir: str = "commissioning"):
+        entries = []
+        for path in sorted(glob.glob(pattern)):
+            m = re.search(r"_(\d+)\.\w+$", path)
+            entries.append(BundleEntry(f"{arcdir}/{os.path.basename(path)}", path=path,
+                                       start_time=float(m.group(1)) if m else None))
+        return entries
+
+    def _in_window(self, entry: BundleEntry, mtime: float) -> bool:
+        if entry.always:
+            return True
+        if self.since is not None and mtime < self.since:
+            return False
+        if self.until is not None and entry.start_time is not None and entry.start_time > self.until:
+            return False
+        return True
+
+    def stream(self):
+        """
+        Generator of gzip-compressed tar bytes.
+        """
+        compressor = zlib.compressobj(self.level, zlib.DEFLATED, 31)
+        manifest = {
+            "created":  time.time(),
+            "since":    self.since,
+            "until":    self.until,
+            "files":    [],
+            "skipped":  [],
+        }
+        budget = self.max_total_bytes
+
+        for entry in self.entries:
+            if entry.data is not None:
+                if len(entry.data) > budget:
+                    manifest["skipped"].append({"name": entry.arcname, "reason": "size limit"})
+                    continue
+                budget -= len(entry.data)
+                info = {"name": entry.arcname, "size": len(entry.data),
+                        "sha256": hashlib.sha256(entry.data).hexdigest()}
+                for chunk in self._member(compressor, entry.arcname, time.time(), len(entry.data),
+                                          [entry.data]):
+                    yield chunk
+                manifest["files"].append(info)
+                continue
+
+            try:
+                f = open(entry.path, "rb")
+            except OSError as e:
+                manifest["skipped"].append({"name": entry.arcname, "reason": str(e)})
+                continue
+            with f:
+                st = os.fstat(f.fileno())
+                if not self._in_window(entry, st.st_mtime):
+                    manifest["skipped"].append({"name": entry.arcname, "reason": "outside time window"})
+                    continue
+                size = st.st_size
+                # oversized logs keep their most recent part
+                offset = max(0, size - min(self.max_file_bytes, budget))
+                length = size - offset
+                if length <= 0 and size > 0:
+                    manifest["skipped"].append({"name": entry.arcname, "reason": "size limit"})
+                    continue
+                budget -= length
+                digest = hashlib.sha256()
+                info = {"name": entry.arcname, "source": entry.path, "size": length,
+                        "mtime": st.st_mtime}
+                if offset:
+                    info["truncated_from"] = size
+                    info["offset"] = offset
+                blocks = self._file_blocks(f, offset, length, digest, info)
+                for chunk in self._member(compressor, entry.arcname, st.st_mtime, length, blocks):
+                    yield chunk
+                info["sha256"] = digest.hexdigest()
+                manifest["files"].append(info)
+
+        data = json.dumps(manifest, indent=2).encode()
+        for chunk in self._member(compressor, "MANIFEST.json", time.time(), len(data), [data]):
+            yield chunk
+        tail = compressor.compress(b"\0" * (2 * TAR_BLOCK)) + compressor.flush()
+        if tail:
+            yield tail
+
+    @staticmethod
+    def _file_blocks(f, offset: int, length: int, digest, info: dict):
+        read_counter = log_bytes_counter(f.name)
+        pos = offset
+        end = offset + length
+        while pos < end:
+            block = os.pread(f.fileno(), min(BLOCK_SIZE, end - pos), pos)
+            read_counter.value += len(block)
+            if not block:
+                # shrank (truncated or rotated) while we were reading
+                info["short_read"] = True
+                block = b"\0" * min(BLOCK_SIZE, end - pos)
+            pos += len(block)
+            digest.update(block)
+            yield block
+
+    def _member(self, compressor, arcname: str, mtime: float, size: int, blocks):
+        tarinfo = tarfile.TarInfo(f"{self.prefix}/{arcname}")
+        tarinfo.size = size
+        tarinfo.mtime = int(mtime)
+        tarinfo.mode = 0o644
+        out = compressor.compress(tarinfo.tobuf(format=tarfile.PAX_FORMAT))
+        if out:
+            yield out
+        for block in blocks:
+            out = compressor.compress(block)
+            if out:
+                yield out
+        padding = (-size) % TAR_BLOCK
+        if padding:
+            out = compressor.compress(b"\0" * padding)
+            if out:
+                yield out
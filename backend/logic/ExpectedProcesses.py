@@ -0,0 +1,237 @@
+import json
+import os
+import re
+import select
+import subprocess
+import threading
+import time
+
+from .ProcessTable import ProcessTable, VENDOR_ROOT
+from .setupLogManger import LogManager
+from .Metrics import count_spawn
+
+GNB_CTL_STATUS = ["gnb_ctl", "status"]
+# vendor tools that run from the install tree next to the gNB processes but
+# are not part of it, e.g. a `gnb_ctl start` still waiting for the cell
+VENDOR_TOOLS = ("gnb_ctl", "gnb_commission")
+STATUS_RE = re.compile(
+    r"gNB\s+is\s+running\s*\(\s*(\d+)\s*/\s*(\d+)\s*expected\s+processes\s+running\)")
+
+
+class ExpectedProcessSet:
+    """
+    Liveness of the set of processes that make up the gNB, checked from
+    /proc instead of by running `gnb_ctl status`.
+
+    The expected set is the list of vendor executables (anything under
+    /opt/ste except the `exclude`d tools) that is running at a moment
+    `gnb_ctl status` reports all expected processes up; it is learned then
+    and saved to `state_path`.
+    Until it is learned it is seeded from `seed` (executable names, e.g.
+    from configuration) or else from the set saved by an earlier run, so
+    the processes that are down can be named before the gNB has been seen
+    running. Each check then only asks whether the cached processes still
+    exist: through a pidfd where the kernel supports it (a poll with zero
+    timeout, no /proc read at all), otherwise by comparing the start time
+    in /proc/<pid>/stat.
+
+    `gnb_ctl status` is run on every check while there is no expected set
+    at all. Otherwise it only runs when the native check finds a process
+    missing, and then at most once every `fallback_interval` seconds.
+    """
+
+    def __init__(self, exe_prefix: str = VENDOR_ROOT, table: ProcessTable = None,
+                 ctl_cmd=None, fallback_interval: float = 30.0, seed=None, state_path: str = None,
+                 exclude=VENDOR_TOOLS):
+        self.exe_prefix = exe_prefix
+        self.exclude = frozenset(exclude)
+        self.table = table or ProcessTable()
+        self.ctl_cmd = list(ctl_cmd or GNB_CTL_STATUS)
+        self.fallback_interval = fallback_interval
+        self.state_path = state_path
+        self.expected = None          # sorted list of executable names, once learned or seeded
+        self.expected_total = None    # M in gnb_ctl's "N/M expected processes running"
+        self.ctl_runs = 0
+        self.logger = LogManager.get_logger("process_check")
+        self._lock = threading.Lock()
+        self._handles = {}            # executable name -> [(pid, start_time, pidfd or None)]
+        self._last_ctl = None         # (monotonic time, result dict)
+        self._use_pidfd = hasattr(os, "pidfd_open")
+        seed = sorted(set(seed) - self.exclude) if seed else self._load_state()
+        if seed:
+            self.expected = seed
+            self.logger.info(f"Expected gNB processes (until learned): {', '.join(seed)}")
+
+    def check(self):
+        """
+        Returns:
+            dict: running (bool), expected and down (executable names),
+            source ("native" or "gnb_ctl")
+        """
+        with self._lock:
+            if self.expected is None:
+                # nothing to check natively yet: never report a stale result
+                result = self._ctl_check(max_age=0)
+                if result["running"]:
+                    self._learn(result["total"])
+                return self._report(result["running"], [], "gnb_ctl")
+
+            down = self._down()
+            if down:
+                # a restarted process has a new pid: look for it once
+                self._attach(self._scan())
+                down = self._down()
+            if not down:
+                return self._report(True, [], "native")
+
+            result = self._ctl_check(max_age=self.fallback_interval)
+            if result["running"] and result["fresh"]:
+                # gnb_ctl disagrees: the installed process set has changed
+                self.logger.info("Expected process set changed, relearning")
+                self._learn(result["total"])
+                return self._report(True, [], "gnb_ctl")
+            return self._report(False, down, "native")
+
+    def _report(self, running: bool, down, source: str):
+        return {
+            "running":  running,
+            "expected": list(self.expected or []),
+            "down":     sorted(down),
+            "source":   source,
+        }
+
+    # ----------------------------------------------------------- native check
+
+    def _down(self):
+        down = []
+        for name in self.expected:
+            handles = [h for h in self._handles.get(name, []) if self._alive(h)]
+            for h in self._handles.get(name, []):
+                if h not in handles and h[2] is not None:
+                    os.close(h[2])
+            self._handles[name] = handles
+            if not handles:
+                down.append(name)
+        return down
+
+    def _alive(self, handle) -> bool:
+        pid, start_time, pidfd = handle
+        if pidfd is not None:
+            # a pidfd becomes readable once the process has exited
+            poller = select.poll()
+            poller.register(pidfd, select.POLLIN)
+            return not poller.poll(0)
+        return self.table.alive(pid, start_time)
+
+    def _scan(self):
+        return [(pid, start_time, exe) for pid, start_time, exe in self.table.scan(self.exe_prefix)
+                if os.path.basename(exe) not in self.exclude]
+
+    def _attach(self, processes):
+        """
+        Add handles for the given (pid, start_time, exe) processes that are
+        not tracked yet.
+        """
+        for pid, start_time, exe in processes:
+            handles = self._handles.setdefault(os.path.basename(exe), [])
+            if any(h[0] == pid for h in handles):
+                continue
+            handles.append((pid, start_time, self._open_pidfd(pid, start_time)))
+
+    def _open_pidfd(self, pid: int, start_time: int):
+        if not self._use_pidfd:
+            return None
+        try:
+            pidfd = os.pidfd_open(pid)
+        except OSError:
+            # e.g. ENOSYS on kernels before 5.3
+            self._use_pidfd = False
+            return None
+        # the pid may have been reused between the scan and the open
+        if self.table.start_time(pid) != start_time:
+            os.close(pidfd)
+            return None
+        return pidfd
+
+    def _learn(self, total):
+        for handles in self._handles.values():
+            for _, _, pidfd in handles:
+                if pidfd is not None:
+                    os.close(pidfd)
+        self._handles = {}
+        processes = self._scan()
+        self._attach(processes)
+        self.expected = sorted(self._handles)
+        self.expected_total = total
+        if total is not None and len(processes) != total:
+            self.logger.warning(f"gnb_ctl expects {total} processes, found {len(processes)} "
+                                f"under {self.exe_prefix}")
+        self.logger.info(f"Expected gNB processes: {', '.join(self.expected)}")
+        if self.expected:
+            self._save_state()
+
+    def _load_state(self):
+        if not self.state_path:
+            return None
+        try:
+            with open(self.state_path, encoding="utf-8") as f:
+                expected = json.load(f)["expected"]
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            self.logger.warning(f"Ignoring saved expected processes in {self.state_path}: {e}")
+            return None
+        return sorted({str(name) for name in expected} - self.exclude) or None
+
+    def _save_state(self):
+        if not self.state_path:
+            return
+        tmp = f"{self.state_path}.tmp"
+        try:
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump({"expected": self.expected, "total": self.expected_total}, f)
+            os.replace(tmp, self.state_path)
+        except OSError as e:
+            self.logger.warning(f"Could not save expected processes to {self.state_path}: {e}")
+
+    # ---------------------------------------------------------------- gnb_ctl
+
+    def _ctl_check(self, max_age: float):
+        """
+        Run `gnb_ctl status`, or reuse its last result if it ran less than
+        `max_age` seconds ago.
+        """
+        now = time.monotonic()
+        if self._last_ctl is not None and now - self._last_ctl[0] < max_age:
+            return dict(self._last_ctl[1], fresh=False)
+        result = self.run_gnb_ctl()
+        self._last_ctl = (now, result)
+        return dict(result, fresh=True)
+
+    def run_gnb_ctl(self):
+        """
+        Returns:
+            dict: running (bool), up and total from the last output line
+        """
+        self.ctl_runs += 1
+        count_spawn(self.ctl_cmd)
+        try:
+            proc = subprocess.run(self.ctl_cmd, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE,
+                                  stderr=subprocess.PIPE, text=True, timeout=10)
+        except (OSError, subprocess.TimeoutExpired) as e:
+            self.logger.warning(f"gnb_ctl status failed: {e}")
+            return {"running": False, "up": None, "total": None}
+        lines = [l for l in proc.stdout.splitlines() if l.strip()]
+        m = STATUS_RE.search(lines[-1]) if lines else None
+        if not m:
+            return {"running": False, "up": None, "total": None}
+        up, total = map(int, m.groups())
+        return {"running": up == total, "up": up, "total": total}
+
+    def close(self):
+        with self._lock:
+            for handles in self._handles.values():
+                for _, _, pidfd in handles:
+                    if pidfd is not None:
+                        os.close(pidfd)
+            self._handles = {}
@@ -0,0 +1,312 @@
+import ctypes
+import ctypes.util
+import errno
+import os
+import select
+import struct
+import threading
+import time
+from dataclasses import dataclass
+from typing import FrozenSet
+
+from .setupLogManger import LogManager
+from .Metrics import REGISTRY
+
+FILE_EVENTS = REGISTRY.counter(
+    "webdashboard_file_events_total", "Coalesced file change events delivered, by file", ("file",))
+
+# inotify(7)
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+
+# Directories are watched rather than the files themselves, so atomic
+# replaces (ConfigStore.apply), rotations and re-creations are seen too.
+DIR_MASK = (IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO
+            | IN_CREATE | IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF | IN_ONLYDIR)
+EVENT_HEADER = struct.Struct("iIII")   # wd, mask, cookie, len
+
+MODIFIED = "modified"
+CREATED = "created"
+DELETED = "deleted"
+
+
+def _kinds(mask: int):
+    kinds = set()
+    if mask & (IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE):
+        kinds.add(MODIFIED)
+    if mask & (IN_CREATE | IN_MOVED_TO):
+        kinds.add(CREATED)
+    if mask & (IN_DELETE | IN_MOVED_FROM):
+        kinds.add(DELETED)
+    return kinds
+
+
+def _load_libc():
+    """
+    libc with the inotify calls typed, or None where they are not available.
+    """
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        libc.inotify_init1.argtypes = [ctypes.c_int]
+        libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        libc.inotify_rm_watch.argtypes = [ctypes.c_int, ctypes.c_int]
+    except (OSError, AttributeError):
+        return None
+    return libc
+
+
+@dataclass(frozen=True)
+class FileEvent:
+    """
+    One or more changes to a watched path, coalesced.
+    """
+    path: str
+    kinds: FrozenSet[str]     # subset of {"modified", "created", "deleted"}
+    count: int                # raw notifications folded into this event
+
+
+class FileWatcher:
+    """
+    Watches files for changes and calls the subscribers of each path on one
+    background thread, so caches, log followers and push streams react to
+    changes instead of re-checking files on a timer.
+
+    Uses inotify (through ctypes) on the files' directories where it can,
+    and falls back to comparing (inode, mtime, size) every `poll_interval`
+    seconds for paths whose directory cannot be watched, or for every path
+    when inotify is unavailable. Bursts of changes to a path are debounced:
+    an event is delivered once the path has been quiet for `debounce`
+    seconds, or at the latest `max_delay` seconds after the first change,
+    so a log that is written continuously still gets regular events.
+
+    Subscribers run on the watcher thread and should only invalidate or
+    trigger work, not do it.
+    """
+
+    def __init__(self, debounce: float = 0.1, max_delay: float = 1.0,
+                 poll_interval: float = 1.0, use_inotify: bool = True):
+        self.debounce = debounce
+        self.max_delay = max_delay
+        self.poll_interval = poll_interval
+        self.logger = LogManager.get_logger('file_watcher')
+        self.raw_events = 0
+        self.delivered = 0
+        self.overflows = 0
+        self._subscribers = {}     # path -> [callback]
+        self._dirs = {}            # directory -> wd
+        self._wd_dirs = {}         # wd -> directory
+        self._unwatchable = set()  # directories inotify refused, polled for good
+        self._polled = {}          # path -> last (inode, mtime_ns, size) or None
+        self._pending = {}         # path -> [kinds, count, first change, last change]
+        self._lock = threading.Lock()
+        self._libc = _load_libc() if use_inotify else None
+        self._fd = -1
+        if self._libc is not None:
+            self._fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+            if self._fd < 0:
+                self.logger.warning(f"inotify unavailable ({os.strerror(ctypes.get_errno())}), "
+                                    f"polling every {poll_interval}s instead")
+        self._wake_r, self._wake_w = os.pipe()
+        self._thread = None
+        self._stopping = False
+
+    @property
+    def mode(self) -> str:
+        return "inotify" if self._fd >= 0 else "polling"
+
+    def watch(self, path: str, callback):
+        """
+        Call `callback(event: FileEvent)` whenever `path` changes, is created
+        or is removed. The path need not exist yet.
+        """
+        path = os.path.abspath(path)
+        with self._lock:
+            self._subscribers.setdefault(path, []).append(callback)
+            directory = os.path.dirname(path)
+            if directory not in self._dirs and not self._add_watch(directory):
+                self._polled.setdefault(path, self._stat_key(path))
+        self._wake()
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._loop, name="file_watcher", daemon=True)
+        self._thread.start()
+        self.logger.info(f"Watching files with {self.mode}")
+
+    def stop(self, timeout: float = 5.0):
+        self._stopping = True
+        self._wake()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        for fd in (self._fd, self._wake_r, self._wake_w):
+            if fd >= 0:
+                os.close(fd)
+        self._fd = self._wake_r = self._wake_w = -1
+
+    def status(self):
+        with self._lock:
+            return {
+                "mode":        self.mode,
+                "paths":       sorted(self._subscribers),
+                "polled":      sorted(self._polled),
+                "raw_events":  self.raw_events,
+                "delivered":   self.delivered,
+                "overflows":   self.overflows,
+            }
+
+    # ------------------------------------------------------------ internals
+
+    def _add_watch(self, directory: str) -> bool:
+        if self._fd < 0 or directory in self._unwatchable:
+            return False
+        wd = self._libc.inotify_add_watch(self._fd, os.fsencode(directory), DIR_MASK)
+        if wd < 0:
+            err = ctypes.get_errno()
+            if err not in (errno.ENOENT, errno.ENOTDIR):
+                # e.g. EACCES or ENOSPC (out of inotify watches)
+                self._unwatchable.add(directory)
+                self.logger.warning(f"Cannot watch {directory} ({os.strerror(err)}), polling it instead")
+            return False
+        self._dirs[directory] = wd
+        self._wd_dirs[wd] = directory
+        return True
+
+    @staticmethod
+    def _stat_key(path: str):
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+    def _wake(self):
+        try:
+            os.write(self._wake_w, b"\0")
+        except OSError:
+            pass
+
+    def _loop(self):
+        next_poll = time.monotonic() + self.poll_interval
+        while not self._stopping:
+            now = time.monotonic()
+            timeout = None
+            with self._lock:
+                if self._polled:
+                    timeout = max(0.0, next_poll - now)
+                if self._pending:
+                    due = min(min(last + self.debounce, first + self.max_delay)
+                              for _, _, first, last in self._pending.values())
+                    timeout = max(0.0, due - now) if timeout is None else min(timeout, max(0.0, due - now))
+            fds = [self._wake_r] + ([self._fd] if self._fd >= 0 else [])
+            try:
+                readable, _, _ = select.select(fds, [], [], timeout)
+            except InterruptedError:
+                continue
+            if self._stopping:
+                return
+            if self._wake_r in readable:
+                os.read(self._wake_r, 4096)
+            if self._fd in readable:
+                self._read_inotify()
+            now = time.monotonic()
+            if now >= next_poll:
+                self._poll_stat(now)
+                next_poll = now + self.poll_interval
+            self._deliver_due(now)
+
+    def _read_inotify(self):
+        try:
+            buf = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return
+        now = time.monotonic()
+        offset = 0
+        with self._lock:
+            while offset + EVENT_HEADER.size <= len(buf):
+                wd, mask, _, length = EVENT_HEADER.unpack_from(buf, offset)
+                name = buf[offset + EVENT_HEADER.size:offset + EVENT_HEADER.size + length].rstrip(b"\0")
+                offset += EVENT_HEADER.size + length
+                self.raw_events += 1
+                if mask & IN_Q_OVERFLOW:
+                    # events were lost: assume everything changed
+                    self.overflows += 1
+                    for path in self._subscribers:
+                        self._queue(path, {MODIFIED}, now)
+                    continue
+                directory = self._wd_dirs.get(wd)
+                if directory is None:
+                    continue
+                if mask & (IN_IGNORED | IN_DELETE_SELF | IN_MOVE_SELF):
+                    # the directory itself went away: poll its paths from now on
+                    self._wd_dirs.pop(wd, None)
+                    self._dirs.pop(directory, None)
+                    for path in self._subscribers:
+                        if os.path.dirname(path) == directory:
+                            self._polled.setdefault(path, None)
+                            self._queue(path, {DELETED}, now)
+                    continue
+                path = os.path.join(directory, os.fsdecode(name))
+                if name and path in self._subscribers:
+                    self._queue(path, _kinds(mask), now)
+
+    def _poll_stat(self, now: float):
+        with self._lock:
+            for path, previous in list(self._polled.items()):
+                directory = os.path.dirname(path)
+                if directory in self._dirs or self._add_watch(directory):
+                    # the directory appeared and is watched now
+                    del self._polled[path]
+                    key = self._stat_key(path)
+                    if key is not None:
+                        self._queue(path, {CREATED}, now)
+                    continue
+                key = self._stat_key(path)
+                if key == previous:
+                    continue
+                self._polled[path] = key
+                if key is None:
+                    kinds = {DELETED}
+                elif previous is None or previous[0] != key[0]:
+                    kinds = {CREATED}
+                else:
+                    kinds = {MODIFIED}
+                self.raw_events += 1
+                self._queue(path, kinds, now)
+
+    def _queue(self, path: str, kinds, now: float):
+        pending = self._pending.get(path)
+        if pending is None:
+            self._pending[path] = [set(kinds), 1, now, now]
+        else:
+            pending[0].update(kinds)
+            pending[1] += 1
+            pending[3] = now
+
+    def _deliver_due(self, now: float):
+        with self._lock:
+            due = [path for path, (_, _, first, last) in self._pending.items()
+                   if now - last >= self.debounce or now - first >= self.max_delay]
+            events = []
+            for path in due:
+                kinds, count, _, _ = self._pending.pop(path)
+                events.append((FileEvent(path, frozenset(kinds), count), list(self._subscribers[path])))
+        for event, callbacks in events:
+            self.delivered += 1
+            FILE_EVENTS.labels(os.path.basename(event.path)).value += 1
+            for callback in callbacks:
+                try:
+                    callback(event)
+                except Exception as e:
+                    self.logger.warning(f"File watch subscriber for {event.path} failed: {e}")
@@ -0,0 +1,283 @@
+import asyncio
+import json
+import threading
+import time
+
+from .setupLogManger import LogManager
+
+# per board, each poll fetches these and stores the decoded JSON under the key
+BOARD_ENDPOINTS = (
+    ("attributes",  "/api/attributes"),
+    ("node_status", "/api/node_status"),
+)
+
+
+class BoardState:
+    """
+    Cached result of polling one board.
+    """
+
+    def __init__(self, ip: str, port: int, manet_ip: str = None):
+        self.ip = ip
+        self.port = port
+        self.manet_ip = manet_ip
+        self.status = "pending"       # pending / ok / unreachable / error
+        self.data = {}
+        self.manet_reachable = None
+        self.last_ok = None
+        self.last_error = None
+        self.latency_ms = None
+        self.failures = 0
+        self.next_poll = 0.0
+
+    def to_dict(self):
+        return {
+            "ip":              self.ip,
+            "status":          self.status,
+            "attributes":      self.data.get("attributes"),
+            "node_status":     (self.data.get("node_status") or {}).get("node_status"),
+            "manet_ip":        self.manet_ip,
+            "manet_reachable": self.manet_reachable,
+            "last_ok":         self.last_ok,
+            "last_error":      self.last_error,
+            "latency_ms":      self.latency_ms,
+            "failures":        self.failures,
+        }
+
+
+class FleetGateway:
+    """
+    Polls the API of every board of the fleet so that browsers can read one
+    cached, aggregated snapshot instead of each polling every board over the
+    radio link.
+
+    Polling runs on an asyncio loop in a background thread. At most
+    `workers` boards are polled at once, every request has a `timeout`, and
+    a board that fails is retried with exponential backoff (capped at
+    `max_backoff` seconds) rather than every `interval`. Each board gets
+    exactly one poller, however many clients read the snapshot.
+    """
+
+    def __init__(self, boards=(), port: int = 5000, interval: float = 5.0,
+                 timeout: float = 3.0, workers: int = 8, max_backoff: float = 60.0,
+                 on_update=None):
+        self.port = port
+        self.interval = interval
+        self.timeout = timeout
+        self.workers = workers
+        self.max_backoff = max_backoff
+        self.on_update = on_update      # called with the snapshot after every board poll
+        self.logger = LogManager.get_logger("fleet_gateway")
+        self.polls = 0
+        self._boards = {}
+        self._lock = threading.Lock()
+        self._snapshot = {"generated_at": None, "boards": {}}
+        self._loop = None
+        self._thread = None
+        self._stop = None
+        self._wake = None
+        self.set_boards(boards)
+
+    # ---------------------------------------------------------------- boards
+
+    def set_boards(self, boards):
+        """
+        Replace the polled boards. Entries are IP strings or dicts with
+        "ip" and optional "port" and "manet_ip"; boards that stay keep their
+        cached state.
+        """
+        new = {}
+        for board in boards:
+            if isinstance(board, str):
+                board = {"ip": board}
+            ip = board["ip"].strip()
+            if not ip:
+                continue
+            port = int(board.get("port") or self.port)
+            manet_ip = (board.get("manet_ip") or "").strip() or None
+            state = self._boards.get(ip)
+            if state is None or state.port != port or state.manet_ip != manet_ip:
+                state = BoardState(ip, port, manet_ip)
+            new[ip] = state
+        with self._lock:
+            self._boards = new
+        self._rebuild_snapshot()
+
+    def boards(self):
+        with self._lock:
+            return list(self._boards)
+
+    def snapshot(self):
+        with self._lock:
+            return self._snapshot
+
+    def board(self, ip: str):
+        return self.snapshot()["boards"].get(ip)
+
+    def _rebuild_snapshot(self):
+        with self._lock:
+            self._snapshot = {
+                "generated_at": time.time(),
+                "boards": {ip: state.to_dict() for ip, state in self._boards.items()},
+            }
+            snapshot = self._snapshot
+        return snapshot
+
+    # ------------------------------------------------------------- lifecycle
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name="fleet_gateway", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = None):
+        if self._loop is not None and self._stop is not None:
+            self._loop.call_soon_threadsafe(self._request_stop)
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _request_stop(self):
+        self._stop.set()
+        self._wake.set()
+
+    def _run(self):
+        self._loop = asyncio.new_event_loop()
+        try:
+            self._loop.run_until_complete(self._main())
+        finally:
+            self._loop.close()
+            self._loop = None
+
+    async def _main(self):
+        self._stop = asyncio.Event()
+        self._wake = asyncio.Event()
+        semaphore = asyncio.Semaphore(self.workers)
+        inflight = {}
+        while not self._stop.is_set():
+            now = time.monotonic()
+            with self._lock:
+                due = [s for ip, s in self._boards.items()
+                       if s.next_poll <= now and ip not in inflight]
+            # every board is polled independently, so a slow one never holds up the rest
+            for state in due:
+                inflight[state.ip] = asyncio.ensure_future(self._poll_bounded(semaphore, state, inflight))
+            with self._lock:
+                next_due = min((s.next_poll for ip, s in self._boards.items() if ip not in inflight),
+                               default=time.monotonic() + self.interval)
+            self._wake.clear()
+            try:
+                await asyncio.wait_for(self._wake.wait(), max(0.05, next_due - time.monotonic()))
+            except asyncio.TimeoutError:
+                pass
+        for task in list(inflight.values()):
+            task.cancel()
+
+    def _publish(self):
+        snapshot = self._rebuild_snapshot()
+        if self.on_update is not None:
+            try:
+                self.on_update(snapshot)
+            except Exception as e:
+                self.logger.error(f"Fleet update callback failed: {e}")
+
+    # --------------------------------------------------------------- polling
+
+    async def _poll_bounded(self, semaphore, state: BoardState, inflight: dict):
+        try:
+            async with semaphore:
+                await self.poll_board(state)
+            self._publish()
+        finally:
+            inflight.pop(state.ip, None)
+            self._wake.set()
+
+    async def poll_board(self, state: BoardState):
+        self.polls += 1
+        start = time.monotonic()
+        try:
+            results = await asyncio.gather(*(
+                self._get_json(state.ip, state.port, path) for _, path in BOARD_ENDPOINTS))
+            if state.manet_ip:
+                state.manet_reachable = await self._reachable(state.manet_ip, 80)
+        except Exception as e:
+            # anything a misbehaving board can cause: refused or dropped
+            # connections, timeouts, malformed responses
+            state.failures += 1
+            unreachable = isinstance(e, (OSError, asyncio.TimeoutError, EOFError))
+            state.status = "unreachable" if unreachable else "error"
+            state.last_error = str(e) or type(e).__name__
+            if state.failures == 1:
+                self.logger.warning(f"Board {state.ip} {state.status}: {state.last_error}")
+        else:
+            state.data = {key: result for (key, _), result in zip(BOARD_ENDPOINTS, results)}
+            state.status = "ok"
+            state.failures = 0
+            state.last_error = None
+            state.last_ok = time.time()
+            state.latency_ms = round((time.monotonic() - start) * 1000.0, 1)
+        finally:
+            # set however the poll ended, so a board is never re-polled at once
+            delay = self.interval
+            if state.failures:
+                delay = min(self.interval * 2 ** state.failures, self.max_backoff)
+            state.next_poll = time.monotonic() + delay
+
+    async def _get_json(self, host: str, port: int, path: str):
+        """
+        Minimal HTTP/1.1 GET returning the decoded JSON body.
+
+        Raises:
+            OSError, asyncio.TimeoutError: Board not reachable in time
+            EOFError: Connection dropped mid-response (asyncio.IncompleteReadError)
+            ValueError: Non-200 status or invalid response
+        """
+        return await asyncio.wait_for(self._fetch(host, port, path), self.timeout)
+
+    async def _fetch(self, host: str, port: int, path: str):
+        reader, writer = await asyncio.open_connection(host, port)
+        try:
+            writer.write(f"GET {path} HTTP/1.1\r\nHost: {host}:{port}\r\n"
+                         f"Accept: application/json\r\nConnection: close\r\n\r\n".encode())
+            await writer.drain()
+            head = await reader.readuntil(b"\r\n\r\n")
+            lines = head.decode("latin-1").split("\r\n")
+            try:
+                status = int(lines[0].split()[1])
+            except (IndexError, ValueError):
+                raise ValueError(f"Malformed status line {lines[0][:80]!r} for {path}")
+            headers = {}
+            for line in lines[1:]:
+                name, _, value = line.partition(":")
+                headers[name.strip().lower()] = value.strip()
+            if headers.get("transfer-encoding", "").lower() == "chunked":
+                body = await self._read_chunked(reader)
+            elif "content-length" in headers:
+                body = await reader.readexactly(int(headers["content-length"]))
+            else:
+                body = await reader.read()
+        finally:
+            writer.close()
+        if status != 200:
+            raise ValueError(f"HTTP {status} for {path}")
+        return json.loads(body)
+
+    @staticmethod
+    async def _read_chunked(reader):
+        body = b""
+        while True:
+            size = int((await reader.readline()).split(b";")[0], 16)
+            if size == 0:
+                await reader.readline()
+                return body
+            body += await reader.readexactly(size)
+            await reader.readline()
+
+    async def _reachable(self, host: str, port: int) -> bool:
+        try:
+            _, writer = await asyncio.wait_for(asyncio.open_connection(host, port), self.timeout)
+        except (OSError, asyncio.TimeoutError):
+            return False
+        writer.close()
+        return True
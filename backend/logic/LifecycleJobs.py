@@ -0,0 +1,368 @@
+import datetime
+import fcntl
+import itertools
+import os
+import selectors
+import signal
+import subprocess
+import threading
+import time
+import uuid
+from collections import deque
+
+from .setupLogManger import LogManager
+from .Metrics import count_spawn
+
+
+class JobConflictError(Exception):
+    """
+    Raised when a lifecycle job is requested while another one is running.
+    """
+
+    def __init__(self, running_job=None):
+        if running_job is not None:
+            message = f"Job {running_job.id} ({running_job.action}) is still running"
+        else:
+            message = "A lifecycle job is running in another process"
+        super().__init__(message)
+        self.running_job = running_job
+
+
+class JobManagerClosedError(Exception):
+    """
+    Raised when a job is requested after the manager was closed for shutdown.
+    """
+
+
+class Job:
+    """
+    One run of a gnb_ctl action. Output is read incrementally from the
+    child's stdout pipe into a bounded buffer of numbered lines that
+    status and stream readers can follow.
+    """
+
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+    TIMEOUT = "timeout"
+    CANCELLED = "cancelled"
+
+    MAX_LINES = 5000
+
+    def __init__(self, action: str, cmd, wait_for_marker: str = None, max_wait: float = 120):
+        self.id = uuid.uuid4().hex[:12]
+        self.action = action
+        self.cmd = list(cmd)
+        self.wait_for_marker = wait_for_marker
+        self.max_wait = max_wait
+        self.status = self.RUNNING
+        self.details = None
+        self.exit_code = None
+        self.created_at = time.time()
+        self.finished_at = None
+        self.time_to_cell_up = None   # seconds from start to the marker, if seen
+        self.pid = None
+        self.lines = deque(maxlen=self.MAX_LINES)   # (seq, text)
+        self.line_count = 0
+        self._seq = itertools.count(1)
+        self.cancel_requested = False
+        self._cond = threading.Condition()
+
+    @property
+    def finished(self) -> bool:
+        return self.status != self.RUNNING
+
+    def append(self, text: str):
+        with self._cond:
+            self.line_count += 1
+            self.lines.append((next(self._seq), text))
+            self._cond.notify_all()
+
+    def finish(self, status: str, details: str = None, exit_code=None):
+        with self._cond:
+            self.status = status
+            self.details = details
+            self.exit_code = exit_code
+            self.finished_at = time.time()
+            self._cond.notify_all()
+
+    def cancel(self):
+        self.cancel_requested = True
+
+    def wait(self, timeout: float = None) -> bool:
+        """
+        Block until the job has finished or `timeout` elapses.
+
+        Returns:
+            bool: True if finished
+        """
+        with self._cond:
+            return self._cond.wait_for(lambda: self.finished, timeout)
+
+    def lines_since(self, after_seq: int, timeout: float = None):
+        """
+        Return lines with a sequence number greater than `after_seq`, waiting
+        up to `timeout` seconds for new ones if there are none yet.
+        """
+        with self._cond:
+            if timeout and not self.finished and (not self.lines or self.lines[-1][0] <= after_seq):
+                self._cond.wait(timeout)
+            return [(seq, text) for seq, text in self.lines if seq > after_seq]
+
+    def to_dict(self, tail: int = 20):
+        with self._cond:
+            recent = [text for _, text in list(self.lines)[-tail:]] if tail else []
+        return {
+            "job_id":          self.id,
+            "action":          self.action,
+            "status":          self.status,
+            "details":         self.details,
+            "exit_code":       self.exit_code,
+            "pid":             self.pid,
+            "created_at":      self.created_at,
+            "finished_at":     self.finished_at,
+            "elapsed":         round((self.finished_at or time.time()) - self.created_at, 3),
+            "time_to_cell_up": self.time_to_cell_up,
+            "line_count":      self.line_count,
+            "output_tail":     recent,
+        }
+
+
+class JobManager:
+    """
+    Runs gnb_ctl actions as background jobs and keeps the recent ones for
+    status queries. Lifecycle actions (start/stop) are exclusive per board:
+    within this process by a lock, across processes by an flock on
+    `lock_path`.
+    """
+
+    KEEP_FINISHED = 20
+    # a cancelled job stops reading within a second, then gets SIGTERM and
+    # up to 5 s before SIGKILL
+    CANCEL_TIMEOUT = 10.0
+
+    def __init__(self, log_path: str, lock_path: str):
+        self.log_path = log_path
+        self.lock_path = lock_path
+        self.logger = LogManager.get_logger('setup_script')
+        self._jobs = {}
+        self._order = deque()
+        self._lock = threading.Lock()
+        self._lifecycle_job = None
+        self._closed = False
+
+    def close(self):
+        """
+        Refuse new jobs from now on; running ones carry on (see wait_idle).
+        """
+        with self._lock:
+            self._closed = True
+
+    def get(self, job_id: str):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def list(self):
+        with self._lock:
+            return [self._jobs[job_id] for job_id in reversed(self._order)]
+
+    def active(self):
+        """
+        The running lifecycle job, if any.
+        """
+        with self._lock:
+            job = self._lifecycle_job
+            return job if job is not None and not job.finished else None
+
+    def start(self, action: str, cmd, lifecycle: bool = True, preempt: bool = False,
+              wait_for_marker: str = None, clear_log: bool = False, max_wait: float = 120) -> Job:
+        """
+        Start `cmd` in the background and return its Job immediately.
+
+        With `preempt` (e.g. stop), a running lifecycle job of another action
+        (e.g. a start stuck waiting for its marker) is cancelled and waited
+        for first, instead of refusing the new job.
+
+        Raises:
+            JobConflictError: If `lifecycle` and another lifecycle job is running
+            JobManagerClosedError: If the backend is shutting down
+        """
+        running = self.active() if lifecycle and preempt and not self._closed else None
+        if running is not None and running.action != action:
+            self.logger.info(f"Cancelling job {running.id} ({running.action}) for '{action}'")
+            running.cancel()
+            running.wait(self.CANCEL_TIMEOUT)
+        job = Job(action, cmd, wait_for_marker=wait_for_marker, max_wait=max_wait)
+        lock_file = None
+        with self._lock:
+            if self._closed:
+                raise JobManagerClosedError("The backend is shutting down")
+            if lifecycle:
+                running = self._lifecycle_job
+                if running is not None and not running.finished:
+                    raise JobConflictError(running)
+                lock_file = open(self.lock_path, "a")
+                try:
+                    fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except BlockingIOError:
+                    lock_file.close()
+                    raise JobConflictError()
+                self._lifecycle_job = job
+            self._jobs[job.id] = job
+            self._order.append(job.id)
+            self._prune()
+
+        thread = threading.Thread(target=self._run, args=(job, lock_file, clear_log),
+                                  name=f"job-{job.id}", daemon=True)
+        thread.start()
+        return job
+
+    def wait_idle(self, timeout: float = None) -> bool:
+        """
+        Wait until no job is running. Returns False if `timeout` expired first.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._lock:
+                running = [j for j in self._jobs.values() if not j.finished]
+            if not running:
+                return True
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                return False
+            running[0].lines_since(float("inf"), timeout=min(0.5, remaining or 0.5))
+
+    def _prune(self):
+        while len(self._order) > self.KEEP_FINISHED:
+            oldest = self._jobs[self._order[0]]
+            if not oldest.finished:
+                break
+            self._order.popleft()
+            del self._jobs[oldest.id]
+
+    def _run(self, job: Job, lock_file, clear_log: bool):
+        log_file = None
+        proc = None
+        result = (Job.FAILED, "execution_error", -2)
+        try:
+            os.makedirs(os.path.dirname(self.log_path), exist_ok=True)
+            log_file = open(self.log_path, "w" if clear_log else "a")
+            if clear_log:
+                self.logger.info(f"Cleared log file {self.log_path} for {job.action} command")
+            timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            log_file.write(f"=== {job.action} command started at {timestamp} ===\n")
+            log_file.flush()
+
+            self.logger.info(f"Job {job.id}: executing action '{job.action}' with command: {' '.join(job.cmd)}")
+            count_spawn(job.cmd)
+            proc = subprocess.Popen(
+                job.cmd,
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+            )
+            job.pid = proc.pid
+            result = self._follow(job, proc, log_file)
+        except Exception as e:
+            self.logger.error(f"Job {job.id}: error running '{job.action}': {str(e)}")
+            if proc is not None and proc.poll() is None:
+                proc.kill()
+                proc.wait()
+            result = (Job.FAILED, f"execution_error: {str(e)}", -2)
+        finally:
+            if log_file is not None:
+                log_file.close()
+            if proc is not None and proc.stdout is not None:
+                proc.stdout.close()
+            if lock_file is not None:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+                lock_file.close()
+            # only mark the job finished once the board lock is free again
+            job.finish(*result)
+            self.logger.info(f"Job {job.id} ({job.action}) finished: {job.status}")
+
+    def _follow(self, job: Job, proc, log_file):
+        """
+        Read the child's output as it is produced, mirror it to the log file
+        and the job buffer, and decide how the job ends.
+
+        Returns:
+            tuple: (status, details, exit_code) to finish the job with
+        """
+        started = time.monotonic()
+        marker = job.wait_for_marker.encode() if job.wait_for_marker else None
+        fd = proc.stdout.fileno()
+        os.set_blocking(fd, False)
+        partial = b""
+        eof = False
+
+        with selectors.DefaultSelector() as sel:
+            sel.register(fd, selectors.EVENT_READ)
+            while True:
+                elapsed = time.monotonic() - started
+                if job.cancel_requested:
+                    self._terminate(proc)
+                    return Job.CANCELLED, "Cancelled", proc.returncode
+                if elapsed > job.max_wait:
+                    what = f"No {job.wait_for_marker} in {job.max_wait}s" if marker else \
+                        f"Action did not finish in {job.max_wait}s"
+                    self.logger.warning(f"Timeout: {what}.")
+                    self._terminate(proc)
+                    return Job.TIMEOUT, what, -1
+                if eof:
+                    break
+
+                if not sel.select(min(1.0, job.max_wait - elapsed)):
+                    continue
+                try:
+                    data = os.read(fd, 65536)
+                except BlockingIOError:
+                    continue
+                if not data:
+                    eof = True
+                    data = b"\n" if partial else b""
+                data = partial + data
+                *complete, partial = data.split(b"\n")
+                for raw in complete:
+                    text = raw.decode("utf-8", errors="replace").rstrip("\r")
+                    log_file.write(text + "\n")
+                    job.append(text)
+                    if marker and job.time_to_cell_up is None and marker in raw:
+                        job.time_to_cell_up = round(time.monotonic() - started, 3)
+                if marker and job.time_to_cell_up is None and marker in partial:
+                    # the marker may arrive without a trailing newline
+                    job.time_to_cell_up = round(time.monotonic() - started, 3)
+                    log_file.write(partial.decode("utf-8", errors="replace") + "\n")
+                    job.append(partial.decode("utf-8", errors="replace"))
+                    partial = b""
+                log_file.flush()
+
+                if marker and job.time_to_cell_up is not None:
+                    self.logger.info(f"Setup is successful, gNB is now active "
+                                     f"({job.wait_for_marker} after {job.time_to_cell_up}s)")
+                    self._terminate(proc)
+                    return Job.SUCCEEDED, None, proc.returncode
+
+        try:
+            proc.wait(timeout=max(0.1, job.max_wait - (time.monotonic() - started)))
+        except subprocess.TimeoutExpired:
+            self._terminate(proc)
+            return Job.TIMEOUT, f"Action did not exit within {job.max_wait}s", -1
+        if marker:
+            self.logger.warning(f"Process terminated prematurely with code {proc.returncode}.")
+            return (Job.FAILED,
+                    f"Process terminated (code {proc.returncode}) before {job.wait_for_marker} was detected.",
+                    proc.returncode)
+        self.logger.info(f"Action '{job.action}' completed with exit code {proc.returncode}")
+        return Job.SUCCEEDED, None, proc.returncode
+
+    @staticmethod
+    def _terminate(proc):
+        if proc.poll() is not None:
+            return
+        proc.send_signal(signal.SIGTERM)
+        try:
+            proc.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+            proc.wait()
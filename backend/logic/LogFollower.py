@@ -0,0 +1,200 @@
+import os
+import threading
+
+from .Metrics import log_bytes_counter
+
+
+class LogFollower:
+    """
+    Follows an append-only log file incrementally, like `tail -F`.
+
+    The file is kept open and only newly appended bytes are read on each
+    `poll()`. Rotation (the path now points at a different inode) and
+    truncation (the file shrank below our offset) are detected from a single
+    `stat` per poll. Complete lines are handed to the registered listeners as
+    one bytes block per poll; an incomplete trailing line is held back until
+    its newline arrives.
+    """
+
+    CHUNK_SIZE = 1024 * 1024
+    MAX_PARTIAL = 64 * 1024   # cap on a held-back line with no newline yet
+    MAX_SEED_SCAN = 64 * 1024 * 1024
+
+    def __init__(self, path: str, start_at_end: bool = True, seed_bytes: int = 64 * 1024,
+                 seed_marker: bytes = None):
+        """
+        Args:
+            path (str): File to follow
+            start_at_end (bool): On first open skip existing content, except
+                for the last `seed_bytes` which are replayed so listeners can
+                rebuild their state without rescanning the whole file
+            seed_bytes (int): Size of the replayed tail on first open
+            seed_marker (bytes): If the replayed tail does not contain this,
+                replay from the last line that does instead (looking back at
+                most MAX_SEED_SCAN bytes), so state that was last logged long
+                ago is rebuilt too
+        """
+        self.path = path
+        self.start_at_end = start_at_end
+        self.seed_bytes = seed_bytes
+        self.seed_marker = seed_marker
+        self.offset = 0
+        self.inode = None
+        self.bytes_read = 0
+        self._read_counter = log_bytes_counter(path)
+        self.rotations = 0
+        self.truncations = 0
+        self._fd = None
+        self._partial = b""
+        self._opened_once = False
+        self._lock = threading.Lock()
+        self._listeners = []
+        self._reset_listeners = []
+
+    def add_listener(self, func):
+        """
+        `func(data: bytes)` is called with each block of complete lines.
+        """
+        self._listeners.append(func)
+
+    def add_reset_listener(self, func):
+        """
+        `func(reason: str)` is called when the file is rotated, truncated or
+        disappears, before any bytes of the new file are delivered.
+        """
+        self._reset_listeners.append(func)
+
+    def poll(self) -> int:
+        """
+        Read whatever was appended since the last poll.
+
+        Returns:
+            int: Number of new bytes read
+        """
+        with self._lock:
+            try:
+                st = os.stat(self.path)
+            except FileNotFoundError:
+                if self._fd is not None:
+                    self._close()
+                    self._reset("missing")
+                return 0
+
+            total = 0
+            if self._fd is not None and st.st_ino != self.inode:
+                # Rotated: drain what is left in the old file, then switch over
+                total += self._read_available()
+                self._close()
+                self.rotations += 1
+                self._reset("rotated")
+
+            if self._fd is None:
+                self._open(st)
+            elif st.st_size < self.offset:
+                self.truncations += 1
+                self.offset = 0
+                self._partial = b""
+                self._reset("truncated")
+
+            if st.st_size > self.offset:
+                total += self._read_available()
+            return total
+
+    def close(self):
+        with self._lock:
+            self._close()
+
+    def _open(self, st):
+        self._fd = os.open(self.path, os.O_RDONLY)
+        self.inode = st.st_ino
+        self._partial = b""
+        if not self._opened_once and self.start_at_end:
+            self.offset = max(0, st.st_size - self.seed_bytes)
+            if self.offset > 0:
+                # drop the (probably partial) line we landed in the middle of
+                self._skip_to_next_line()
+            if self.seed_marker and self.offset > 0:
+                found = self._find_last(self.seed_marker, st.st_size)
+                if found is not None and found < self.offset:
+                    self.offset = found
+        else:
+            self.offset = 0
+        self._opened_once = True
+
+    def _find_last(self, marker: bytes, end: int):
+        """
+        Start offset of the last line before `end` containing `marker`, or
+        None if there is none within MAX_SEED_SCAN bytes.
+        """
+        block_size = 64 * 1024
+        limit = max(0, end - self.MAX_SEED_SCAN)
+        pos = end
+        while pos > limit:
+            start = max(limit, pos - block_size)
+            # overlap so a marker across the block boundary is still found
+            block = os.pread(self._fd, min(end, pos + len(marker) - 1) - start, start)
+            idx = block.rfind(marker)
+            if idx >= 0:
+                line = block.rfind(b"\n", 0, idx)
+                if line >= 0:
+                    return start + line + 1
+                # the line starts in an earlier block
+                pos = start
+                while pos > 0:
+                    back = max(0, pos - block_size)
+                    line = os.pread(self._fd, pos - back, back).rfind(b"\n")
+                    if line >= 0:
+                        return back + line + 1
+                    pos = back
+                return 0
+            pos = start
+        return None
+
+    def _skip_to_next_line(self):
+        while True:
+            data = os.pread(self._fd, 4096, self.offset)
+            if not data:
+                return
+            idx = data.find(b"\n")
+            if idx >= 0:
+                self.offset += idx + 1
+                return
+            self.offset += len(data)
+
+    def _read_available(self) -> int:
+        total = 0
+        while True:
+            data = os.pread(self._fd, self.CHUNK_SIZE, self.offset)
+            if not data:
+                break
+            self.offset += len(data)
+            total += len(data)
+            self._deliver(data)
+            if len(data) < self.CHUNK_SIZE:
+                break
+        self.bytes_read += total
+        self._read_counter.value += total
+        return total
+
+    def _deliver(self, data: bytes):
+        data = self._partial + data
+        end = data.rfind(b"\n")
+        if end < 0:
+            self._partial = data[-self.MAX_PARTIAL:]
+            return
+        self._partial = data[end + 1:][-self.MAX_PARTIAL:]
+        complete = data[:end + 1]
+        for func in self._listeners:
+            func(complete)
+
+    def _reset(self, reason: str):
+        self._partial = b""
+        for func in self._reset_listeners:
+            func(reason)
+
+    def _close(self):
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+        self.inode = None
+        self.offset = 0
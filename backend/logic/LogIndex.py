@@ -0,0 +1,304 @@
+import bisect
+import os
+import re
+import threading
+import time
+from array import array
+
+from .LogFollower import LogFollower
+from .Metrics import log_bytes_counter
+
+TOKEN_RE = re.compile(rb"[A-Za-z_][A-Za-z0-9_]{2,}")
+UNBOUNDED_RE = re.compile(r"[+*]|\{\d*,\}")
+
+
+def has_nested_quantifier(pattern: str) -> bool:
+    r"""
+    True if a group repeated without bound itself contains an unbounded
+    quantifier, as in (a+)+ or (\w+\s?)*, the shape behind catastrophic
+    backtracking that no deadline check can interrupt.
+    """
+    stack = [False]   # per open group: does it contain an unbounded quantifier
+    i = 0
+    n = len(pattern)
+    while i < n:
+        c = pattern[i]
+        if c == "\\":
+            i += 2
+            continue
+        if c == "[":
+            j = i + 1
+            if j < n and pattern[j] == "^":
+                j += 1
+            if j < n and pattern[j] == "]":
+                j += 1
+            while j < n and pattern[j] != "]":
+                j += 2 if pattern[j] == "\\" else 1
+            i = j + 1
+            continue
+        if c == "(":
+            stack.append(False)
+        elif c == ")" and len(stack) > 1:
+            inner = stack.pop()
+            if inner and UNBOUNDED_RE.match(pattern, i + 1):
+                return True
+            stack[-1] = stack[-1] or inner
+        elif UNBOUNDED_RE.match(pattern, i):
+            stack[-1] = True
+        i += 1
+    return False
+
+
+class LogIndex:
+    """
+    Incrementally built index over one log file.
+
+    `line_offsets` is a compact array of the byte offset at which every
+    `stride`-th complete line starts, fed by a LogFollower so only newly
+    appended bytes are ever processed. The stride starts at 1 and doubles
+    whenever the array would grow past MAX_OFFSETS, so the index stays
+    bounded however long the log gets; lines in between are found by
+    counting newlines from the nearest sampled offset. With `index_tokens`
+    enabled it also keeps, for each identifier-like token, the array of
+    line numbers it occurs on, so whole-word searches touch only the
+    matching lines.
+
+    Searches run against the indexed part of the file and read it in blocks
+    with pread, so they never hold the index lock while scanning and can
+    run alongside the indexer. The regex is applied to slices of about
+    SCAN_SLICE bytes cut at line boundaries, and the deadline is checked
+    between slices, so a pathological pattern cannot pin a worker for
+    longer than one slice takes.
+    """
+
+    SCAN_BLOCK = 1024 * 1024
+    SCAN_SLICE = 64 * 1024
+    MAX_OFFSETS = 1 << 20        # 8 MiB of offsets
+    MAX_TOKENS = 200000
+
+    def __init__(self, path: str, index_tokens: bool = False):
+        self.path = path
+        self.index_tokens = index_tokens
+        self.line_offsets = array("Q")
+        self.stride = 1              # lines per entry in line_offsets
+        self.lines = 0
+        self.indexed_until = 0       # offset just after the last indexed line
+        self.generation = 0          # bumped when the file is rotated or truncated
+        self.tokens = {}
+        self.tokens_overflowed = False
+        self.last_update = None
+        self._lock = threading.Lock()
+        self._read_counter = log_bytes_counter(path)
+        self._follower = LogFollower(path, start_at_end=False)
+        self._follower.add_listener(self._on_data)
+        self._follower.add_reset_listener(self._on_reset)
+
+    @property
+    def line_count(self) -> int:
+        return self.lines
+
+    def poll(self):
+        """
+        Index whatever was appended since the last poll.
+        """
+        self._follower.poll()
+        self.last_update = time.time()
+
+    def status(self):
+        return {
+            "path":          self.path,
+            "lines":         self.line_count,
+            "offset_stride": self.stride,
+            "indexed_bytes": self.indexed_until,
+            "tokens":        len(self.tokens) if self.index_tokens else None,
+            "last_update":   self.last_update,
+        }
+
+    def _on_reset(self, reason: str):
+        with self._lock:
+            self.line_offsets = array("Q")
+            self.stride = 1
+            self.lines = 0
+            self.indexed_until = 0
+            self.tokens = {}
+            self.tokens_overflowed = False
+            self.generation += 1
+
+    def _on_data(self, data: bytes):
+        with self._lock:
+            base = self.indexed_until
+            first_line = line = self.lines
+            stride = self.stride
+            offsets = array("Q")
+            pos = 0
+            find = data.find
+            while True:
+                if line % stride == 0:
+                    offsets.append(base + pos)
+                line += 1
+                nl = find(b"\n", pos)
+                pos = nl + 1
+                if pos >= len(data):
+                    break
+            self.line_offsets.extend(offsets)
+            # keep every other sample rather than let the array grow without bound;
+            # slicing builds a new array, so searches holding the old one are unaffected
+            while len(self.line_offsets) > self.MAX_OFFSETS:
+                self.line_offsets = self.line_offsets[::2]
+                self.stride *= 2
+            self.lines = line
+            self.indexed_until = base + len(data)
+            if self.index_tokens:
+                self._index_tokens(data, first_line)
+
+    def _index_tokens(self, data: bytes, first_line: int):
+        tokens = self.tokens
+        for i, line in enumerate(data.split(b"\n")[:-1]):
+            line_no = first_line + i
+            for token in set(TOKEN_RE.findall(line)):
+                postings = tokens.get(token)
+                if postings is None:
+                    if len(tokens) >= self.MAX_TOKENS:
+                        self.tokens_overflowed = True
+                        continue
+                    postings = tokens[token] = array("I")
+                postings.append(line_no)
+
+    # ------------------------------------------------------------------ search
+
+    def search(self, pattern: str, ignore_case: bool = False, word: bool = False,
+               context: int = 0, limit: int = 100, from_line: int = 0, deadline: float = None):
+        """
+        Generator of matches, in file order, as dicts with the 1-based line
+        number, its byte offset, the text and up to `context` lines around it.
+        Stops after `limit` matches or when `deadline` (time.monotonic()) passes.
+        Yields nothing if the file has been removed since it was indexed.
+
+        Raises:
+            re.error: If `pattern` is not a valid regular expression or
+                repeats a group that itself repeats without bound
+        """
+        flags = re.MULTILINE | (re.IGNORECASE if ignore_case else 0)
+        source = pattern.encode("utf-8")
+        if word:
+            source = rb"\b" + re.escape(source) + rb"\b"
+        regex = re.compile(source, flags)
+        if not word and has_nested_quantifier(pattern):
+            raise re.error("nested quantifiers are not supported")
+
+        with self._lock:
+            generation = self.generation
+            offsets = self.line_offsets
+            stride = self.stride
+            end = self.indexed_until
+            postings = None
+            if word and self.index_tokens and not ignore_case:
+                token = pattern.encode("utf-8")
+                if TOKEN_RE.fullmatch(token):
+                    postings = self.tokens.get(token)
+                    if postings is None and not self.tokens_overflowed:
+                        return
+                    if postings is not None:
+                        postings = array("I", postings)
+            line_count = self.lines
+
+        if line_count == 0:
+            return
+        try:
+            f = open(self.path, "rb")
+        except FileNotFoundError:
+            return   # rotated away; the follower resets the index on its next poll
+        with f:
+            fd = f.fileno()
+            if postings is not None:
+                candidates = (n for n in postings if n >= from_line)
+            else:
+                candidates = self._scan(fd, regex, offsets, stride, line_count, end, from_line, deadline)
+
+            found = 0
+            for line_no in candidates:
+                if self.generation != generation:
+                    return   # file was rotated under us
+                if deadline is not None and time.monotonic() > deadline:
+                    return
+                lo = max(0, line_no - context)
+                hi = min(line_count, line_no + context + 1)
+                lines = self._lines(fd, offsets, stride, line_count, end, lo, hi)
+                offset, text = lines[line_no - lo]
+                if postings is not None and not regex.search(text):
+                    continue
+                result = {
+                    "line":   line_no + 1,
+                    "offset": offset,
+                    "text":   text.decode("utf-8", errors="replace"),
+                }
+                if context:
+                    result["before"] = [t.decode("utf-8", errors="replace") for _, t in lines[:line_no - lo]]
+                    result["after"] = [t.decode("utf-8", errors="replace") for _, t in lines[line_no - lo + 1:]]
+                yield result
+                found += 1
+                if found >= limit:
+                    return
+
+    def _scan(self, fd, regex, offsets, stride, line_count, end, from_line, deadline):
+        """
+        Yield line numbers whose text matches `regex`, reading the file in
+        blocks that start at sampled offsets and searching each block one
+        line-aligned slice at a time.
+        """
+        samples = (line_count + stride - 1) // stride
+        sample = from_line // stride
+        while sample < samples:
+            start = offsets[sample]
+            # extend the block to whole samples, at least one
+            last = bisect.bisect_right(offsets, start + self.SCAN_BLOCK, sample + 1, samples)
+            block_end = offsets[last] if last < samples else end
+            block = os.pread(fd, block_end - start, start)
+            self._read_counter.value += len(block)
+            line = sample * stride
+            pos = 0
+            while line < from_line and pos < len(block):
+                pos = block.find(b"\n", pos) + 1 or len(block)
+                line += 1
+            while pos < len(block):
+                if deadline is not None and time.monotonic() > deadline:
+                    return
+                nl = block.find(b"\n", pos + self.SCAN_SLICE - 1)
+                slice_end = nl + 1 if nl >= 0 else len(block)
+                while True:
+                    m = regex.search(block, pos, slice_end)
+                    if m is None or m.start() >= slice_end:
+                        break   # an empty match at the cut belongs to the next slice
+                    line_no = line + block.count(b"\n", pos, m.start())
+                    yield line_no
+                    line = line_no + 1
+                    pos = block.find(b"\n", m.start(), slice_end) + 1 or slice_end
+                    if pos >= slice_end:
+                        break
+                line += block.count(b"\n", pos, slice_end)
+                pos = slice_end
+            sample = last
+
+    def _lines(self, fd, offsets, stride, line_count, end, lo, hi):
+        """
+        Read lines `lo` up to `hi` with a single pread from the nearest
+        sampled offset.
+
+        Returns:
+            list: (byte offset, text without line ending) per line
+        """
+        samples = (line_count + stride - 1) // stride
+        first = lo // stride
+        last = (hi - 1) // stride + 1
+        start = offsets[first]
+        stop = offsets[last] if last < samples else end
+        data = os.pread(fd, stop - start, start)
+        self._read_counter.value += len(data)
+        lines = []
+        pos = 0
+        for line_no in range(first * stride, hi):
+            nxt = data.find(b"\n", pos) + 1 or len(data)
+            if line_no >= lo:
+                lines.append((start + pos, data[pos:nxt].rstrip(b"\r\n")))
+            pos = nxt
+        return lines
@@ -0,0 +1,170 @@
+import os
+import zlib
+
+from .Metrics import log_bytes_counter
+
+
+class LogReader:
+    """
+    Random-access paging over a (possibly very large, growing) text log.
+
+    Every read touches only the bytes it returns plus at most one block of
+    look-around: `tail` walks backwards from the end (or from a given
+    offset) block by block until it has enough newlines, and `read_from`
+    walks forwards. Offsets are byte offsets, and a page always starts and
+    ends on a line boundary, so `start_offset` / `end_offset` of one page can
+    be fed back as `before_offset` / `from_offset` to get the next one.
+    """
+
+    BLOCK_SIZE = 64 * 1024
+    MAX_LINES = 10000
+    MAX_BYTES = 8 * 1024 * 1024
+
+    def __init__(self, path: str):
+        self.path = path
+        self._read_counter = log_bytes_counter(path)
+
+    def stat(self):
+        return os.stat(self.path)
+
+    @staticmethod
+    def etag(st) -> str:
+        """
+        Cheap validator derived from the file identity, no content hashing.
+        """
+        return f"{st.st_ino:x}-{st.st_mtime_ns:x}-{st.st_size:x}"
+
+    def tail(self, lines: int, before_offset: int = None):
+        """
+        Return up to `lines` complete lines ending just before `before_offset`
+        (default: end of file). As in `read_from`, a trailing line without
+        newline (still being written) is left out, so `end_offset` is a safe
+        `from_offset` to follow the file from.
+
+        Returns:
+            dict: lines, start_offset, end_offset, size
+        """
+        lines = max(0, min(lines, self.MAX_LINES))
+        with open(self.path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            end = size if before_offset is None else max(0, min(before_offset, size))
+            end = self._line_end(f, end)
+            # the newline terminating the last line does not start a new one
+            search_end = max(0, end - 1)
+
+            start = end if lines == 0 else 0
+            needed = lines
+            pos = search_end
+            while needed > 0 and pos > 0:
+                block_start = max(0, pos - self.BLOCK_SIZE)
+                block = self._pread(f, block_start, pos - block_start)
+                idx = len(block)
+                while needed > 0:
+                    idx = block.rfind(b"\n", 0, idx)
+                    if idx < 0:
+                        break
+                    needed -= 1
+                    start = block_start + idx + 1
+                if needed > 0 and end - block_start >= self.MAX_BYTES:
+                    # page size cap reached: return the lines found so far
+                    if start == 0:
+                        start = search_end
+                    break
+                pos = block_start
+            else:
+                if needed > 0:
+                    # ran into the start of the file: the first line is in the page too
+                    start = 0
+            data = self._pread(f, start, end - start)
+
+        page = data.split(b"\n")
+        if page and page[-1] == b"":
+            page.pop()
+        return {
+            "lines":        [l.decode("utf-8", errors="replace") for l in page],
+            "start_offset": start,
+            "end_offset":   end,
+            "size":         size,
+        }
+
+    def read_from(self, from_offset: int, lines: int = 500, max_bytes: int = None):
+        """
+        Return up to `lines` complete lines starting at `from_offset`. A
+        trailing line without newline (still being written) is left out, so
+        `end_offset` is always a safe place to resume from.
+
+        Returns:
+            dict: lines, start_offset, end_offset, size
+        """
+        lines = max(0, min(lines, self.MAX_LINES))
+        max_bytes = min(max_bytes or self.MAX_BYTES, self.MAX_BYTES)
+        with open(self.path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            start = max(0, min(from_offset, size))
+            if start > 0 and self._pread(f, start - 1, 1) != b"\n":
+                # landed mid-line: move to the start of the next line
+                while start < size:
+                    block = self._pread(f, start, self.BLOCK_SIZE)
+                    idx = block.find(b"\n")
+                    if idx >= 0:
+                        start += idx + 1
+                        break
+                    start += len(block)
+            page = []
+            pos = start
+            buf = b""
+            while len(page) < lines and pos < size and pos - start < max_bytes:
+                block = self._pread(f, pos, min(self.BLOCK_SIZE, size - pos))
+                if not block:
+                    break
+                pos += len(block)
+                buf += block
+                parts = buf.split(b"\n")
+                buf = parts.pop()
+                page.extend(parts)
+            page = page[:lines]
+            end = start + sum(len(l) + 1 for l in page)
+        return {
+            "lines":        [l.decode("utf-8", errors="replace") for l in page],
+            "start_offset": start,
+            "end_offset":   end,
+            "size":         size,
+        }
+
+    def _line_end(self, f, offset: int) -> int:
+        """
+        `offset` moved back to just after the last newline before it.
+        """
+        pos = offset
+        while pos > 0:
+            block_start = max(0, pos - self.BLOCK_SIZE)
+            idx = self._pread(f, block_start, pos - block_start).rfind(b"\n")
+            if idx >= 0:
+                return block_start + idx + 1
+            pos = block_start
+        return 0
+
+    def gzip_chunks(self, start: int = 0, end: int = None, level: int = 6):
+        """
+        Generator of gzip-compressed chunks of bytes [start, end), compressed
+        on the fly with bounded memory.
+        """
+        compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+        with open(self.path, "rb") as f:
+            if end is None:
+                end = os.fstat(f.fileno()).st_size
+            pos = start
+            while pos < end:
+                block = self._pread(f, pos, min(self.BLOCK_SIZE, end - pos))
+                if not block:
+                    break
+                pos += len(block)
+                out = compressor.compress(block)
+                if out:
+                    yield out
+        yield compressor.flush()
+
+    def _pread(self, f, offset: int, length: int) -> bytes:
+        data = os.pread(f.fileno(), length, offset)
+        self._read_counter.value += len(data)
+        return data
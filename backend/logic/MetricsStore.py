@@ -0,0 +1,204 @@
+import mmap
+import os
+import struct
+import threading
+import time
+
+MAGIC = b"GNBMETR1"
+FORMAT_VERSION = 1
+NAME_SIZE = 32
+# (resolution seconds, slots): 1 s for an hour, 1 min for a day, 1 h for a month
+DEFAULT_TIERS = ((1, 3600), (60, 1440), (3600, 720))
+FIELDS = 4   # min, max, sum, count
+
+
+class MetricsStore:
+    """
+    Fixed-size, memory-mapped store of metric history at several resolutions.
+
+    Every series has one ring buffer per tier. A ring slot holds the bucket
+    number it currently describes plus (min, max, sum, count) as float32,
+    i.e. 20 bytes per slot. Recording a sample updates the current bucket of
+    every tier in place, so min/avg/max rollups are always up to date and
+    nothing is ever recomputed from raw samples.
+
+    The whole store lives in one file that is mapped into memory: there is
+    no load step on startup, the kernel writes dirty pages back, and the
+    footprint is fixed by `max_series` and the tiers:
+    max_series * sum(slots) * 20 bytes (about 3.7 MB for the defaults).
+    """
+
+    def __init__(self, path: str, tiers=DEFAULT_TIERS, max_series: int = 32):
+        self.path = path
+        self.tiers = tuple((int(res), int(slots)) for res, slots in tiers)
+        self.max_series = max_series
+        self._lock = threading.Lock()
+        self._series = {}
+
+        self._header_size = self._align(
+            len(MAGIC) + 12 + 8 * len(self.tiers) + NAME_SIZE * max_series)
+        self._slots_per_series = sum(slots for _, slots in self.tiers)
+        self._series_size = self._slots_per_series * (4 + 4 * FIELDS)
+        size = self._header_size + self._series_size * max_series
+
+        self._mmap = self._open(size)
+        view = memoryview(self._mmap)
+        data = view[self._header_size:]
+        # one uint32 bucket array and one float32 value array per (series, tier)
+        self._buckets = []
+        self._values = []
+        for s in range(max_series):
+            base = s * self._series_size
+            buckets, values = [], []
+            for _, slots in self.tiers:
+                buckets.append(data[base:base + 4 * slots].cast("I"))
+                base += 4 * slots
+                values.append(data[base:base + 4 * FIELDS * slots].cast("f"))
+                base += 4 * FIELDS * slots
+            self._buckets.append(buckets)
+            self._values.append(values)
+        self._load_names()
+
+    @staticmethod
+    def _align(n: int) -> int:
+        return (n + 4095) & ~4095
+
+    def _header(self) -> bytes:
+        header = MAGIC + struct.pack("<III", FORMAT_VERSION, self.max_series, len(self.tiers))
+        for res, slots in self.tiers:
+            header += struct.pack("<II", res, slots)
+        return header
+
+    def _open(self, size: int):
+        header = self._header()
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            existing = os.pread(fd, len(header), 0)
+            if existing != header or os.fstat(fd).st_size != size:
+                # new file or a different layout: start over
+                os.ftruncate(fd, 0)
+                os.ftruncate(fd, size)
+                os.pwrite(fd, header, 0)
+            return mmap.mmap(fd, size)
+        finally:
+            os.close(fd)
+
+    def _names_offset(self) -> int:
+        return len(self._header())
+
+    def _load_names(self):
+        base = self._names_offset()
+        for i in range(self.max_series):
+            raw = self._mmap[base + i * NAME_SIZE: base + (i + 1) * NAME_SIZE].rstrip(b"\x00")
+            if raw:
+                self._series[raw.decode()] = i
+
+    def series(self):
+        return sorted(self._series)
+
+    def _index(self, name: str) -> int:
+        index = self._series.get(name)
+        if index is not None:
+            return index
+        encoded = name.encode()
+        if len(encoded) > NAME_SIZE:
+            raise ValueError(f"Series name too long: {name}")
+        if len(self._series) >= self.max_series:
+            raise ValueError(f"Metrics store is full ({self.max_series} series)")
+        index = len(self._series)
+        base = self._names_offset() + index * NAME_SIZE
+        self._mmap[base:base + NAME_SIZE] = encoded.ljust(NAME_SIZE, b"\x00")
+        self._series[name] = index
+        return index
+
+    def record(self, name: str, value, timestamp: float = None):
+        """
+        Add one sample to `name`, updating the rollups of every tier.
+        Non-numeric values (e.g. an attribute not refreshed yet) are ignored.
+        """
+        try:
+            value = float(value)
+        except (TypeError, ValueError):
+            return
+        now = time.time() if timestamp is None else timestamp
+        with self._lock:
+            s = self._index(name)
+            for t, (res, slots) in enumerate(self.tiers):
+                bucket = int(now // res)
+                slot = bucket % slots
+                buckets = self._buckets[s][t]
+                values = self._values[s][t]
+                v = slot * FIELDS
+                if buckets[slot] != bucket or values[v + 3] == 0:
+                    buckets[slot] = bucket
+                    values[v] = value
+                    values[v + 1] = value
+                    values[v + 2] = value
+                    values[v + 3] = 1
+                else:
+                    if value < values[v]:
+                        values[v] = value
+                    if value > values[v + 1]:
+                        values[v + 1] = value
+                    values[v + 2] += value
+                    values[v + 3] += 1
+
+    def record_many(self, samples: dict, timestamp: float = None):
+        now = time.time() if timestamp is None else timestamp
+        for name, value in samples.items():
+            self.record(name, value, now)
+
+    def query(self, name: str, resolution: int = 1, since: float = None, until: float = None):
+        """
+        Return the buckets of `name` at `resolution` seconds, oldest first, as
+        dicts with the bucket start time and min/avg/max over the bucket.
+        """
+        tier = self._tier(resolution)
+        res, slots = self.tiers[tier]
+        now = time.time() if until is None else until
+        newest = int(now // res)
+        oldest = newest - slots + 1
+        if since is not None:
+            oldest = max(oldest, int(since // res))
+        with self._lock:
+            s = self._series.get(name)
+            if s is None:
+                return []
+            buckets = self._buckets[s][tier]
+            values = self._values[s][tier]
+            points = []
+            for bucket in range(oldest, newest + 1):
+                slot = bucket % slots
+                v = slot * FIELDS
+                if buckets[slot] != bucket or values[v + 3] == 0:
+                    continue
+                points.append({
+                    "t":   bucket * res,
+                    "min": round(values[v], 3),
+                    "avg": round(values[v + 2] / values[v + 3], 3),
+                    "max": round(values[v + 1], 3),
+                })
+        return points
+
+    def latest(self, name: str, count: int, resolution: int = 1):
+        """
+        The averages of the most recent `count` buckets, oldest first.
+        """
+        res, _ = self.tiers[self._tier(resolution)]
+        points = self.query(name, resolution, since=time.time() - res * count)
+        return [p["avg"] for p in points[-count:]]
+
+    def _tier(self, resolution: int) -> int:
+        for i, (res, _) in enumerate(self.tiers):
+            if res == resolution:
+                return i
+        raise ValueError(f"No tier with resolution {resolution}s "
+                         f"(available: {', '.join(str(r) for r, _ in self.tiers)})")
+
+    def footprint(self) -> int:
+        return len(self._mmap)
+
+    def flush(self):
+        with self._lock:
+            self._mmap.flush()
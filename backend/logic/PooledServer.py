@@ -0,0 +1,463 @@
+import json
+import queue
+import select
+import signal
+import socket
+import threading
+import time
+import traceback
+
+from werkzeug.serving import BaseWSGIServer, WSGIRequestHandler
+
+from .setupLogManger import LogManager
+from .Metrics import REGISTRY
+
+# bytes of an unread request body discarded to keep a connection alive
+DRAIN_LIMIT = 64 * 1024
+# an idle keep-alive connection checks this often whether a queued
+# connection needs its worker, and gives it up once idle this long
+IDLE_CHECK_INTERVAL = 0.1
+IDLE_GRACE = 0.25
+
+
+class RequestBody:
+    """
+    wsgi.input limited to the request's Content-Length. Keeps count of what
+    the application left unread so it can be discarded before the next
+    request on the same connection.
+    """
+
+    def __init__(self, rfile, length: int):
+        self.rfile = rfile
+        self.remaining = length
+
+    def _limit(self, size):
+        if size is None or size < 0 or size > self.remaining:
+            return self.remaining
+        return size
+
+    def read(self, size: int = -1) -> bytes:
+        size = self._limit(size)
+        if size <= 0:
+            return b""
+        data = self.rfile.read(size)
+        self.remaining = self.remaining - len(data) if data else 0
+        return data
+
+    def readline(self, size: int = -1) -> bytes:
+        size = self._limit(size)
+        if size <= 0:
+            return b""
+        data = self.rfile.readline(size)
+        self.remaining = self.remaining - len(data) if data else 0
+        return data
+
+    def __iter__(self):
+        while True:
+            line = self.readline()
+            if not line:
+                return
+            yield line
+
+    def drain(self, limit: int = DRAIN_LIMIT) -> bool:
+        """
+        Discard the unread rest of the body. False if more than `limit` bytes
+        were left, in which case the connection should be closed instead.
+        """
+        if self.remaining > limit:
+            return False
+        while self.remaining > 0:
+            if not self.read(min(self.remaining, 8192)):
+                return False
+        return True
+
+
+class KeepAliveRequestHandler(WSGIRequestHandler):
+    """
+    WSGI request handler with HTTP/1.1 keep-alive.
+
+    Werkzeug's handler closes every connection after one response. This one
+    keeps it open when the response length is known (Content-Length or
+    chunked) and the request body has been consumed, and waits at most the
+    server's `keepalive_timeout` for the next request.
+    """
+    protocol_version = "HTTP/1.1"
+
+    def setup(self):
+        super().setup()
+        self.requests_handled = 0
+        # headers and body go out in separate writes; without this Nagle holds
+        # the body back for the client's delayed ACK on a reused connection
+        if self.connection.family in (socket.AF_INET, socket.AF_INET6):
+            self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    def handle(self):
+        try:
+            self.close_connection = True
+            self.handle_one_request()
+            while not self.close_connection and self.wait_for_request():
+                self.handle_one_request()
+        except (ConnectionError, socket.timeout) as e:
+            self.connection_dropped(e)
+        finally:
+            self.server.connection_closed(self.connection)
+
+    def wait_for_request(self) -> bool:
+        """
+        Wait for the next request on this keep-alive connection. An idle
+        connection still holds its worker, so the wait is given up (and the
+        connection closed) after `keepalive_timeout`, or after IDLE_GRACE
+        while other connections are queued for a worker.
+        """
+        conn = self.connection
+        idle_since = time.monotonic()
+        self.server.connection_idle(conn)
+        # a pipelined request may already be buffered
+        conn.setblocking(False)
+        try:
+            if self.rfile.peek(1):
+                return True
+        finally:
+            conn.settimeout(self.server.io_timeout)
+        while True:
+            readable, _, _ = select.select([conn], [], [], IDLE_CHECK_INTERVAL)
+            if readable:
+                return True
+            if not self.server.keep_idle(time.monotonic() - idle_since):
+                return False
+
+    def parse_request(self) -> bool:
+        # the request line is in: this connection is busy again
+        self.server.connection_busy(self.connection)
+        return super().parse_request()
+
+    def log_request(self, code="-", size="-"):
+        if self.server.access_log:
+            super().log_request(code, size)
+
+    def log_error(self, format: str, *args) -> None:
+        # an idle keep-alive connection timing out is not an error
+        if not format.startswith("Request timed out"):
+            super().log_error(format, *args)
+
+    def send_json_error(self, code: int, message: str):
+        body = json.dumps({"error": message}).encode()
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Retry-After", "1")
+        self.send_header("Connection", "close" if self.close_connection else "keep-alive")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def run_wsgi(self):
+        if self.headers.get("Expect", "").lower().strip() == "100-continue":
+            self.wfile.write(b"HTTP/1.1 100 Continue\r\n\r\n")
+
+        self.environ = environ = self.make_environ()
+        body = None
+        if environ.get("HTTP_TRANSFER_ENCODING", "").strip().lower() == "chunked":
+            # only the application knows where a chunked body ends
+            self.close_connection = True
+        else:
+            body = RequestBody(self.rfile, int(environ.get("CONTENT_LENGTH") or 0))
+            environ["wsgi.input"] = body
+        self.requests_handled += 1
+        if not self.server.keep_alive_allowed(self.requests_handled):
+            self.close_connection = True
+
+        status_set = None
+        headers_set = None
+        headers_sent = False
+        chunked = False
+
+        def write(data: bytes):
+            nonlocal headers_sent, chunked
+            if not headers_sent:
+                headers_sent = True
+                code_str, _, msg = status_set.partition(" ")
+                code = int(code_str)
+                header_keys = {key.lower() for key, _ in headers_set}
+                if not ("content-length" in header_keys
+                        or environ["REQUEST_METHOD"] == "HEAD"
+                        or 100 <= code < 200
+                        or code in (204, 304)):
+                    if self.request_version == "HTTP/1.1":
+                        chunked = True
+                    else:
+                        self.close_connection = True
+                self.send_response(code, msg)
+                for key, value in headers_set:
+                    self.send_header(key, value)
+                if chunked:
+                    self.send_header("Transfer-Encoding", "chunked")
+                self.send_header("Connection", "close" if self.close_connection else "keep-alive")
+                self.end_headers()
+            if data:
+                if chunked:
+                    self.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+                else:
+                    self.wfile.write(data)
+
+        def start_response(status, headers, exc_info=None):
+            nonlocal status_set, headers_set
+            if exc_info:
+                try:
+                    if headers_sent:
+                        raise exc_info[1].with_traceback(exc_info[2])
+                finally:
+                    exc_info = None
+            elif headers_set:
+                raise AssertionError("Headers already set")
+            status_set = status
+            headers_set = headers
+            return write
+
+        def execute(app):
+            app_iter = app(environ, start_response)
+            stream = any(key.lower() == "content-type" and value.startswith("text/event-stream")
+                         for key, value in headers_set or ())
+            try:
+                if stream and not self.server.stream_opened(self.connection):
+                    self.send_json_error(503, "Too many open streams, retry later")
+                    return
+                for data in app_iter:
+                    write(data)
+                if not headers_sent:
+                    write(b"")
+                if chunked:
+                    self.wfile.write(b"0\r\n\r\n")
+            finally:
+                if stream:
+                    self.server.stream_closed(self.connection)
+                if hasattr(app_iter, "close"):
+                    app_iter.close()
+
+        try:
+            execute(self.server.app)
+        except (ConnectionError, socket.timeout) as e:
+            self.connection_dropped(e, environ)
+            self.close_connection = True
+            return
+        except Exception:
+            if self.server.passthrough_errors:
+                raise
+            self.close_connection = True
+            self.server.logger.error(f"Error on request {environ.get('PATH_INFO')}:\n{traceback.format_exc()}")
+            if not headers_sent:
+                try:
+                    self.send_json_error(500, "Internal server error")
+                except OSError:
+                    pass
+            return
+
+        if body is not None and not body.drain():
+            self.close_connection = True
+
+
+class PooledWSGIServer(BaseWSGIServer):
+    """
+    Production WSGI server: a fixed pool of `workers` threads serves the
+    accepted connections, at most `max_pending` more wait in a queue, and
+    anything beyond that is answered with 503 straight away instead of
+    spawning yet another thread.
+
+    Long-lived event streams (text/event-stream responses) hold a worker
+    each, so at most `max_streams` may be open at once; keep-alive
+    connections are only kept while nobody is queued for a worker, for at
+    most `max_keepalive_requests` requests and `keepalive_timeout` idle
+    seconds, and give up their worker to a queued connection once idle for
+    IDLE_GRACE. `io_timeout` bounds every socket read and write.
+    """
+    multithread = True
+    request_queue_size = 128    # listen backlog
+
+    def __init__(self, host: str, port: int, app, workers: int = 16, max_pending: int = 64,
+                 max_streams: int = None, keepalive_timeout: float = 5.0,
+                 max_keepalive_requests: int = 100, io_timeout: float = 30.0,
+                 access_log: bool = False):
+        self.workers = workers
+        self.max_streams = max_streams if max_streams is not None else max(1, workers // 2)
+        self.keepalive_timeout = keepalive_timeout
+        self.max_keepalive_requests = max_keepalive_requests
+        self.io_timeout = io_timeout
+        self.access_log = access_log
+        self.logger = LogManager.get_logger("server")
+        super().__init__(host, port, app, handler=KeepAliveRequestHandler)
+
+        self.draining = False
+        self.rejected = 0
+        self.stream_rejected = 0
+        self._pending = queue.Queue(maxsize=max_pending)
+        self._lock = threading.Lock()
+        self._busy = 0
+        self._idle = set()          # keep-alive connections waiting for a request
+        self._streams = set()       # connections serving an event stream
+        self._threads = [threading.Thread(target=self._worker, name=f"http-worker-{i}", daemon=True)
+                         for i in range(workers)]
+        for thread in self._threads:
+            thread.start()
+
+        REGISTRY.gauge("webdashboard_http_workers_busy", "HTTP workers handling a connection",
+                       lambda: self._busy)
+        REGISTRY.gauge("webdashboard_http_pending_connections", "Accepted connections waiting for a worker",
+                       lambda: self._pending.qsize())
+        REGISTRY.gauge("webdashboard_http_open_streams", "Open event stream connections",
+                       lambda: len(self._streams))
+        REGISTRY.gauge("webdashboard_http_rejected_total", "Connections and streams refused with 503",
+                       lambda: self.rejected + self.stream_rejected)
+
+    # ------------------------------------------------------------ connections
+
+    def process_request(self, request, client_address):
+        try:
+            self._pending.put_nowait((request, client_address))
+        except queue.Full:
+            self.rejected += 1
+            self._reject(request)
+            self.shutdown_request(request)
+
+    def _reject(self, request):
+        body = b'{"error": "Server busy, retry later"}'
+        try:
+            request.settimeout(1.0)
+            request.sendall(b"HTTP/1.1 503 Service Unavailable\r\n"
+                            b"Content-Type: application/json\r\n"
+                            b"Retry-After: 1\r\n"
+                            b"Connection: close\r\n"
+                            b"Content-Length: %d\r\n\r\n%s" % (len(body), body))
+        except OSError:
+            pass
+
+    def _worker(self):
+        while True:
+            item = self._pending.get()
+            if item is None:
+                return
+            request, client_address = item
+            with self._lock:
+                self._busy += 1
+            try:
+                request.settimeout(self.io_timeout)
+                self.finish_request(request, client_address)
+            except Exception:
+                self.handle_error(request, client_address)
+            finally:
+                self.shutdown_request(request)
+                with self._lock:
+                    self._busy -= 1
+
+    def keep_alive_allowed(self, requests_handled: int) -> bool:
+        # a queued connection gets the worker rather than an idle keep-alive client
+        return (not self.draining
+                and requests_handled < self.max_keepalive_requests
+                and self._pending.empty())
+
+    def keep_idle(self, idle_for: float) -> bool:
+        if idle_for >= self.keepalive_timeout or self.draining:
+            return False
+        return idle_for < IDLE_GRACE or self._pending.empty()
+
+    def connection_idle(self, conn):
+        with self._lock:
+            self._idle.add(conn)
+
+    def connection_busy(self, conn):
+        conn.settimeout(self.io_timeout)
+        with self._lock:
+            self._idle.discard(conn)
+
+    def connection_closed(self, conn):
+        with self._lock:
+            self._idle.discard(conn)
+
+    def stream_opened(self, conn) -> bool:
+        with self._lock:
+            if self.draining or len(self._streams) >= self.max_streams:
+                self.stream_rejected += 1
+                return False
+            self._streams.add(conn)
+            return True
+
+    def stream_closed(self, conn):
+        with self._lock:
+            self._streams.discard(conn)
+
+    # --------------------------------------------------------------- shutdown
+
+    def finish(self, timeout: float):
+        """
+        Called once serve_forever() has returned and the listening socket is
+        closed: end idle keep-alive connections and event streams, let the
+        requests in flight complete and stop the workers, waiting at most
+        `timeout` seconds.
+
+        Returns:
+            bool: True if every worker finished in time
+        """
+        deadline = time.monotonic() + timeout
+        with self._lock:
+            self.draining = True
+            # idle connections see EOF on their next read; a stream's next
+            # write fails, which ends its generator
+            for conn in self._idle:
+                _shutdown(conn, socket.SHUT_RD)
+            for conn in self._streams:
+                _shutdown(conn, socket.SHUT_RDWR)
+        for _ in self._threads:
+            self._pending.put(None)
+        for thread in self._threads:
+            thread.join(max(0.0, deadline - time.monotonic()))
+        return not any(thread.is_alive() for thread in self._threads)
+
+
+def _shutdown(conn, how):
+    try:
+        conn.shutdown(how)
+    except OSError:
+        pass
+
+
+def serve(server: PooledWSGIServer, drain=None, stop=None, drain_timeout: float = 150.0,
+          finish_timeout: float = 10.0):
+    """
+    Run `server` until SIGTERM or SIGINT, then shut down gracefully:
+
+      1. drain(drain_timeout) runs while requests are still served, e.g. to
+         refuse new setup_script jobs and wait for the running ones
+      2. the listening socket is closed and in-flight requests complete
+         (up to `finish_timeout` seconds)
+      3. stop() releases the application's background threads
+
+    A second signal skips the rest of the drain.
+    """
+    logger = server.logger
+    signals = []
+
+    def graceful():
+        if drain is not None:
+            try:
+                drain(drain_timeout)
+            except Exception as e:
+                logger.error(f"Drain failed: {e}")
+        server.shutdown()
+
+    def on_signal(signum, frame):
+        signals.append(signum)
+        if len(signals) == 1:
+            logger.info(f"Received signal {signum}, draining before shutdown")
+            threading.Thread(target=graceful, name="drain", daemon=True).start()
+        else:
+            logger.warning("Received second signal, shutting down without waiting for jobs")
+            threading.Thread(target=server.shutdown, name="shutdown", daemon=True).start()
+
+    signal.signal(signal.SIGTERM, on_signal)
+    signal.signal(signal.SIGINT, on_signal)
+    logger.info(f"Serving on {server.host}:{server.port} with {server.workers} workers")
+    server.serve_forever()
+
+    if not server.finish(finish_timeout):
+        logger.warning("Some requests were still running at shutdown")
+    if stop is not None:
+        stop()
+    logger.info("Server stopped")
@@ -0,0 +1,127 @@
+import os
+
+CLK_TCK = os.sysconf("SC_CLK_TCK")
+PAGE_SIZE = os.sysconf("SC_PAGE_SIZE")
+
+# gNB processes are whatever runs from the vendor install tree
+VENDOR_ROOT = "/opt/ste"
+
+
+class ProcessTable:
+    """
+    Minimal, subprocess-free view of /proc.
+
+    Processes are identified by (pid, start_time): a PID alone can be
+    reused after the process exits, but the start time (clock ticks since
+    boot, field 22 of /proc/<pid>/stat) can not, so a cached entry is
+    revalidated with a single read of its stat file.
+    """
+
+    def __init__(self, proc_root: str = "/proc"):
+        self.proc_root = proc_root
+
+    def _path(self, pid: int, name: str) -> str:
+        return f"{self.proc_root}/{pid}/{name}"
+
+    def pids(self):
+        for entry in os.listdir(self.proc_root):
+            if entry.isdigit():
+                yield int(entry)
+
+    def read_stat(self, pid: int):
+        """
+        Parse /proc/<pid>/stat.
+
+        Returns:
+            dict: comm, state, utime, stime (ticks), threads, start_time, or
+            None if the process is gone
+        """
+        try:
+            with open(self._path(pid, "stat"), "rb") as f:
+                data = f.read()
+        except OSError:
+            return None
+        # comm may itself contain spaces and parentheses
+        head, _, tail = data.rpartition(b")")
+        fields = tail.split()
+        return {
+            "comm":       head.partition(b"(")[2].decode(errors="replace"),
+            "state":      fields[0].decode(),
+            "utime":      int(fields[11]),
+            "stime":      int(fields[12]),
+            "threads":    int(fields[17]),
+            "start_time": int(fields[19]),
+        }
+
+    def start_time(self, pid: int):
+        stat = self.read_stat(pid)
+        return stat["start_time"] if stat else None
+
+    def alive(self, pid: int, start_time: int) -> bool:
+        stat = self.read_stat(pid)
+        return stat is not None and stat["start_time"] == start_time and stat["state"] != "Z"
+
+    def executable(self, pid: int):
+        """
+        Path of the program `pid` runs: the exe link when we may read it,
+        else argv[0] from the world-readable cmdline.
+        """
+        try:
+            return os.readlink(self._path(pid, "exe"))
+        except OSError:
+            pass
+        try:
+            with open(self._path(pid, "cmdline"), "rb") as f:
+                argv0 = f.read().split(b"\x00", 1)[0]
+        except OSError:
+            return None
+        return argv0.decode(errors="replace") or None
+
+    def scan(self, exe_prefix: str = VENDOR_ROOT):
+        """
+        Every live process whose executable lies under `exe_prefix`.
+
+        Returns:
+            list: (pid, start_time, executable) tuples, ordered by pid
+        """
+        prefix = exe_prefix.rstrip("/") + "/"
+        found = []
+        for pid in sorted(self.pids()):
+            exe = self.executable(pid)
+            if not exe or not exe.startswith(prefix):
+                continue
+            stat = self.read_stat(pid)
+            if stat is None or stat["state"] == "Z":
+                continue
+            found.append((pid, stat["start_time"], exe))
+        return found
+
+    def read_statm_rss(self, pid: int):
+        try:
+            with open(self._path(pid, "statm"), "rb") as f:
+                return int(f.read().split()[1]) * PAGE_SIZE
+        except (OSError, IndexError, ValueError):
+            return None
+
+    def read_ctx_switches(self, pid: int):
+        """
+        Returns:
+            tuple: (voluntary, involuntary) context switches, or (None, None)
+        """
+        voluntary = involuntary = None
+        try:
+            with open(self._path(pid, "status"), "rb") as f:
+                for line in f:
+                    if line.startswith(b"voluntary_ctxt_switches:"):
+                        voluntary = int(line.split()[1])
+                    elif line.startswith(b"nonvoluntary_ctxt_switches:"):
+                        involuntary = int(line.split()[1])
+        except OSError:
+            pass
+        return voluntary, involuntary
+
+    def fd_count(self, pid: int):
+        try:
+            return len(os.listdir(self._path(pid, "fd")))
+        except OSError:
+            return None
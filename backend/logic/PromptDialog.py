@@ -0,0 +1,176 @@
+import json
+import re
+import time
+
+import pexpect
+
+ENTER = "\n"
+CTRL_U = "\x15"   # kill line: clears a pre-filled answer on a terminal
+
+
+class Prompt:
+    """
+    One rule of a dialog script: when `pattern` matches the tool's output,
+    send `response`.
+
+    Patterns are matched against everything the tool printed since the last
+    match, so a pattern for a prompt should end in `\\Z`: a prompt is the
+    last thing a tool prints before it waits for input.
+    """
+
+    def __init__(self, name: str, pattern, response: str = ENTER):
+        self.name = name
+        self.pattern = re.compile(pattern) if isinstance(pattern, str) else pattern
+        self.response = response
+
+
+class DialogStep:
+    """
+    Wait for `prompt` and answer it, answering any of `also` as often as
+    they appear before it. A step without a prompt waits for the tool to
+    exit.
+    """
+
+    def __init__(self, prompt: Prompt = None, also=(), timeout: float = None):
+        self.prompt = prompt
+        self.also = tuple(also)
+        self.timeout = timeout     # None = the dialog's timeout
+        self.rules = ((prompt,) if prompt is not None else ()) + self.also
+        # compiled once; pexpect's expect_list takes them as they are
+        self.patterns = [rule.pattern for rule in self.rules] + [pexpect.EOF, pexpect.TIMEOUT]
+
+    @property
+    def name(self) -> str:
+        return self.prompt.name if self.prompt is not None else "exit"
+
+
+class DialogResult:
+
+    def __init__(self):
+        self.steps = []            # one dict per prompt answered, in order
+        self.completed = False     # True if the script ran to the end
+        self.error = None          # why it did not
+        self.elapsed = 0.0         # seconds from start to finish
+
+    def to_dict(self):
+        return {
+            "completed":  self.completed,
+            "error":      self.error,
+            "elapsed_ms": round(self.elapsed * 1000.0, 3),
+            "steps":      self.steps,
+        }
+
+
+class Transcript:
+    """
+    Timed record of a dialog, one JSON object per line: what the tool
+    printed ({"t", "out"}), what was sent back to which prompt
+    ({"t", "prompt", "in"}) and its exit status ({"t", "exit"}), with `t`
+    in seconds from the start. Written as it happens, so a dialog that
+    hangs still leaves its transcript behind.
+
+    Doubles as pexpect's logfile_read. The fake gnb_commission in
+    benchmarks/fakes can play a transcript back (--replay) to rerun a
+    recorded session offline.
+    """
+
+    def __init__(self, path: str = None, header: dict = None):
+        self.path = path
+        self.events = []
+        self._started = time.monotonic()
+        self._file = open(path, "w", encoding="utf-8") if path else None
+        self._add(dict(header or {}, started_at=time.time()))
+
+    def write(self, data):
+        if data:
+            self._add({"out": data})
+
+    def flush(self):
+        if self._file is not None:
+            self._file.flush()
+
+    def sent(self, prompt: str, data: str):
+        self._add({"prompt": prompt, "in": data})
+
+    def close(self, exit_status=None):
+        self._add({"exit": exit_status})
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    @staticmethod
+    def load(path: str):
+        with open(path, encoding="utf-8") as f:
+            return [json.loads(line) for line in f if line.strip()]
+
+    def _add(self, event: dict):
+        event = dict(t=round(time.monotonic() - self._started, 6), **event)
+        self.events.append(event)
+        if self._file is not None:
+            self._file.write(json.dumps(event) + "\n")
+
+
+class PromptDialog:
+    """
+    Drives an interactive tool through a script of DialogSteps: each answer
+    is sent as soon as its prompt has been printed, with no fixed sleeps,
+    and the time spent waiting for every prompt is recorded.
+    """
+
+    def __init__(self, script, timeout: float = 30.0, progress=None):
+        self.script = tuple(script)
+        self.timeout = timeout
+        self.progress = progress or (lambda message: None)
+
+    def run(self, child, transcript: Transcript = None) -> DialogResult:
+        """
+        Run the script against a spawned pexpect child (in text mode).
+
+        Returns:
+            DialogResult: the answered prompts with their timings; `error`
+            says where the dialog stopped if it did not complete
+        """
+        result = DialogResult()
+        if transcript is not None:
+            child.logfile_read = transcript
+        started = last = time.monotonic()
+        try:
+            for step in self.script:
+                if not self._run_step(child, step, result, transcript, started, last):
+                    return result
+                last = time.monotonic()
+            result.completed = True
+            return result
+        finally:
+            result.elapsed = time.monotonic() - started
+
+    def _run_step(self, child, step: DialogStep, result: DialogResult, transcript,
+                  started: float, last: float) -> bool:
+        timeout = step.timeout if step.timeout is not None else self.timeout
+        eof = len(step.rules)
+        while True:
+            index = child.expect_list(step.patterns, timeout=timeout)
+            now = time.monotonic()
+            if index == eof:
+                if step.prompt is None:
+                    return True
+                result.error = f"Tool exited while waiting for '{step.name}'"
+                return False
+            if index == eof + 1:
+                result.error = f"Timed out after {timeout:.0f}s waiting for '{step.name}'"
+                return False
+
+            rule = step.rules[index]
+            child.send(rule.response)
+            if transcript is not None:
+                transcript.sent(rule.name, rule.response)
+            result.steps.append({
+                "prompt":  rule.name,
+                "matched": child.after.strip(),
+                "wait_ms": round((now - last) * 1000.0, 3),
+                "at_ms":   round((now - started) * 1000.0, 3),
+            })
+            self.progress(f"Answered '{rule.name}' ({len(result.steps)} prompts)")
+            last = now
+            if rule is step.prompt:
+                return True
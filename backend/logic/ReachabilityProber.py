@@ -0,0 +1,370 @@
+import errno
+import os
+import selectors
+import socket
+import struct
+import threading
+import time
+from collections import deque
+
+from .attributes.NetworkType import NetworkType
+from .setupLogManger import LogManager
+from .Metrics import REGISTRY
+
+PROBE_DURATION = REGISTRY.histogram(
+    "webdashboard_probe_round_seconds", "Duration of one reachability probe round", ("method",))
+
+ICMP_ECHO_REQUEST = 8
+ICMP_ECHO_REPLY = 0
+
+# Port used by the UDP fallback; nothing listens there, so a live host
+# answers with ICMP port-unreachable which surfaces as ECONNREFUSED.
+UDP_PROBE_PORT = 33434
+
+
+def _checksum(data: bytes) -> int:
+    if len(data) % 2:
+        data += b"\x00"
+    total = sum(struct.unpack(f"!{len(data) // 2}H", data))
+    total = (total >> 16) + (total & 0xFFFF)
+    total += total >> 16
+    return ~total & 0xFFFF
+
+
+class TargetStats:
+    """
+    Sliding window of probe results for one target plus the derived
+    reachability state. Each sample is an RTT in ms, or None for a loss.
+    """
+
+    def __init__(self, host: str, window: int):
+        self.host = host
+        self.address = None
+        self.samples = deque(maxlen=window)
+        self.state = NetworkType.DOWN
+        self.consecutive_losses = 0
+        self.consecutive_replies = 0
+        self.last_reply = None   # time.time() of the last successful probe
+        self.last_probe = None   # time.time() of the last completed probe
+
+    def record(self, rtt_ms):
+        self.samples.append(rtt_ms)
+        self.last_probe = time.time()
+        if rtt_ms is None:
+            self.consecutive_losses += 1
+            self.consecutive_replies = 0
+        else:
+            self.consecutive_losses = 0
+            self.consecutive_replies += 1
+            self.last_reply = self.last_probe
+
+    def loss_rate(self) -> float:
+        if not self.samples:
+            return 1.0
+        return sum(1 for s in self.samples if s is None) / len(self.samples)
+
+    def rtts(self):
+        return [s for s in self.samples if s is not None]
+
+    def jitter_ms(self) -> float:
+        """
+        Mean absolute difference between consecutive successful RTTs.
+        """
+        rtts = self.rtts()
+        if len(rtts) < 2:
+            return 0.0
+        return sum(abs(b - a) for a, b in zip(rtts, rtts[1:])) / (len(rtts) - 1)
+
+    def summary(self):
+        rtts = self.rtts()
+        return {
+            "state":      self.state.name,
+            "samples":    len(self.samples),
+            "loss_rate":  round(self.loss_rate(), 3),
+            "rtt_ms":     round(rtts[-1], 3) if rtts else None,
+            "rtt_avg_ms": round(sum(rtts) / len(rtts), 3) if rtts else None,
+            "rtt_min_ms": round(min(rtts), 3) if rtts else None,
+            "rtt_max_ms": round(max(rtts), 3) if rtts else None,
+            "jitter_ms":  round(self.jitter_ms(), 3),
+            "last_reply": self.last_reply,
+        }
+
+
+class ReachabilityProber:
+    """
+    Long-lived, in-process reachability prober.
+
+    A single background thread probes every tracked target once per
+    `interval` and waits for all replies on one selector, so the number of
+    targets does not add threads or processes. Probing uses unprivileged
+    ICMP datagram sockets (net.ipv4.ping_group_range) when the kernel allows
+    it, otherwise a TCP connect (a refusal still proves the host is up),
+    otherwise a UDP send that waits for the port-unreachable error.
+
+    State transitions use hysteresis so a single lost reply does not make
+    the dashboard flicker:
+      - DOWN after `down_after` consecutive losses
+      - UP -> UNSTABLE once the window loss rate reaches `unstable_enter`
+      - UNSTABLE -> UP once it falls back to `unstable_exit` or below
+      - DOWN -> UP/UNSTABLE after `up_after` consecutive replies
+    """
+
+    def __init__(self, interval: float = 1.0, timeout: float = 0.5, window: int = 20,
+                 unstable_enter: float = 0.2, unstable_exit: float = 0.05,
+                 down_after: int = 3, up_after: int = 2, tcp_port: int = 22,
+                 method: str = None):
+        self.interval = interval
+        self.timeout = timeout
+        self.window = window
+        self.unstable_enter = unstable_enter
+        self.unstable_exit = unstable_exit
+        self.down_after = down_after
+        self.up_after = up_after
+        self.tcp_port = tcp_port
+        self.logger = LogManager.get_logger('prober')
+
+        self._targets = {}
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopping = False
+        self._thread = None
+        self._seq = 0
+        self._icmp_sock = None
+        self.method = method or self._detect_method()
+
+    def _detect_method(self) -> str:
+        try:
+            sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_ICMP)
+            sock.close()
+            return "icmp"
+        except OSError:
+            return "tcp"
+
+    # ------------------------------------------------------------------ targets
+
+    def track(self, host: str) -> TargetStats:
+        """
+        Start probing `host` (idempotent) and return its stats object.
+        """
+        with self._lock:
+            target = self._targets.get(host)
+            if target is None:
+                target = TargetStats(host, self.window)
+                self._targets[host] = target
+                self._wake.set()
+            return target
+
+    def untrack(self, host: str):
+        with self._lock:
+            self._targets.pop(host, None)
+
+    def status(self, host: str) -> NetworkType:
+        """
+        Cached reachability of `host`; starts tracking it on first use.
+        """
+        if not host:
+            return NetworkType.DOWN
+        return self.track(host).state
+
+    def stats(self, host: str = None):
+        with self._lock:
+            if host is not None:
+                target = self._targets.get(host)
+                return target.summary() if target else None
+            return {h: t.summary() for h, t in self._targets.items()}
+
+    # ---------------------------------------------------------------- lifecycle
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stopping = False
+        self._thread = threading.Thread(target=self._loop, name="reachability_prober", daemon=True)
+        self._thread.start()
+        self.logger.info(f"Reachability prober started using {self.method} probes")
+
+    def stop(self, timeout: float = 5.0):
+        self._stopping = True
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        if self._icmp_sock is not None:
+            self._icmp_sock.close()
+            self._icmp_sock = None
+
+    def _loop(self):
+        while not self._stopping:
+            started = time.monotonic()
+            try:
+                self.probe_once()
+            except Exception as e:
+                self.logger.warning(f"Probe round failed: {e}")
+            self._wake.clear()
+            self._wake.wait(max(0.0, self.interval - (time.monotonic() - started)))
+
+    # ------------------------------------------------------------------ probing
+
+    def probe_once(self):
+        """
+        Probe every tracked target once and update its state.
+        """
+        started = time.monotonic()
+        try:
+            self._probe_round()
+        finally:
+            PROBE_DURATION.labels(self.method).observe(time.monotonic() - started)
+
+    def _probe_round(self):
+        with self._lock:
+            targets = list(self._targets.values())
+        if not targets:
+            return
+
+        for target in targets:
+            if target.address is None:
+                try:
+                    target.address = socket.gethostbyname(target.host)
+                except OSError:
+                    target.record(None)
+                    self._update_state(target)
+
+        pending = [t for t in targets if t.address is not None]
+        if self.method == "icmp":
+            results = self._probe_icmp(pending)
+        else:
+            results = self._probe_connect(pending)
+
+        with self._lock:
+            for target in pending:
+                target.record(results.get(target.host))
+                self._update_state(target)
+
+    def _update_state(self, target: TargetStats):
+        loss = target.loss_rate()
+        state = target.state
+        if target.consecutive_losses >= self.down_after:
+            state = NetworkType.DOWN
+        elif state == NetworkType.DOWN:
+            if target.consecutive_replies >= self.up_after:
+                state = NetworkType.UNSTABLE if loss >= self.unstable_enter else NetworkType.UP
+        elif state == NetworkType.UP:
+            if loss >= self.unstable_enter:
+                state = NetworkType.UNSTABLE
+        elif state == NetworkType.UNSTABLE:
+            if loss <= self.unstable_exit:
+                state = NetworkType.UP
+        if state != target.state:
+            self.logger.info(f"Reachability of {target.host}: {target.state.name} -> {state.name}")
+            target.state = state
+
+    def _probe_icmp(self, targets):
+        if self._icmp_sock is None:
+            self._icmp_sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_ICMP)
+            self._icmp_sock.setblocking(False)
+        sock = self._icmp_sock
+
+        # drain stale replies from a previous round
+        while True:
+            try:
+                sock.recvfrom(1024)
+            except (BlockingIOError, InterruptedError):
+                break
+
+        self._seq = (self._seq + 1) & 0xFFFF
+        seq = self._seq
+        ident = os.getpid() & 0xFFFF   # the kernel substitutes its own id
+        sent = {}
+        for target in targets:
+            payload = struct.pack("!d", time.monotonic())
+            header = struct.pack("!BBHHH", ICMP_ECHO_REQUEST, 0, 0, ident, seq)
+            checksum = _checksum(header + payload)
+            packet = struct.pack("!BBHHH", ICMP_ECHO_REQUEST, 0, checksum, ident, seq) + payload
+            try:
+                sock.sendto(packet, (target.address, 0))
+                sent[target.address] = (target.host, time.monotonic())
+            except OSError:
+                pass
+
+        results = {}
+        deadline = time.monotonic() + self.timeout
+        with selectors.DefaultSelector() as sel:
+            sel.register(sock, selectors.EVENT_READ)
+            while sent and len(results) < len(sent):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                if not sel.select(remaining):
+                    continue
+                while True:
+                    try:
+                        data, (addr, _) = sock.recvfrom(1024)
+                    except (BlockingIOError, InterruptedError):
+                        break
+                    if len(data) < 8:
+                        continue
+                    icmp_type, _, _, _, reply_seq = struct.unpack("!BBHHH", data[:8])
+                    if icmp_type != ICMP_ECHO_REPLY or reply_seq != seq or addr not in sent:
+                        continue
+                    host, sent_at = sent[addr]
+                    results[host] = (time.monotonic() - sent_at) * 1000.0
+        return results
+
+    def _probe_connect(self, targets):
+        results = {}
+        socks = {}
+        sel = selectors.DefaultSelector()
+        try:
+            for target in targets:
+                if self.method == "udp":
+                    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+                    sock.setblocking(False)
+                    try:
+                        sock.connect((target.address, UDP_PROBE_PORT))
+                        sock.send(b"")
+                    except OSError:
+                        sock.close()
+                        continue
+                    sel.register(sock, selectors.EVENT_READ, target)
+                else:
+                    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+                    sock.setblocking(False)
+                    err = sock.connect_ex((target.address, self.tcp_port))
+                    if err not in (0, errno.EINPROGRESS, errno.ECONNREFUSED):
+                        sock.close()
+                        continue
+                    if err == errno.ECONNREFUSED:
+                        results[target.host] = 0.0
+                        sock.close()
+                        continue
+                    sel.register(sock, selectors.EVENT_WRITE, target)
+                socks[sock] = time.monotonic()
+
+            deadline = time.monotonic() + self.timeout
+            while socks:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                for key, _ in sel.select(remaining):
+                    sock, target = key.fileobj, key.data
+                    rtt = (time.monotonic() - socks.pop(sock)) * 1000.0
+                    sel.unregister(sock)
+                    if self.method == "udp":
+                        try:
+                            sock.recv(1)
+                            alive = True
+                        except ConnectionRefusedError:
+                            alive = True
+                        except OSError:
+                            alive = False
+                    else:
+                        err = sock.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR)
+                        alive = err in (0, errno.ECONNREFUSED)
+                    if alive:
+                        results[target.host] = rtt
+                    sock.close()
+        finally:
+            for sock in socks:
+                sock.close()
+            sel.close()
+        return results
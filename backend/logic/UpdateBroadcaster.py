@@ -0,0 +1,135 @@
+import json
+import threading
+import time
+from collections import deque
+
+
+class UpdateBroadcaster:
+    """
+    Fan-out of state updates to Server-Sent Events clients.
+
+    Publishers hand in the full current state of a topic; only the fields
+    that changed since the last publish (plus any explicitly appended
+    history points) become an event. Each event is encoded to its SSE frame
+    exactly once and the same bytes are handed to every client, so adding
+    clients does not add encoding work. Recent events are kept in a bounded
+    log so a reconnecting client can resume from its Last-Event-ID; if it
+    fell too far behind it gets a fresh snapshot instead.
+    """
+
+    def __init__(self, backlog: int = 500, heartbeat: float = 15.0):
+        self.heartbeat = heartbeat
+        self._events = deque(maxlen=backlog)   # (event_id, frame_bytes)
+        self._state = {}                       # topic -> last published full state
+        self._last_id = 0
+        self._snapshot_cache = None            # (event_id, frame_bytes)
+        self._cond = threading.Condition()
+        self.clients = 0
+
+    @property
+    def last_id(self) -> int:
+        return self._last_id
+
+    def publish(self, topic: str, state: dict, appended: dict = None):
+        """
+        Publish the latest `state` of `topic`.
+
+        Args:
+            topic (str): Event name, e.g. "attributes" or "node_status"
+            state (dict): Full current state; only changed keys are sent
+            appended (dict): key -> list of new points to append client-side.
+                Keys listed here are history series: their full value in
+                `state` only goes out in snapshots, never in diffs
+
+        Returns:
+            int: The id of the emitted event, or None if nothing changed
+        """
+        with self._cond:
+            previous = self._state.get(topic, {})
+            appended = appended or {}
+            changed = {k: v for k, v in state.items()
+                       if k not in appended and previous.get(k, _MISSING) != v}
+            appended = {k: v for k, v in appended.items() if v}
+            if not changed and not appended:
+                return None
+            self._state[topic] = dict(state)
+
+            payload = dict(changed)
+            if appended:
+                payload["append"] = appended
+            self._last_id += 1
+            frame = self._frame(self._last_id, topic, payload)
+            self._events.append((self._last_id, frame))
+            self._cond.notify_all()
+            return self._last_id
+
+    def snapshot_frame(self):
+        """
+        One 'snapshot' event with the full state of every topic, cached until
+        the next publish so that a burst of new clients costs one encode.
+
+        Returns:
+            tuple: (event_id, frame_bytes)
+        """
+        with self._cond:
+            cached = self._snapshot_cache
+            if cached is not None and cached[0] == self._last_id:
+                return cached
+            frame = self._frame(self._last_id, "snapshot", self._state)
+            self._snapshot_cache = (self._last_id, frame)
+            return self._snapshot_cache
+
+    def events_after(self, last_id: int, timeout: float = None):
+        """
+        Return the frames published after `last_id`, waiting up to `timeout`
+        seconds for one to arrive.
+
+        Returns:
+            list: frame bytes, or None if `last_id` has already fallen out of
+            the backlog and the client needs a snapshot
+        """
+        with self._cond:
+            if self._last_id <= last_id and timeout:
+                self._cond.wait(timeout)
+            if self._last_id <= last_id:
+                return []
+            if not self._events or self._events[0][0] > last_id + 1:
+                return None
+            return [frame for event_id, frame in self._events if event_id > last_id]
+
+    def stream(self, last_event_id=None):
+        """
+        Generator of SSE bytes for one client.
+        """
+        with self._cond:
+            self.clients += 1
+        try:
+            yield b"retry: 3000\n\n"
+            if last_event_id is None or last_event_id > self._last_id:
+                # new client, or an id from before a backend restart
+                cursor, frame = self.snapshot_frame()
+                yield frame
+            else:
+                cursor = last_event_id
+            while True:
+                frames = self.events_after(cursor, timeout=self.heartbeat)
+                if frames is None:
+                    cursor, frame = self.snapshot_frame()
+                    yield frame
+                elif frames:
+                    cursor += len(frames)
+                    for frame in frames:
+                        yield frame
+                else:
+                    yield b": heartbeat " + str(int(time.time())).encode() + b"\n\n"
+        finally:
+            with self._cond:
+                self.clients -= 1
+
+    @staticmethod
+    def _frame(event_id: int, event: str, payload) -> bytes:
+        data = json.dumps(payload, separators=(",", ":"))
+        return f"id: {event_id}\nevent: {event}\ndata: {data}\n\n".encode()
+
+
+_MISSING = object()
@@ -2,6 +2,7 @@ from .Attribute import Attribute
 from datetime import datetime
 
 class BoardDateTime(Attribute):
+    refresh_interval = 1.0
     boardDate = None
     boardTime = None
 
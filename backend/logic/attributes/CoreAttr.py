@@ -1,8 +1,11 @@
 from .Attribute import Attribute
-import json
-import os
+from ..ConfigStore import ConfigStore
 
 class CoreAttr(Attribute):
+    refresh_interval = 1.0
+    # config file keys this attribute reads, and so may be edited through the API
+    config_keys = ('MCC', 'MNC', 'cellLocalId', 'n2_local_ip', 'n3_local_ip',
+                   'n2_remote_ip', 'n3_remote_ip', 'nrTAC', 'sst', 'sd', 'profile')
 
     def __init__(self, json_file_path: str):
         super().__init__()
@@ -10,6 +13,9 @@ class CoreAttr(Attribute):
         self.MNC = ""
         self.cell_Id = ""
         self.json_file_path = json_file_path
+        # Shared with every other reader of the same file; re-parsed only on change
+        self.config_store = ConfigStore.for_path(json_file_path)
+        self.config_version = None
         self.gnb_Ngc_Ip = ""
         self.gnb_Ngu_Ip = ""
         self.ngc_Ip = ""
@@ -21,66 +27,34 @@ class CoreAttr(Attribute):
 
     def refresh(self):
         """
-        Read core attributes from a JSON file and update instance variables
+        Update instance variables from the latest config snapshot.
+        Costs a single stat when the file has not changed.
         
         Returns:
             bool: True if refresh was successful, False otherwise
         """
-        # Use helper function to read JSON
-        data = self.read_json_file()
+        snapshot = self.config_store.snapshot()
         
-        if data is None:
+        if snapshot is None:
             return False
+        if snapshot.version == self.config_version:
+            return True
         
         # Extract values with fallback to current values if key doesn't exist
-        self.MCC = data.get('MCC', self.MCC)
-        self.MNC = data.get('MNC', self.MNC)
-        self.cell_Id = data.get('cellLocalId', self.cell_Id)
-        self.gnb_Ngu_Ip = data.get('n2_local_ip', self.gnb_Ngu_Ip)
-        self.gnb_Ngc_Ip = data.get('n3_local_ip', self.gnb_Ngc_Ip)
-        self.ngc_Ip = data.get('n2_remote_ip', self.ngc_Ip)
-        self.ngu_Ip = data.get('n3_remote_ip', self.ngu_Ip)
-        self.nr_Tac = data.get('nrTAC', self.nr_Tac)
-        self.sst = data.get('sst', self.sst)
-        self.sd = data.get('sd', self.sd)
-        self.profile = data.get('profile', self.profile)
-        
-        print(f"CoreAttr refreshed from {self.json_file_path}")
+        self.MCC = snapshot.get('MCC', self.MCC)
+        self.MNC = snapshot.get('MNC', self.MNC)
+        self.cell_Id = snapshot.get('cellLocalId', self.cell_Id)
+        self.gnb_Ngu_Ip = snapshot.get('n2_local_ip', self.gnb_Ngu_Ip)
+        self.gnb_Ngc_Ip = snapshot.get('n3_local_ip', self.gnb_Ngc_Ip)
+        self.ngc_Ip = snapshot.get('n2_remote_ip', self.ngc_Ip)
+        self.ngu_Ip = snapshot.get('n3_remote_ip', self.ngu_Ip)
+        self.nr_Tac = snapshot.get('nrTAC', self.nr_Tac)
+        self.sst = snapshot.get('sst', self.sst)
+        self.sd = snapshot.get('sd', self.sd)
+        self.profile = snapshot.get('profile', self.profile)
+        self.config_version = snapshot.version
         return True
 
-    def read_json_file(self):
-        """
-        Helper function to safely read and parse a JSON file
-        
-        Args:
-            file_path (str): Path to the JSON file
-            
-        Returns:
-            dict: Parsed JSON data, or None if reading failed
-        """
-        file_path = self.json_file_path
-        try:
-            # Check if file exists
-            if not os.path.exists(file_path):
-                print(f"JSON file not found: {file_path}")
-                return None
-            
-            # Read and parse JSON file
-            with open(file_path, 'r', encoding='utf-8') as file:
-                data = json.load(file)
-                
-            return data
-            
-        except json.JSONDecodeError as e:
-            print(f"Invalid JSON format in {file_path}: {e}")
-            return None
-        except PermissionError:
-            print(f"Permission denied reading {file_path}")
-            return None
-        except Exception as e:
-            print(f"Error reading {file_path}: {e}")
-            return None
-
     def print_attributes(self):
         """
         Print the current core attributes
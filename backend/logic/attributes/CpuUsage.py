@@ -1,43 +1,89 @@
 from .Attribute import Attribute
-import time
 from collections import deque
 
+# /proc/stat cpu columns used for accounting; guest time is already part of user
+STAT_FIELDS = ("user", "nice", "system", "idle", "iowait", "irq", "softirq", "steal")
+NFIELDS = len(STAT_FIELDS)
+
 # Update refresh such that it stores ram usage for the most recent 100 entries
 # on refresh, remove the oldest data and add the newest data
 class CpuUsage(Attribute):
+    refresh_interval = 1.0
 
-    def __init__(self):
+    def __init__(self, stat_path: str = "/proc/stat"):
         super().__init__()
+        self.stat_path = stat_path
         self.cpuUsage = ""
         self.usage_history = deque(maxlen=100)
+        # total samples ever taken, so readers can tell which history points are new
+        self.sample_count = 0
+        # per core: {"core", "busy", "user", "system", "iowait", "irq", "softirq", "steal"} in %
+        self.core_usage = []
+        self.core_history = []
+        self._last_names = None
+        self._last_counters = None
 
     def refresh(self):
-        self.cpuUsage = self.get_cpu_usage()
-        self.usage_history.append(self.cpuUsage)
-
-    def get_cpu_usage(self):
         """
-        Read /proc/stat twice, interval seconds apart,
-        and compute the percentage of non-idle time.
+        Read every cpu line of /proc/stat once and compute usage against the
+        previous sample. The first call (or a change in the set of online
+        cores) only primes the counters.
         """
+        names, counters = self.read_stat()
+        if names == self._last_names:
+            usage = self.compute_usage(names, self._last_counters, counters)
+            self.cpuUsage = usage[0]["busy"]
+            self.usage_history.append(self.cpuUsage)
+            self.core_usage = usage[1:]
+            for history, core in zip(self.core_history, self.core_usage):
+                history.append(core["busy"])
+            self.sample_count += 1
+        else:
+            self.core_history = [deque(maxlen=100) for _ in names[1:]]
+        self._last_names = names
+        self._last_counters = counters
 
-        def _read():
-            with open('/proc/stat', 'r') as f:
-                parts = f.readline().split()[1:]
-                nums = list(map(float, parts))
-            idle = nums[3] + nums[4]  # idle + iowait
-            total = sum(nums)
-            return idle, total
+    def read_stat(self):
+        """
+        Returns:
+            tuple: (names, counters) where names is ["cpu", "cpu0", ...] and
+            counters one flat list of NFIELDS values per name
+        """
+        with open(self.stat_path, 'r') as f:
+            data = f.read()
+        names = []
+        counters = []
+        for line in data.splitlines():
+            if not line.startswith("cpu"):
+                break
+            parts = line.split()
+            names.append(parts[0])
+            counters.extend(map(int, parts[1:NFIELDS + 1]))
+        return names, counters
 
-        idle1, total1 = _read()
-        time.sleep(0.1)
-        idle2, total2 = _read()
+    @staticmethod
+    def compute_usage(names, old, new):
+        # one pass over the flat counter arrays for all cores at once
+        deltas = [max(n - o, 0) for n, o in zip(new, old)]
+        usage = []
+        for i, name in enumerate(names):
+            user, nice, system, idle, iowait, irq, softirq, steal = deltas[i * NFIELDS:(i + 1) * NFIELDS]
+            total = user + nice + system + idle + iowait + irq + softirq + steal
+            scale = 100.0 / total if total else 0.0
+            usage.append({
+                "core":    name,
+                "busy":    round((total - idle - iowait) * scale, 1),
+                "user":    round((user + nice) * scale, 1),
+                "system":  round(system * scale, 1),
+                "iowait":  round(iowait * scale, 1),
+                "irq":     round(irq * scale, 1),
+                "softirq": round(softirq * scale, 1),
+                "steal":   round(steal * scale, 1),
+            })
+        return usage
 
-        idle_delta = idle2 - idle1
-        total_delta = total2 - total1
-        if total_delta == 0:
-            return 0.0
-        return round((1.0 - idle_delta / total_delta) * 100.0,1)
+    def max_core_usage(self):
+        return max((core["busy"] for core in self.core_usage), default=None)
 
     def print_cpu_usage(self):
         print(f"Cpu Usage: {self.cpuUsage}%")
@@ -46,3 +92,8 @@ class CpuUsage(Attribute):
         print(f"Cpu Usage: {self.cpuUsage}%")
         print(f"History (last {len(self.usage_history)} samples):")
         print(list(self.usage_history))
+
+    def print_core_usage(self):
+        for core in self.core_usage:
+            print(f"{core['core']}: {core['busy']}% (usr {core['user']} sys {core['system']} "
+                  f"irq {core['irq']} sirq {core['softirq']} steal {core['steal']} io {core['iowait']})")
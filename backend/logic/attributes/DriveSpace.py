@@ -2,6 +2,7 @@ from .Attribute import Attribute
 import shutil
 
 class DriveSpace(Attribute):
+    refresh_interval = 60.0
 
     def __init__(self):
         super().__init__()
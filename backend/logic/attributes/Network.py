@@ -1,18 +1,34 @@
 from .Attribute import Attribute
 from .NetworkType import NetworkType
+from ..Metrics import count_spawn
 import subprocess, sys
 
 class Network(Attribute):
+    refresh_interval = 5.0
     attempts = 1 # Changed from 4 to 1
     timeout = 0.3 # Changed from 1 to 0.5
 
-    def __init__(self, host_ip: str):
+    def __init__(self, host_ip: str, prober=None):
         super().__init__()
         self.networkStatus = NetworkType.DOWN
         self.host = host_ip
+        # Optional ReachabilityProber; when set, status comes from its cached
+        # state instead of spawning a ping process on every refresh.
+        self.prober = prober
 
     def refresh(self):
-        self.networkStatus = self.ping_status(self.host)
+        if self.prober is not None:
+            self.networkStatus = self.prober.status(self.host)
+        else:
+            self.networkStatus = self.ping_status(self.host)
+
+    def stats(self):
+        """
+        RTT / loss / jitter statistics for the host, if a prober is attached.
+        """
+        if self.prober is None or not self.host:
+            return None
+        return self.prober.stats(self.host)
 
     def ping_status(self, host: str) -> NetworkType:
         """
@@ -35,6 +51,7 @@ class Network(Attribute):
                 cmd = ["ping", "-c", "1", "-W", str(timeout), host]
 
             try:
+                count_spawn(cmd)
                 result = subprocess.run(
                     cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
                 )
@@ -72,6 +89,7 @@ class Network(Attribute):
             print(f"\\n--- Ping attempt {i}/{attempts} ---")
             try:
                 # capture both stdout and stderr so we can print the full ping output
+                count_spawn(cmd)
                 result = subprocess.run(
                     cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT
                 )
@@ -96,5 +114,7 @@ class Network(Attribute):
            print(f"Network Status: {self.networkStatus.name}")
 
     def test_network(self, ip: str):
+        if self.prober is not None and self.host and self.host != ip:
+            self.prober.untrack(self.host)
         self.host = ip
         self.refresh()
\ No newline at end of file
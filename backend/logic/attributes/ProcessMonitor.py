@@ -0,0 +1,112 @@
+from .Attribute import Attribute
+from ..ProcessTable import ProcessTable, VENDOR_ROOT, CLK_TCK
+import os, time
+from collections import deque
+
+class ProcessMonitor(Attribute):
+    """
+    Resource usage of each gNB process (everything running from the vendor
+    install tree, i.e. the CU and DU) and of the dashboard itself.
+
+    Processes are discovered once and cached by (pid, start time). Each
+    refresh then reads only /proc/<pid>/stat, statm and status (plus the fd
+    directory) of the cached processes; the full /proc scan is repeated every
+    `rediscover_interval` to pick up processes started since (the gNB is
+    usually started after the dashboard), and on the next refresh after a
+    cached process has gone or `request_discovery()` was called.
+    """
+    refresh_interval = 2.0
+    rediscover_interval = 10.0
+
+    def __init__(self, exe_prefix: str = VENDOR_ROOT, table: ProcessTable = None):
+        super().__init__()
+        self.exe_prefix = exe_prefix
+        self.table = table or ProcessTable()
+        # name -> latest usage dict
+        self.processes = {}
+        # name -> deque of (cpu %, rss bytes)
+        self.history = {}
+        self.sample_count = 0
+        self._tracked = {}           # name -> (pid, start_time)
+        self._last_ticks = {}        # (pid, start_time) -> (cpu ticks, monotonic time)
+        self._last_discovery = None
+        self._rediscover = True      # a process went away or a rescan was requested
+
+    def request_discovery(self):
+        """
+        Rescan /proc on the next refresh, e.g. after the gNB was started or
+        stopped.
+        """
+        self._rediscover = True
+
+    def refresh(self):
+        now = time.monotonic()
+        if self._discovery_due(now):
+            self.discover()
+
+        processes = {}
+        # built afresh and swapped in, as request threads iterate the old one
+        history = {}
+        for name, (pid, start_time) in list(self._tracked.items()):
+            usage = self.sample(pid, start_time, now)
+            if usage is None:
+                # exited or replaced: look for it again on the next refresh
+                del self._tracked[name]
+                self._rediscover = True
+                continue
+            processes[name] = usage
+            history[name] = self.history.get(name) or deque(maxlen=100)
+            history[name].append((usage["cpu"], usage["rss"]))
+        live = set(self._tracked.values())
+        for key in list(self._last_ticks):
+            if key not in live:
+                del self._last_ticks[key]
+        self.processes = processes
+        self.history = history
+        self.sample_count += 1
+
+    def _discovery_due(self, now: float) -> bool:
+        return (self._rediscover or self._last_discovery is None
+                or now - self._last_discovery >= self.rediscover_interval)
+
+    def discover(self):
+        """
+        Scan /proc once for the gNB processes and cache their identity.
+        """
+        self._last_discovery = time.monotonic()
+        tracked = {}
+        for pid, start_time, exe in self.table.scan(self.exe_prefix):
+            name = os.path.basename(exe)
+            if name in tracked:
+                name = f"{name}:{pid}"
+            tracked[name] = (pid, start_time)
+        own = os.getpid()
+        tracked["webdashboard"] = (own, self.table.start_time(own))
+        self._tracked = tracked
+        self._rediscover = False
+
+    def sample(self, pid: int, start_time: int, now: float):
+        stat = self.table.read_stat(pid)
+        if stat is None or stat["start_time"] != start_time:
+            return None
+        ticks = stat["utime"] + stat["stime"]
+        cpu = None
+        last = self._last_ticks.get((pid, start_time))
+        if last is not None and now > last[1]:
+            cpu = round((ticks - last[0]) / CLK_TCK / (now - last[1]) * 100.0, 1)
+        self._last_ticks[(pid, start_time)] = (ticks, now)
+        voluntary, involuntary = self.table.read_ctx_switches(pid)
+        return {
+            "pid":                    pid,
+            "cpu":                    cpu,
+            "rss":                    self.table.read_statm_rss(pid),
+            "threads":                stat["threads"],
+            "voluntary_ctx_switches": voluntary,
+            "involuntary_ctx_switches": involuntary,
+            "fds":                    self.table.fd_count(pid),
+        }
+
+    def print_processes(self):
+        for name, usage in self.processes.items():
+            print(f"{name} (pid {usage['pid']}): cpu {usage['cpu']}%  rss {usage['rss']}  "
+                  f"threads {usage['threads']}  fds {usage['fds']}")
@@ -1,8 +1,10 @@
 from .Attribute import Attribute
-import json
-import os
+from ..ConfigStore import ConfigStore
 
 class RadioAttr(Attribute):
+    refresh_interval = 1.0
+    # config file keys this attribute reads, and so may be edited through the API
+    config_keys = ('gNBId', 'gNBIdLength', 'band', 'scs', 'txMaxPower', 'dl_centre_freq')
 
     def __init__(self, json_file_path: str):
         super().__init__()
@@ -13,64 +15,35 @@ class RadioAttr(Attribute):
         self.tx_Power = ""
         self.dl_centre_frequency = ""
         self.json_file_path = json_file_path
+        # Shared with every other reader of the same file; re-parsed only on change
+        self.config_store = ConfigStore.for_path(json_file_path)
+        self.config_version = None
 
     def refresh(self):
         """
-        Read radio attributes from a JSON file and update instance variables
+        Update instance variables from the latest config snapshot.
+        Costs a single stat when the file has not changed.
         
         Returns:
             bool: True if refresh was successful, False otherwise
         """
-        # Use helper function to read JSON
-        data = self.read_json_file()
+        snapshot = self.config_store.snapshot()
         
-        if data is None:
+        if snapshot is None:
             return False
+        if snapshot.version == self.config_version:
+            return True
         
         # Extract values with fallback to current values if key doesn't exist
-        self.gnb_Id = data.get('gNBId', self.gnb_Id)
-        self.gnb_Id_Length = data.get('gNBIdLength', self.gnb_Id_Length)
-        self.nr_Band = data.get('band', self.nr_Band)
-        self.scs = data.get('scs', self.scs)
-        self.tx_Power = data.get('txMaxPower', self.tx_Power)
-        self.dl_centre_frequency = data.get('dl_centre_freq', self.dl_centre_frequency)
-        
-        print(f"RadioAttr refreshed from {self.json_file_path}")
+        self.gnb_Id = snapshot.get('gNBId', self.gnb_Id)
+        self.gnb_Id_Length = snapshot.get('gNBIdLength', self.gnb_Id_Length)
+        self.nr_Band = snapshot.get('band', self.nr_Band)
+        self.scs = snapshot.get('scs', self.scs)
+        self.tx_Power = snapshot.get('txMaxPower', self.tx_Power)
+        self.dl_centre_frequency = snapshot.get('dl_centre_freq', self.dl_centre_frequency)
+        self.config_version = snapshot.version
         return True
 
-    def read_json_file(self):
-        """
-        Helper function to safely read and parse a JSON file
-        
-        Args:
-            file_path (str): Path to the JSON file
-            
-        Returns:
-            dict: Parsed JSON data, or None if reading failed
-        """
-        file_path = self.json_file_path
-        try:
-            # Check if file exists
-            if not os.path.exists(file_path):
-                print(f"JSON file not found: {file_path}")
-                return None
-            
-            # Read and parse JSON file
-            with open(file_path, 'r', encoding='utf-8') as file:
-                data = json.load(file)
-                
-            return data
-            
-        except json.JSONDecodeError as e:
-            print(f"Invalid JSON format in {file_path}: {e}")
-            return None
-        except PermissionError:
-            print(f"Permission denied reading {file_path}")
-            return None
-        except Exception as e:
-            print(f"Error reading {file_path}: {e}")
-            return None
-
     def print_attributes(self):
         """
         Print the current radio attributes
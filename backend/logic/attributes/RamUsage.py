@@ -3,18 +3,23 @@ from collections import deque
 # Update refresh such that it stores ram usage for the most recent 100 entries
 # on refresh, remove the oldest data and add the newest data
 class RamUsage(Attribute):
+    refresh_interval = 1.0
 
-    def __init__(self):
+    def __init__(self, meminfo_path: str = "/proc/meminfo"):
         super().__init__()
+        self.meminfo_path = meminfo_path
         self.ramUsage = ""
         self.totalRam = ""
         # history deques with fixed maxlen=100
         self.usage_history = deque(maxlen=100)
+        # total samples ever taken, so readers can tell which history points are new
+        self.sample_count = 0
 
 
     def refresh(self):
         self.ramUsage = self.get_ram_usage()
         self.usage_history.append(self.ramUsage)
+        self.sample_count += 1
 
 
     def get_ram_usage(self):
@@ -23,7 +28,7 @@ class RamUsage(Attribute):
         Uses MemAvailable if present, otherwise falls back.
         """
         meminfo = {}
-        with open('/proc/meminfo', 'r') as f:
+        with open(self.meminfo_path, 'r') as f:
             for line in f:
                 key, val = line.split(':')[0], line.split(':')[1].strip().split()[0]
                 meminfo[key] = float(val)
@@ -2,16 +2,38 @@ import pexpect
 
 from .Attribute import Attribute
 from .RaptorStatusType import RaptorStatusType
-import os, subprocess, re, sys
+from ..LogFollower import LogFollower
+from ..ExpectedProcesses import ExpectedProcessSet
+from ..Metrics import count_spawn
+from ..setupLogManger import LogManager
+import os, re, sys
 
 class RaptorStatus(Attribute):
+    refresh_interval = 5.0
     du_Check = "CELL_IS_UP, CELL_ID:1"
+    du_Down_Markers = ("CELL_IS_DOWN",)
 
 
-    def __init__(self, new_log_path:str):
+    def __init__(self, new_log_path:str, process_check: ExpectedProcessSet = None):
         super().__init__()
         self.raptorStatus = RaptorStatusType.OFF
+        self.logger = LogManager.get_logger('node_status')
         self.log_path = new_log_path
+        self.duStatus = False
+        self.gnbStatus = False
+        # expected gNB processes, checked from /proc; names of those not running
+        self.process_check = process_check or ExpectedProcessSet()
+        self.processesDown = []
+
+        # Follow the DU log incrementally and keep the cell state in memory,
+        # so a status check only reads the bytes appended since the last one.
+        self.cellUp = False
+        self._up_marker = self.du_Check.encode()
+        self._down_markers = tuple(m.encode() for m in self.du_Down_Markers)
+        # the cell state is whatever the last marker said, however far back
+        # it was logged, so a backend restart does not lose it
+        self.du_follower = LogFollower(self.log_path, seed_marker=b"CELL_IS_")
+        self.du_follower.add_listener(self._on_du_log)
 
     def refresh(self):
         self.duStatus = self.check_Du_Log()
@@ -22,60 +44,43 @@ class RaptorStatus(Attribute):
     def check_Du_Log(self) -> bool:
         if not os.path.isfile(self.log_path):
             print("Log path {} does not exist.".format(self.log_path))
+            self.cellUp = False
             return False
 
-        # Call `tail -n 1` so you don't try to run the .txt itself
-        cmd = ["tail", "-n", "1", self.log_path]
         try:
-            result = subprocess.run(
-                cmd,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True,
-                check=True
-            )
-        except subprocess.CalledProcessError as e:
-            # tail failed (e.g. no permission)
-            print("Error tailing DU log:", e.stderr)
+            self.du_follower.poll()
+        except OSError as e:
+            # e.g. no permission
+            self.logger.warning(f"Error following DU log: {e}")
             return False
 
-        last_line = result.stdout.strip()
-        print("Last line:", last_line)
-        return True if last_line == self.du_Check else False
+        return self.cellUp
 
-    def check_process_status(self) -> bool:
-        # call gnb_ctl status non‐interactively
-        cmd = ["gnb_ctl", "status"]
-
-        print("DEBUG: running command:", " ".join(cmd))
-        result = subprocess.run(
-            cmd,
-            stdin=subprocess.DEVNULL,     # don’t expect any input
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            text=True
-        )
-
-        # Now your usual logic:
-        lines = [l for l in result.stdout.splitlines() if l.strip()]
-        if not lines:
-            print("No output from gnb_ctl status.")
-            return False
-
-        last = lines[-1].strip()
-        print("Last line:", last)
-
-        mA = re.search(
-            r"gNB\s+is\s+running\s*\(\s*(\d+)\s*/\s*(\d+)\s*expected\s+processes\s+running\)",
-            last
-        )
-        if mA:
-            up, total = map(int, mA.groups())
-            if up == total:
-                print("✔ All systems up.")
-                return True
+    def _on_du_log(self, data: bytes):
+        """
+        Cell state machine: whichever marker appears last in the newly
+        appended lines decides whether the cell is up.
+        """
+        if b"CELL_IS_" not in data:
+            return
+        up = data.rfind(self._up_marker)
+        down = max(data.rfind(m) for m in self._down_markers)
+        if up > down:
+            self.cellUp = True
+        elif down > up:
+            self.cellUp = False
 
-        return False
+    def check_process_status(self) -> bool:
+        """
+        True if every expected gNB process is running. Checked natively from
+        /proc; `gnb_ctl status` only runs until the expected set is known
+        or when a process is found missing.
+        """
+        result = self.process_check.check()
+        if result["down"] != self.processesDown and result["down"]:
+            self.logger.warning(f"gNB processes down: {', '.join(result['down'])}")
+        self.processesDown = result["down"]
+        return result["running"]
 
     def check_process_status_print_output(self) -> bool:
 
@@ -83,6 +88,7 @@ class RaptorStatus(Attribute):
         PROMPT = re.compile(r"gnb-\d+:/webdashboard#\s*$")
 
         # 2) spawn an interactive bash once (reuse for all checks)
+        count_spawn(["/bin/bash"])
         child = pexpect.spawn("/bin/bash", ["-i"], encoding="utf-8", timeout=60)
         child.logfile = sys.stdout
 
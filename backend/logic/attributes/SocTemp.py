@@ -1,32 +1,206 @@
 from .Attribute import Attribute
-import os, glob
+from ..setupLogManger import LogManager
+import os, time, errno
+from collections import deque
+
+class ThermalSensor:
+    """
+    One temperature input, kept open and re-read with pread.
+    """
+
+    def __init__(self, name: str, source: str, path: str, max_c=None, crit_c=None):
+        self.name = name
+        self.source = source          # "hwmon" or "thermal_zone"
+        self.path = path
+        self.max_c = max_c
+        self.crit_c = crit_c
+        self.temp = None
+        self.history = deque(maxlen=100)
+        self.above_max_s = 0.0
+        self.above_crit_s = 0.0
+        self.fd = os.open(path, os.O_RDONLY)
+
+    def read(self):
+        """
+        Returns:
+            float: Temperature in °C, or None if the sensor could not be read
+
+        Raises:
+            OSError: If the sensor has disappeared (ENODEV/ENOENT)
+        """
+        try:
+            raw = os.pread(self.fd, 32, 0)
+        except OSError as e:
+            if e.errno in (errno.ENODEV, errno.ENOENT):
+                raise
+            return None   # e.g. EAGAIN/ENODATA while the sensor is busy
+        try:
+            return int(raw) / 1000.0
+        except ValueError:
+            return None
+
+    def to_dict(self):
+        return {
+            "name":         self.name,
+            "source":       self.source,
+            "temp":         self.temp,
+            "max":          self.max_c,
+            "crit":         self.crit_c,
+            "above_max_s":  round(self.above_max_s, 1),
+            "above_crit_s": round(self.above_crit_s, 1),
+        }
+
+    def close(self):
+        os.close(self.fd)
+
 
 class SocTemp(Attribute):
-    core_path = "/sys/class/hwmon/hwmon*"
+    """
+    Every hwmon and thermal_zone temperature sensor of the board.
 
-    def __init__(self):
+    Sensors are discovered once, with their labels and max/critical
+    thresholds, and their input files are kept open; a refresh is one pread
+    per sensor plus a listing of the two class directories to notice
+    hotplug. `core_temp` is the hottest sensor.
+    """
+    refresh_interval = 5.0
+
+    def __init__(self, sys_class: str = "/sys/class"):
         super().__init__()
         self.core_temp = "-1"
+        self.logger = LogManager.get_logger('soc_temp')
+        self.hwmon_dir = os.path.join(sys_class, "hwmon")
+        self.thermal_dir = os.path.join(sys_class, "thermal")
+        self.sensors = []
+        self.hottest = None
+        self.discoveries = 0
+        self._device_set = None
+        self._last_refresh = None
 
     def refresh(self):
-        self.core_temp = self.read_hwmon_temp()
+        devices = self._list_devices()
+        if devices != self._device_set:
+            self.discover(devices)
+
+        now = time.monotonic()
+        elapsed = now - self._last_refresh if self._last_refresh is not None else 0.0
+        self._last_refresh = now
+        try:
+            readings = [s.read() for s in self.sensors]
+        except OSError:
+            # a sensor went away under us: rediscover on the next refresh
+            self._device_set = None
+            return
+
+        hottest = None
+        for sensor, temp in zip(self.sensors, readings):
+            sensor.temp = temp
+            if temp is None:
+                continue
+            sensor.history.append(temp)
+            if sensor.max_c is not None and temp >= sensor.max_c:
+                sensor.above_max_s += elapsed
+            if sensor.crit_c is not None and temp >= sensor.crit_c:
+                sensor.above_crit_s += elapsed
+            if hottest is None or temp > hottest.temp:
+                hottest = sensor
+        self.hottest = hottest
+        if hottest is None:
+            raise RuntimeError("No temperature sensor could be read")
+        self.core_temp = hottest.temp
+
+    def _list_devices(self):
+        devices = set()
+        for directory, prefix in ((self.hwmon_dir, "hwmon"), (self.thermal_dir, "thermal_zone")):
+            try:
+                devices.update(os.path.join(directory, d) for d in os.listdir(directory)
+                               if d.startswith(prefix))
+            except OSError:
+                pass
+        return devices
+
+    def discover(self, devices):
+        for sensor in self.sensors:
+            sensor.close()
+        sensors = []
+        for device in sorted(devices):
+            try:
+                if os.path.basename(device).startswith("hwmon"):
+                    sensors.extend(self._hwmon_sensors(device))
+                else:
+                    sensors.extend(self._thermal_zone_sensors(device))
+            except OSError as e:
+                self.logger.warning(f"Skipping thermal device {device}: {e}")
+        # keep the counters and history of sensors that survived the hotplug
+        previous = {s.path: s for s in self.sensors}
+        for sensor in sensors:
+            old = previous.get(sensor.path)
+            if old is not None:
+                sensor.history = old.history
+                sensor.above_max_s = old.above_max_s
+                sensor.above_crit_s = old.above_crit_s
+        self.sensors = sensors
+        self._device_set = devices
+        self.discoveries += 1
+
+    @staticmethod
+    def _read_text(path: str):
+        try:
+            with open(path) as f:
+                return f.read().strip()
+        except OSError:
+            return None
+
+    def _read_millidegrees(self, path: str):
+        raw = self._read_text(path)
+        try:
+            return int(raw) / 1000.0
+        except (TypeError, ValueError):
+            return None
 
-    def read_hwmon_temp(self):
+    def _open_sensor(self, name: str, source: str, path: str, max_c=None, crit_c=None):
+        """
+        Returns:
+            ThermalSensor: The opened sensor, or None if its input cannot be opened
+        """
+        try:
+            return ThermalSensor(name, source, path, max_c=max_c, crit_c=crit_c)
+        except OSError as e:
+            self.logger.warning(f"Skipping temperature sensor {path}: {e}")
+            return None
 
-        hwmons = glob.glob(self.core_path)
-        if not hwmons:
-            raise RuntimeError("No hwmon directories found")
+    def _hwmon_sensors(self, device: str):
+        chip = self._read_text(os.path.join(device, "name")) or os.path.basename(device)
+        for entry in sorted(os.listdir(device)):
+            if not (entry.startswith("temp") and entry.endswith("_input")):
+                continue
+            base = os.path.join(device, entry[:-len("_input")])
+            label = self._read_text(base + "_label") or entry[:-len("_input")]
+            sensor = self._open_sensor(f"{chip}/{label}", "hwmon", base + "_input",
+                                       max_c=self._read_millidegrees(base + "_max"),
+                                       crit_c=self._read_millidegrees(base + "_crit"))
+            if sensor is not None:
+                yield sensor
 
-        # Fallback: read the very first temp*_input we can find
-        for hw in hwmons:
-            for inp in glob.glob(os.path.join(hw, "temp*_input")):
-                try:
-                    raw = open(inp).read().strip()
-                    return int(raw) / 1000.0
-                except Exception:
-                    continue
+    def _thermal_zone_sensors(self, device: str):
+        zone_type = self._read_text(os.path.join(device, "type")) or os.path.basename(device)
+        max_c = crit_c = None
+        for entry in sorted(os.listdir(device)):
+            if not (entry.startswith("trip_point_") and entry.endswith("_type")):
+                continue
+            trip_type = self._read_text(os.path.join(device, entry))
+            trip_temp = self._read_millidegrees(os.path.join(device, entry[:-len("_type")] + "_temp"))
+            if trip_type == "critical":
+                crit_c = trip_temp
+            elif trip_type == "hot" or (trip_type == "passive" and max_c is None):
+                max_c = trip_temp
+        sensor = self._open_sensor(f"{os.path.basename(device)}/{zone_type}", "thermal_zone",
+                                   os.path.join(device, "temp"), max_c=max_c, crit_c=crit_c)
+        if sensor is not None:
+            yield sensor
 
-        raise RuntimeError("No temperature input file could be read from hwmon")
+    def sensor_stats(self):
+        return [s.to_dict() for s in self.sensors]
 
     def print_core_temp(self):
-        print(f"Measured temperature: {self.core_temp:.1f} °C")
\ No newline at end of file
+        print(f"Measured temperature: {self.core_temp:.1f} °C")
@@ -1,43 +1,136 @@
 from .Attribute import Attribute
-import time
+import os, time
 from collections import deque
 
+# /proc/net/dev columns after "iface:" for bytes, packets, errs, drop
+RX_COLUMNS = (0, 1, 2, 3)
+TX_COLUMNS = (8, 9, 10, 11)
+# a decrease is only taken for a wrap if the wrapped delta is below this
+# (1 GiB, ~8.6 Gbit/s over a one second sample); otherwise the counter reset
+WRAP_MARGIN = 2**30
+
 class ThroughPut(Attribute):
+    refresh_interval = 1.0
+    core_iface = "gtp0"     # user-plane tunnel: tx is DL towards the UEs, rx is UL
 
-    def __init__(self):
+    def __init__(self, interfaces=None, net_dev_path: str = "/proc/net/dev",
+                 sys_class_net: str = "/sys/class/net"):
+        """
+        Args:
+            interfaces (iterable): Interface names to report, e.g. gtp0 and the
+                N2/N3 and MANET ports. None reports every interface except lo
+            net_dev_path (str): Counter source, all interfaces in a single read
+            sys_class_net (str): Where each interface's ifindex is read, to
+                tell a recreated interface (e.g. gtp0 on a gNB restart) apart
+        """
         super().__init__()
         self.coreUl = ""
         self.coreDl = ""
         # history deques with fixed maxlen=100
         self.coreUl_hist = deque(maxlen=100)
         self.coreDl_hist = deque(maxlen=100)
-        self.iface = "eth0"
+        self.sample_count = 0
+        self.interfaces = tuple(interfaces) if interfaces else None
+        self.net_dev_path = net_dev_path
+        self.iface_stats = {}       # iface -> rates and totals from the last sample
+        self._last_counters = {}    # iface -> raw counters of the previous sample
+        self._last_ifindex = {}     # iface -> ifindex at the previous sample
+        self.sys_class_net = sys_class_net
+        self._last_time = None
 
     def refresh(self):
-        self.measure_throughput(self.iface)
+        """
+        Take one sample and compute rates against the previous one. Never
+        sleeps: the first call only primes the counters.
+        """
+        now = time.monotonic()
+        counters = self.read_counters()
+        ifindex = {iface: self.read_ifindex(iface) for iface in counters}
+        if self._last_time is not None:
+            interval = now - self._last_time
+            if interval > 0:
+                # an interface that is new or was recreated since the last
+                # sample has fresh counters: this sample only primes it
+                self.iface_stats = {
+                    iface: self.compute_rates(self._last_counters[iface], values, interval)
+                    for iface, values in counters.items()
+                    if iface in self._last_counters and ifindex[iface] == self._last_ifindex.get(iface)
+                }
+        self._last_counters = counters
+        self._last_ifindex = ifindex
+        self._last_time = now
+
+        core = self.iface_stats.get(self.core_iface)
+        if core is not None:
+            self.coreDl = core["tx_mbps"]
+            self.coreUl = core["rx_mbps"]
+        elif self.core_iface not in counters:
+            # the gNB is stopped and its tunnel is gone: nothing flows
+            self.coreDl = self.coreUl = 0.0
+        else:
+            # just (re)created: rates from the next sample on
+            return
+        self.coreDl_hist.append(self.coreDl)
+        self.coreUl_hist.append(self.coreUl)
+        self.sample_count += 1
 
-    def read_bytes(iface, dir="tx"):
-        path = f"/sys/class/net/{iface}/statistics/{dir}_bytes"
-        with open(path, "r") as f:
-            return int(f.read().strip())
+    def read_counters(self):
+        """
+        Parse /proc/net/dev into iface -> (rx bytes, packets, errors, drops,
+        tx bytes, packets, errors, drops).
+        """
+        with open(self.net_dev_path, 'r') as f:
+            lines = f.readlines()[2:]
+        counters = {}
+        for line in lines:
+            name, _, data = line.partition(':')
+            name = name.strip()
+            if self.interfaces is None:
+                if name == "lo":
+                    continue
+            elif name not in self.interfaces:
+                continue
+            cols = data.split()
+            counters[name] = tuple(int(cols[i]) for i in RX_COLUMNS + TX_COLUMNS)
+        return counters
 
-    def measure_throughput(self, iface:str):
-        interval = 1.0
-        # read initial counters
-        tx1 = self.read_bytes(iface, "tx")
-        rx1 = self.read_bytes(iface, "rx")
-        time.sleep(interval)
-        tx2 = self.read_bytes(iface, "tx")
-        rx2 = self.read_bytes(iface, "rx")
+    def read_ifindex(self, iface: str):
+        try:
+            with open(os.path.join(self.sys_class_net, iface, "ifindex")) as f:
+                return int(f.read())
+        except (OSError, ValueError):
+            return None
 
-        # delta bytes → bits/sec → Mbps
-        tx_mbps = (tx2 - tx1) * 8 / interval / 1e6
-        rx_mbps = (rx2 - rx1) * 8 / interval / 1e6
+    @staticmethod
+    def counter_delta(old: int, new: int) -> int:
+        """
+        Difference between two counter readings. A decrease is a wrap at 32
+        bits (older drivers) or 64 bits only if `old` was within WRAP_MARGIN
+        of that boundary; otherwise the counter was reset (e.g. the
+        interface was recreated) and counts up from 0 again.
+        """
+        if new >= old:
+            return new - old
+        for bits in (32, 64):
+            if old < 2**bits and 2**bits - old + new < WRAP_MARGIN:
+                return 2**bits - old + new
+        return new
 
-        self.coreDl = round(tx_mbps,2)
-        self.coreUl = round(rx_mbps,2)
+    def compute_rates(self, old, new, interval: float):
+        deltas = [self.counter_delta(o, n) for o, n in zip(old, new)]
+        rx, tx = deltas[:4], deltas[4:]
+        return {
+            "rx_mbps":    round(rx[0] * 8 / interval / 1e6, 2),
+            "tx_mbps":    round(tx[0] * 8 / interval / 1e6, 2),
+            "rx_pps":     round(rx[1] / interval, 1),
+            "tx_pps":     round(tx[1] / interval, 1),
+            "rx_errors":  rx[2],
+            "tx_errors":  tx[2],
+            "rx_drops":   rx[3],
+            "tx_drops":   tx[3],
+            "rx_bytes":   new[0],
+            "tx_bytes":   new[4],
+        }
 
     def print_core_throughput(self):
         print(f"Core Throughput: DL: {self.coreDl} Mbps   UL: {self.coreUl} Mbps")
-
-
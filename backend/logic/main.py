@@ -1,33 +1,32 @@
 #!/usr/bin/env python3
 #Input command ":set fileformat=unix" on new file upload to board
-from attributes.IpAddress import IpAddress
-from attributes.BoardDateTime import BoardDateTime
-from attributes.BroadcastFrequency import BroadcastFrequency
-from attributes.RaptorStatus import RaptorStatus
-from attributes.CpuUsage import CpuUsage
-from attributes.RamUsage import RamUsage
-from attributes.SocTemp import SocTemp
-from attributes.DriveSpace import DriveSpace
-from attributes.Network import Network
-from attributes.TxPower import TxPower
-from attributes.ThroughPut import ThroughPut
-
-ip_path = "/cu/config/me_config.xml"
-freq_path = "/du/config/gnb_config.xml"
+import os, sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from logic.attributes.BoardDateTime import BoardDateTime
+from logic.attributes.RaptorStatus import RaptorStatus
+from logic.attributes.CpuUsage import CpuUsage
+from logic.attributes.RamUsage import RamUsage
+from logic.attributes.SocTemp import SocTemp
+from logic.attributes.DriveSpace import DriveSpace
+from logic.attributes.Network import Network
+from logic.attributes.ThroughPut import ThroughPut
+from logic.attributes.RadioAttr import RadioAttr
+from logic.attributes.CoreAttr import CoreAttr
+
+# IP addresses, broadcast frequency and TX power now all come from the
+# commissioning config through RadioAttr and CoreAttr
+config_path = "/opt/ste/active/commissioning/configs/gnb_webdashboard.json"
 raptor_path = "/logdump/du_log.txt"
-ping = "192.168.2.10"
-tx_path = "/du/config/me_config.xml"
 
-ip = IpAddress(ip_path)
+radio = RadioAttr(config_path)
+core = CoreAttr(config_path)
 boardDateTime = BoardDateTime()
-freq = BroadcastFrequency(freq_path)
 raptorStatus = RaptorStatus(raptor_path)
 cpu = CpuUsage()
 ram = RamUsage()
 temp = SocTemp()
 driveSpace = DriveSpace()
-network = Network(ping)
-tx = TxPower(tx_path)
+network = Network(core.ngc_Ip)
 tp = ThroughPut()
 
 boardDateTime.print_Current_time()
@@ -37,17 +36,16 @@ ram.refresh()
 cpu.print_cpu_usage()
 ram.print_ram_usage()
 
-ip.refresh()
-ip.print_Ip_Status()
+radio.refresh()
+core.refresh()
+radio.print_attributes()
+core.print_attributes()
 
-network.test_network(ip.ipAddressNgu)
+network.test_network(core.ngu_Ip)
 network.print_network_status()
-network.test_network(ip.ipAddressNgc)
+network.test_network(core.ngc_Ip)
 network.print_network_status()
 
-freq.refresh()
-freq.print_Freq_Status()
-
 raptorStatus.refresh()
 raptorStatus.print_Raptor_Status()
 
@@ -57,8 +55,5 @@ temp.print_core_temp()
 driveSpace.refresh()
 driveSpace.print_drive_space()
 
-tx.refresh()
-tx.print_tx_power()
-
 tp.refresh()
-tp.print_core_throughput()
\ No newline at end of file
+tp.print_core_throughput()
@@ -1,13 +1,15 @@
 #!/usr/bin/env python3
 #Input command ":set fileformat=unix" on new file upload to board
-from attributes.BoardDateTime import BoardDateTime
-from attributes.CpuUsage import CpuUsage
-from attributes.RamUsage import RamUsage
-from attributes.SocTemp import SocTemp
-from attributes.DriveSpace import DriveSpace
-from attributes.Network import Network
-from attributes.RadioAttr import RadioAttr
-from attributes.CoreAttr import CoreAttr
+import os, sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from logic.attributes.BoardDateTime import BoardDateTime
+from logic.attributes.CpuUsage import CpuUsage
+from logic.attributes.RamUsage import RamUsage
+from logic.attributes.SocTemp import SocTemp
+from logic.attributes.DriveSpace import DriveSpace
+from logic.attributes.Network import Network
+from logic.attributes.RadioAttr import RadioAttr
+from logic.attributes.CoreAttr import CoreAttr
 
 ping = "192.168.2.10"
 CONFIG_FILE_PATH = "/opt/ste/active/commissioning/configs/gnb_webdashboard.json"
@@ -36,7 +38,7 @@ radio.refresh()
 core.refresh()
 radio.print_attributes()
 core.print_attributes()
-#core.edit_config("gNBIdLength", "28") //For testing edit functionality
+#ConfigStore.for_path(core.json_file_path).apply({"gNBIdLength": "28"}) //For testing edit functionality
 
 configs = [radio, core]
 for config in configs:
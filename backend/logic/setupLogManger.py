@@ -1,15 +1,25 @@
+import atexit
 import logging
 import logging.handlers
 import os
+import queue
 import threading
+import time
 
 class LogManager:
     _instance = None
     _lock = threading.Lock()
     _initialized = False
-    _LOG_DIR = "/webdashboard/logdump"  # Fixed path
+    _LOG_DIR = os.environ.get("WEBDASHBOARD_LOG_DIR", "/webdashboard/logdump")
     _LOG_FILE = "setup_log.txt"
     _file_handler = None
+    # Durability of the shared log file: records are written in batches by a
+    # background thread and fsynced every _FSYNC_INTERVAL_MS, every
+    # _FSYNC_RECORDS records, or straight away for _FSYNC_LEVEL and above.
+    _QUEUE_SIZE = 10000
+    _FSYNC_INTERVAL_MS = 1000
+    _FSYNC_RECORDS = 500
+    _FSYNC_LEVEL = logging.WARNING
 
     @classmethod
     def get_logger(cls, name='setup_script'):
@@ -20,11 +30,11 @@ class LogManager:
         with cls._lock:
             if not cls._initialized:
                 cls._initialize_logging()
-            
+
             # Get a logger specific to this request
             logger = logging.getLogger(name)
             logger.setLevel(logging.DEBUG)  # Set logger level
-            
+
             if not logger.handlers:  # Only add handlers if they don't exist
                 # Add handlers specific to this logger instance
                 console_handler = logging.StreamHandler()
@@ -32,14 +42,14 @@ class LogManager:
                 console_formatter = logging.Formatter('%(levelname)s: %(message)s')
                 console_handler.setFormatter(console_formatter)
                 logger.addHandler(console_handler)
-                
+
                 # Add the shared file handler
                 if cls._file_handler:
                     logger.addHandler(cls._file_handler)
-            
+
             # Enable propagation for better visibility
             logger.propagate = True
-                
+
             return logger
 
     @classmethod
@@ -61,22 +71,65 @@ class LogManager:
                 if not os.path.exists(cls._LOG_DIR):
                     os.makedirs(cls._LOG_DIR)
 
-        # Setup shared file handler with immediate flushing
+        # Setup shared file handler, written in batches off the caller's thread
         log_file = os.path.join(cls._LOG_DIR, cls._LOG_FILE)
-        cls._file_handler = RealTimeRotatingFileHandler(
+        file_handler = BatchRotatingFileHandler(
             log_file,
             maxBytes=10*1024*1024,  # 10MB
             backupCount=5,
             encoding='utf-8'
         )
-        cls._file_handler.setLevel(logging.DEBUG)
         file_formatter = logging.Formatter(
             '[%(asctime)s] - [%(name)s] - [%(levelname)s] - %(message)s'
         )
-        cls._file_handler.setFormatter(file_formatter)
-        
+        file_handler.setFormatter(file_formatter)
+        cls._file_handler = AsyncBatchHandler(
+            file_handler,
+            queue_size=cls._QUEUE_SIZE,
+            fsync_interval_ms=cls._FSYNC_INTERVAL_MS,
+            fsync_records=cls._FSYNC_RECORDS,
+            fsync_level=cls._FSYNC_LEVEL,
+        )
+        cls._file_handler.setLevel(logging.DEBUG)
+        atexit.register(cls.shutdown)
+
         cls._initialized = True
 
+    @classmethod
+    def configure_durability(cls, fsync_interval_ms=None, fsync_records=None, fsync_level=None):
+        """
+        Change when the shared log file is fsynced. 0 disables the interval
+        or record-count trigger; fsync_level=logging.CRITICAL + 1 disables
+        the per-level trigger.
+        """
+        with cls._lock:
+            if fsync_interval_ms is not None:
+                cls._FSYNC_INTERVAL_MS = fsync_interval_ms
+            if fsync_records is not None:
+                cls._FSYNC_RECORDS = fsync_records
+            if fsync_level is not None:
+                cls._FSYNC_LEVEL = fsync_level
+            if cls._file_handler:
+                cls._file_handler.fsync_interval_ms = cls._FSYNC_INTERVAL_MS
+                cls._file_handler.fsync_records = cls._FSYNC_RECORDS
+                cls._file_handler.fsync_level = cls._FSYNC_LEVEL
+
+    @classmethod
+    def stats(cls):
+        """
+        Counters of the shared log pipeline (queue depth, dropped records,
+        batches, fsyncs), or None before the first logger is created.
+        """
+        return cls._file_handler.stats() if cls._file_handler else None
+
+    @classmethod
+    def shutdown(cls):
+        """
+        Write and fsync everything still queued. Called at exit.
+        """
+        if cls._file_handler:
+            cls._file_handler.close()
+
     @staticmethod
     def setup_logging():
         """
@@ -85,19 +138,194 @@ class LogManager:
         """
         return LogManager.get_logger('setup_script')
 
-class RealTimeRotatingFileHandler(logging.handlers.RotatingFileHandler):
-    """Custom RotatingFileHandler that ensures immediate writes"""
+class BatchRotatingFileHandler(logging.handlers.RotatingFileHandler):
+    """
+    RotatingFileHandler that writes a whole batch of records with a single
+    flush (and at most one fsync) instead of flushing after every record.
+    Used as the target of AsyncBatchHandler.
+    """
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.mode = 'a'  # Always append mode
-        
+
+    def write_batch(self, records, sync: bool):
+        with self.lock:
+            if self.stream is None:
+                self.stream = self._open()
+            # the file may also be appended to or cleared by other writers
+            size = os.fstat(self.stream.fileno()).st_size
+            for record in records:
+                try:
+                    msg = self.format(record) + self.terminator
+                    length = len(msg.encode(self.encoding or "utf-8", errors="replace"))
+                    if self.maxBytes > 0 and size > 0 and size + length >= self.maxBytes:
+                        self._sync(True)
+                        self.doRollover()
+                        size = 0
+                    self.stream.write(msg)
+                    size += length
+                except Exception:
+                    self.handleError(record)
+            self._sync(sync)
+
+    def _sync(self, fsync: bool):
+        if self.stream:
+            self.stream.flush()
+            if fsync:
+                os.fsync(self.stream.fileno())
+
+class AsyncBatchHandler(logging.Handler):
+    """
+    Queue-based logging handler: emit() only enqueues the record and a
+    background thread writes whatever has accumulated to the target in one
+    batch, so callers never wait for the disk.
+
+    Durability is a policy: fsync after fsync_interval_ms, after
+    fsync_records unsynced records, or as soon as a batch contains a record
+    at fsync_level or above. When the queue is full, records below
+    fsync_level are dropped (and counted); records at or above it wait up
+    to a second for room.
+    """
+
+    MAX_BATCH = 512
+
+    def __init__(self, target: BatchRotatingFileHandler, queue_size: int = 10000,
+                 fsync_interval_ms: int = 1000, fsync_records: int = 500,
+                 fsync_level: int = logging.WARNING):
+        super().__init__()
+        self.target = target
+        self.fsync_interval_ms = fsync_interval_ms
+        self.fsync_records = fsync_records
+        self.fsync_level = fsync_level
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.enqueued = 0
+        self.written = 0
+        self.dropped = 0
+        self.write_errors = 0
+        self.batches = 0
+        self.fsyncs = 0
+        self.max_queue_depth = 0
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+        self._closed = False
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._writer, name="log_writer", daemon=True)
+        self._thread.start()
+
+    def prepare(self, record):
+        # as QueueHandler.prepare: merge args and exception text into the
+        # record now, it is formatted later on the writer thread
+        record = logging.makeLogRecord(record.__dict__)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info and not record.exc_text:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+        record.exc_info = None
+        return record
+
     def emit(self, record):
-        """Override emit to force flush after each write"""
+        if self._closed:
+            return
         try:
-            super().emit(record)
-            self.flush()
-            if self.stream:
-                self.stream.flush()
-                os.fsync(self.stream.fileno())
+            record = self.prepare(record)
+            if record.levelno >= self.fsync_level:
+                self.queue.put(record, timeout=1.0)
+            else:
+                self.queue.put_nowait(record)
+            self.enqueued += 1
+            depth = self.queue.qsize()
+            if depth > self.max_queue_depth:
+                self.max_queue_depth = depth
+        except queue.Full:
+            self.dropped += 1
+        except Exception:
+            self.handleError(record)
+
+    def _writer(self):
+        while True:
+            timeout = None
+            if self._unsynced and self.fsync_interval_ms:
+                timeout = max(0.0, self._last_sync + self.fsync_interval_ms / 1000.0 - time.monotonic())
+            stopping = self._stop.is_set()
+            if stopping:
+                timeout = 0.0   # drain what is left, then exit
+            try:
+                first = self.queue.get(timeout=timeout)
+            except queue.Empty:
+                self._write([], force_sync=True)
+                if stopping:
+                    return
+                continue
+            batch = [first]
+            while len(batch) < self.MAX_BATCH:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            # None is only close() waking us up
+            self._write([r for r in batch if r is not None])
+            for _ in batch:
+                self.queue.task_done()
+
+    def _write(self, records, force_sync: bool = False):
+        self._unsynced += len(records)
+        sync = self._unsynced > 0 and bool(
+            force_sync
+            or any(r.levelno >= self.fsync_level for r in records)
+            or (self.fsync_records and self._unsynced >= self.fsync_records)
+            or (self.fsync_interval_ms
+                and time.monotonic() - self._last_sync >= self.fsync_interval_ms / 1000.0))
+        try:
+            self.target.write_batch(records, sync)
         except Exception:
-            self.handleError(record)
\ No newline at end of file
+            # reported on stderr the way logging reports any handler failure
+            self.write_errors += 1
+            self.handleError(logging.makeLogRecord({
+                "msg":  "Log writer failed to write a batch of %d records",
+                "args": (len(records),),
+            }))
+        else:
+            self.written += len(records)
+        if records:
+            self.batches += 1
+        if sync:
+            self.fsyncs += 1
+            self._unsynced = 0
+            self._last_sync = time.monotonic()
+
+    def flush(self):
+        """
+        Block until every record enqueued so far has been written.
+        """
+        if not self._closed and self._thread.is_alive():
+            self.queue.join()
+
+    def close(self):
+        """
+        Write and fsync what is queued, then stop the writer thread. Never
+        blocks on a full queue: the writer sees the stop flag on its next
+        batch and only needs the wake-up record if it is idle.
+        """
+        if not self._closed:
+            self._closed = True
+            self._stop.set()
+            if self._thread.is_alive():
+                try:
+                    self.queue.put_nowait(None)
+                except queue.Full:
+                    pass   # the writer is busy draining and will see the flag
+                self._thread.join(timeout=10)
+            self.target.close()
+        super().close()
+
+    def stats(self):
+        return {
+            "queue_depth":     self.queue.qsize(),
+            "max_queue_depth": self.max_queue_depth,
+            "enqueued":        self.enqueued,
+            "written":         self.written,
+            "dropped":         self.dropped,
+            "write_errors":    self.write_errors,
+            "batches":         self.batches,
+            "fsyncs":          self.fsyncs,
+        }
@@ -53,6 +53,8 @@ class NodeInfo {
       selfManetInfo: null
     };
     this.rawAttributes = {}; // Store raw attributes if needed
+    this._staticAttributes = {}; // Config-derived attributes from /api/attributes/static
+    this._staticEtag = null;
     this.isInitializing = false; // Used to indicate script toggle or initial data load
 
     // Store the callback
@@ -158,17 +160,22 @@ class NodeInfo {
     const fetchTimeoutId = setTimeout(() => controller.abort(), timeout);
 
     try {
-      const response = await fetch(`http://${this.ip}:5000/api/attributes`, { signal });
-      clearTimeout(fetchTimeoutId);
+      const response = await fetch(`http://${this.ip}:5000/api/attributes/dynamic`, { signal });
 
       if (response.ok) {
         const data = await response.json();
-        this._parseAndAssignAttributes(data);
+        // Config-derived attributes are only re-fetched when their ETag changes
+        if (data.config_etag !== this._staticEtag) {
+          await this._refreshStaticAttributes(data.config_etag, signal);
+        }
+        clearTimeout(fetchTimeoutId);
+        this._parseAndAssignAttributes({ ...this._staticAttributes, ...data });
         // If attributes are fetched successfully, and status was DISCONNECTED,
         // it implies the node is reachable. The next status poll will confirm RUNNING/OFF.
         // However, we don't change _currentStatus here directly to avoid race conditions
         // with refreshStatusFromServer. Let refreshStatusFromServer be the authority on _currentStatus.
       } else {
+        clearTimeout(fetchTimeoutId);
         console.error(`[NodeInfo ${this.ip}] Failed to fetch attributes: ${response.status}`);
         this._parseAndAssignAttributes(null);
         this._currentStatus = 'DISCONNECTED';
@@ -185,6 +192,20 @@ class NodeInfo {
     }
   }
 
+  async _refreshStaticAttributes(etag, signal) {
+    const headers = this._staticEtag ? { 'If-None-Match': `"${this._staticEtag}"` } : {};
+    const response = await fetch(`http://${this.ip}:5000/api/attributes/static`, { signal, headers, cache: 'no-store' });
+    if (response.status === 304) {
+      return;
+    }
+    if (!response.ok) {
+      throw new Error(`Failed to fetch static attributes: ${response.status}`);
+    }
+    this._staticAttributes = await response.json();
+    // the ETag header is not exposed cross-origin; the dynamic payload carries it
+    this._staticEtag = etag;
+  }
+
   async refreshStatusFromServer(timeout = 4900) {
     // Do not poll status if a toggle operation is in progress,
     // as toggleScript will manage the initializing state.
@@ -248,7 +269,16 @@ class NodeInfo {
         body: JSON.stringify({ action: action }) // Use action directly
       });
 
-      if (!response.ok) { // Handle non-2xx responses by logging and potentially setting reboot alert
+      if (response.status === 202) { // Action runs as a background job; follow it until it finishes
+        const { job_id } = await response.json();
+        const job = await this.waitForJob(job_id);
+        if (job && (job.status === 'failed' || job.status === 'timeout')) {
+          console.error(`[NodeInfo ${this.ip}] Job ${job_id} (${action}) ended with status ${job.status}: ${job.details}`);
+          if (this._setRebootAlertNodeIp) {
+            this._setRebootAlertNodeIp(this.ip);
+          }
+        }
+      } else if (!response.ok) { // Handle non-2xx responses by logging and potentially setting reboot alert
         let errorText = `Error toggling script. HTTP Status: ${response.status}`;
         try {
           const rtext = await response.text();
@@ -271,6 +301,28 @@ class NodeInfo {
     }
   }
 
+  // Poll a background job until it is no longer running; returns the final job status (or null)
+  async waitForJob(jobId, intervalMs = 2000, maxWaitMs = 180000) {
+    const deadline = Date.now() + maxWaitMs;
+    while (Date.now() < deadline) {
+      try {
+        const response = await fetch(`http://${this.ip}:5000/api/jobs/${jobId}?tail=0`);
+        if (response.ok) {
+          const job = await response.json();
+          if (job.status !== 'running') {
+            return job;
+          }
+        } else if (response.status === 404) {
+          return null;
+        }
+      } catch (error) {
+        console.warn(`[NodeInfo ${this.ip}] Error polling job ${jobId}:`, error);
+      }
+      await new Promise(resolve => setTimeout(resolve, intervalMs));
+    }
+    return null;
+  }
+
   // Method to edit configuration and immediately refresh attributes for UI feedback
   async editConfigWithRefresh(field, value) {
     try {
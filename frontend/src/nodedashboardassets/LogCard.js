@@ -5,6 +5,8 @@ import RefreshIcon from '@mui/icons-material/Refresh';
 import { useTheme } from '@mui/material/styles';
 import { getThemeColors } from '../theme';
 
+const TAIL_LINES = 500;
+
 export default function LogCard({ ip }) {
   const theme = useTheme();
   const colors = getThemeColors(theme);
@@ -20,7 +22,8 @@ export default function LogCard({ ip }) {
   // Fetch logs from backend
   const fetchLogs = () => {
     setError(null);
-    fetch(`http://${ip}:5000/api/download/${logType}_log`)
+    // Only the most recent lines are shown, so fetch just those instead of the whole file
+    fetch(`http://${ip}:5000/api/logs/${logType}_log?tail=${TAIL_LINES}`)
       .then(res => {
         if (!res.ok) {
           if (res.status === 404) {
@@ -28,10 +31,10 @@ export default function LogCard({ ip }) {
           }
           throw new Error(`Could not load ${logType.toUpperCase()} log (status ${res.status})`);
         }
-        return res.text();
+        return res.json();
       })
-      .then(text => {
-        setLogLines(text.split('\n'));
+      .then(page => {
+        setLogLines(page.lines);
       })
       .catch(err => {
         console.error(err);